@@ -1,63 +1,34 @@
-import json
-import os
+import sys
+from pathlib import Path
 
-PROJECT_ROOT = '/Users/kaywalker/AndroidStudioProjects/time_walker'
-CHARACTERS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/characters.json')
-LOCATIONS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/locations.json')
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'data_pipeline'))
+from content_graph import ContentGraph
+from content_store import get_store
 
-def check_metadata_gaps():
+def check_metadata_gaps(store=None):
     print("Checking for metadata gaps...")
     
-    characters = []
-    locations = []
-    
-    if os.path.exists(CHARACTERS_JSON):
-        with open(CHARACTERS_JSON, 'r') as f:
-            characters = json.load(f)
-            
-    if os.path.exists(LOCATIONS_JSON):
-        with open(LOCATIONS_JSON, 'r') as f:
-            locations = json.load(f)
+    graph = ContentGraph(store or get_store())
 
-    # Create lookups for validation
-    char_ids = {c['id'] for c in characters}
-    loc_ids = {l['id'] for l in locations}
+    # Dataset -> (label, [(reference field, target label)]), checked in this order
+    checks = {
+        'characters': ('Character', [('relatedLocationIds', 'location'), ('relatedCharacterIds', 'character')]),
+        'locations': ('Location', [('characterIds', 'character')]),
+    }
 
     gaps = []
-
-    # Check Characters
-    for char in characters:
-        char_id = char['id']
-        
-        # Check relatedLocationIds
-        if 'relatedLocationIds' not in char or not char['relatedLocationIds']:
-            gaps.append(f"Character '{char_id}' has empty relatedLocationIds")
-        else:
-            # Validate IDs
-            for loc_id in char['relatedLocationIds']:
-                if loc_id not in loc_ids:
-                    gaps.append(f"Character '{char_id}' references unknown location '{loc_id}'")
-
-        # Check relatedCharacterIds
-        if 'relatedCharacterIds' not in char or not char['relatedCharacterIds']:
-             # Note: Some characters might legitimately not have relations, but worth checking
-            gaps.append(f"Character '{char_id}' has empty relatedCharacterIds")
-        else:
-             for cid in char['relatedCharacterIds']:
-                if cid not in char_ids:
-                    gaps.append(f"Character '{char_id}' references unknown character '{cid}'")
-
-    # Check Locations
-    for loc in locations:
-        loc_id = loc['id']
-        
-        # Check characterIds (Characters at this location)
-        if 'characterIds' not in loc or not loc['characterIds']:
-            gaps.append(f"Location '{loc_id}' has empty characterIds")
-        else:
-             for cid in loc['characterIds']:
-                if cid not in char_ids:
-                    gaps.append(f"Location '{loc_id}' references unknown character '{cid}'")
+    for node in graph.nodes:
+        name, record_id = node
+        if name not in checks:
+            continue
+        label, fields = checks[name]
+        for field, target_label in fields:
+            targets = graph.targets(node, field)
+            if not targets:
+                gaps.append(f"{label} '{record_id}' has empty {field}")
+            for target in targets:
+                if target not in graph.nodes:
+                    gaps.append(f"{label} '{record_id}' references unknown {target_label} '{target[1]}'")
 
     # Write report
     with open('metadata_gaps_report.txt', 'w') as f:
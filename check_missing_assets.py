@@ -1,47 +1,32 @@
-import json
-import os
+import sys
+from pathlib import Path
 
-PROJECT_ROOT = '/Users/kaywalker/AndroidStudioProjects/time_walker'
-CHARACTERS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/characters.json')
-LOCATIONS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/locations.json')
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'data_pipeline'))
+from asset_audit import audit
 
-def check_missing_assets():
-    missing_assets = []
+DATASET_LABELS = {
+    'characters': 'Character',
+    'locations': 'Location',
+    'encyclopedia': 'Encyclopedia',
+}
 
-    # Check characters
-    if os.path.exists(CHARACTERS_JSON):
-        with open(CHARACTERS_JSON, 'r') as f:
-            characters = json.load(f)
-            for char in characters:
-                # Check portrait
-                if 'portraitAsset' in char and char['portraitAsset']:
-                    path = os.path.join(PROJECT_ROOT, char['portraitAsset'])
-                    if not os.path.exists(path):
-                        missing_assets.append(f"Character {char['id']} missing portrait: {char['portraitAsset']}")
-                
-                # Check emotion assets
-                if 'emotionAssets' in char and char['emotionAssets']:
-                    for asset in char['emotionAssets']:
-                        path = os.path.join(PROJECT_ROOT, asset)
-                        if not os.path.exists(path):
-                            missing_assets.append(f"Character {char['id']} missing emotion asset: {asset}")
+FIELD_LABELS = {
+    'portraitAsset': 'portrait',
+    'emotionAssets': 'emotion asset',
+    'thumbnailAsset': 'thumbnail',
+    'backgroundAsset': 'background',
+    'imageAsset': 'image',
+}
 
-    # Check locations
-    if os.path.exists(LOCATIONS_JSON):
-        with open(LOCATIONS_JSON, 'r') as f:
-            locations = json.load(f)
-            for loc in locations:
-                # Check thumbnail
-                if 'thumbnailAsset' in loc and loc['thumbnailAsset']:
-                    path = os.path.join(PROJECT_ROOT, loc['thumbnailAsset'])
-                    if not os.path.exists(path):
-                        missing_assets.append(f"Location {loc['id']} missing thumbnail: {loc['thumbnailAsset']}")
-                
-                # Check background
-                if 'backgroundAsset' in loc and loc['backgroundAsset']:
-                    path = os.path.join(PROJECT_ROOT, loc['backgroundAsset'])
-                    if not os.path.exists(path):
-                        missing_assets.append(f"Location {loc['id']} missing background: {loc['backgroundAsset']}")
+def check_missing_assets():
+    # One directory walk covers every reference (see tools/data_pipeline/asset_audit.py)
+    missing_assets = []
+    for item in audit()['missing']:
+        if item['id'] is None:
+            missing_assets.append(f"{item['source']} references missing asset: {item['path']}")
+        else:
+            label = DATASET_LABELS[item['source']]
+            missing_assets.append(f"{label} {item['id']} missing {FIELD_LABELS[item['field']]}: {item['path']}")
 
     if missing_assets:
         with open('missing_assets_report.txt', 'w') as f:
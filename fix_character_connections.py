@@ -1,78 +1,119 @@
+import argparse
 import json
-import os
+import sys
+from pathlib import Path
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'data_pipeline'))
+from content_graph import ContentGraph
+from content_store import get_store
 
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+# Evidence that two characters are related:
+#   dialogue - both list the same dialogue in dialogueIds
+#   speaker  - both speak in (or own) the same dialogue
+#   location - both are at the same location in the same era
+INFERENCE_SOURCES = ('dialogue', 'speaker', 'location')
 
-def main():
-    base_dir = '/Users/kaywalker/AndroidStudioProjects/time_walker/assets/data'
-    characters_path = os.path.join(base_dir, 'characters.json')
-    
-    if not os.path.exists(characters_path):
+def dialogue_speakers(dialogue):
+    speakers = {dialogue.get('characterId')}
+    speakers.update(node.get('speaker') for node in dialogue.get('nodes', []))
+    return speakers
+
+def relation_groups(graph, sources=INFERENCE_SOURCES):
+    # Yields (source, evidence id, character ids); every pair in a group is related
+    characters = {record_id: record for (name, record_id), record in graph.nodes.items() if name == 'characters'}
+
+    if 'dialogue' in sources:
+        for name, d_id in graph.in_edges:
+            if name == 'dialogues':
+                yield 'dialogue', d_id, {cid for _, cid in graph.sources((name, d_id), 'dialogueIds')}
+
+    if 'speaker' in sources:
+        for (name, d_id), dialogue in graph.nodes.items():
+            if name == 'dialogues':
+                # Skips player/narrator and anyone else who is not a known character
+                yield 'speaker', d_id, {cid for cid in dialogue_speakers(dialogue) if cid in characters}
+
+    if 'location' in sources:
+        for (name, loc_id), location in graph.nodes.items():
+            if name != 'locations':
+                continue
+            present = {cid for _, cid in graph.targets((name, loc_id), 'characterIds')}
+            present.update(cid for _, cid in graph.sources((name, loc_id), 'relatedLocationIds'))
+            by_era = {}
+            for cid in present:
+                if cid in characters:
+                    by_era.setdefault(characters[cid].get('eraId'), set()).add(cid)
+            for group in by_era.values():
+                yield 'location', loc_id, group
+
+def infer_relations(store, sources=INFERENCE_SOURCES):
+    """Adds inferred relatedCharacterIds in place; returns the added relations.
+
+    Adjacency is a set per character, updated as relations are added, so the
+    work is linear in the number of inferred pairs and nothing is added twice.
+    """
+    graph = ContentGraph(store)
+    char_map = {record_id: record for (name, record_id), record in graph.nodes.items() if name == 'characters'}
+    related = {cid: set(char.get('relatedCharacterIds') or []) for cid, char in char_map.items()}
+
+    added = []
+    for source, evidence_id, group in relation_groups(graph, sources):
+        if len(group) < 2:
+            continue
+        members = sorted(group)
+        for char_id_a in members:
+            adjacency = related[char_id_a]
+            for char_id_b in members:
+                if char_id_b != char_id_a and char_id_b not in adjacency:
+                    adjacency.add(char_id_b)
+                    added.append({
+                        'characterId': char_id_a,
+                        'relatedCharacterId': char_id_b,
+                        'source': source,
+                        'evidenceId': evidence_id,
+                    })
+
+    # Only characters that gained relations are rewritten (sorted, as before)
+    for cid in {relation['characterId'] for relation in added}:
+        char_map[cid]['relatedCharacterIds'] = sorted(related[cid])
+    store.invalidate()
+    return added
+
+def main(store=None, sources=INFERENCE_SOURCES, diff_path=None, dry_run=False):
+    store = store or get_store()
+    characters_path = store.path('characters.json')
+
+    if not store.exists('characters'):
         print(f"Error: {characters_path} not found.")
         return
 
-    characters = load_json(characters_path)
-    
-    # 1. Map Dialogue ID -> Set of Character IDs
-    dialogue_to_characters = {}
-    
-    # Create a lookup for character objects by ID for easy access
-    char_map = {char['id']: char for char in characters}
-    
-    for char in characters:
-        char_id = char['id']
-        # Ensure relatedCharacterIds exists
-        if 'relatedCharacterIds' not in char:
-            char['relatedCharacterIds'] = []
-            
-        dialogue_ids = char.get('dialogueIds', [])
-        for d_id in dialogue_ids:
-            if d_id not in dialogue_to_characters:
-                dialogue_to_characters[d_id] = set()
-            dialogue_to_characters[d_id].add(char_id)
-
-    # 2. Identify and Add Missing Relations
-    added_count = 0
-    
-    for d_id, char_ids in dialogue_to_characters.items():
-        # If a dialogue is shared by 2 or more characters, they are related
-        if len(char_ids) >= 2:
-            sorted_ids = sorted(list(char_ids))
-            print(f"Dialogue '{d_id}' is shared by: {sorted_ids}")
-            
-            # Connect everyone with everyone else in this group
-            for char_id_a in sorted_ids:
-                char_a = char_map[char_id_a]
-                current_relations = set(char_a.get('relatedCharacterIds', []))
-                
-                for char_id_b in sorted_ids:
-                    if char_id_a == char_id_b:
-                        continue
-                        
-                    if char_id_b not in current_relations:
-                        print(f"  [+] Adding '{char_id_b}' to '{char_id_a}' (shared: {d_id})")
-                        char_a['relatedCharacterIds'].append(char_id_b)
-                        added_count += 1
-
-    # 3. Sort and dedup for cleanliness
-    for char in characters:
-        if 'relatedCharacterIds' in char:
-            # Remove duplicates and sort
-            unique_relations = sorted(list(set(char['relatedCharacterIds'])))
-            char['relatedCharacterIds'] = unique_relations
-
-    # 4. Save
-    if added_count > 0:
-        save_json(characters_path, characters)
-        print(f"\nSuccess! Added {added_count} missing connections.")
-    else:
+    added = infer_relations(store, sources)
+
+    if diff_path:
+        with open(diff_path, 'w', encoding='utf-8') as f:
+            json.dump(added, f, ensure_ascii=False, indent=2)
+
+    if not added:
         print("\nNo missing connections found. Data is already consistent.")
+        return
+
+    counts = {}
+    for relation in added:
+        counts[relation['source']] = counts.get(relation['source'], 0) + 1
+    for source, count in counts.items():
+        print(f"  [+] {count} connections from shared {source}s")
+
+    if dry_run:
+        print(f"\nDry run: {len(added)} missing connections found, nothing saved.")
+    else:
+        store.save('characters')
+        print(f"\nSuccess! Added {len(added)} missing connections.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Infer relatedCharacterIds from shared dialogues and locations.")
+    parser.add_argument("--sources", nargs="+", choices=INFERENCE_SOURCES, default=list(INFERENCE_SOURCES),
+                        help="Evidence used to relate characters (default: all)")
+    parser.add_argument("--diff", dest="diff_path", help="Write the added relations as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Only report, do not save characters.json")
+    args = parser.parse_args()
+    main(sources=args.sources, diff_path=args.diff_path, dry_run=args.dry_run)
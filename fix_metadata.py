@@ -1,9 +1,9 @@
-import json
-import os
+import sys
+from pathlib import Path
 
-PROJECT_ROOT = '/Users/kaywalker/AndroidStudioProjects/time_walker'
-CHARACTERS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/characters.json')
-LOCATIONS_JSON = os.path.join(PROJECT_ROOT, 'assets/data/locations.json')
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'data_pipeline'))
+from content_graph import ContentGraph
+from content_store import get_store
 
 # Aliases: SOURCE -> TARGET
 # References to SOURCE will be changed to TARGET.
@@ -26,6 +26,13 @@ CHARACTER_ALIASES = {
     'won_gyun': 'yi_sun_sin' # Temporary fallback? No, better remove if not exists.
 }
 
+# Reference fields validated after alias resolution
+LINK_FIELDS = [
+    ('characters', 'relatedLocationIds'),
+    ('characters', 'relatedCharacterIds'),
+    ('locations', 'characterIds'),
+]
+
 # New Links to Add: Character ID -> [Location IDs]
 NEW_LINKS = {
     'jang_yeongshil': ['gyeongbokgung'],
@@ -41,106 +48,66 @@ NEW_LINKS = {
     'jeong_mongju': ['manwoldae']
 }
 
-def load_json(filepath):
-    if os.path.exists(filepath):
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    return []
+def resolve_aliases(values, aliases):
+    return [aliases.get(value, value) for value in values]
 
-def save_json(filepath, data):
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+def link(obj, field, members, value):
+    # members is the set mirror of obj[field]; returns True if value was added
+    if value in members:
+        return False
+    obj.setdefault(field, []).append(value)
+    members.add(value)
+    return True
 
-def fix_metadata():
+def fix_metadata(store=None):
     print("Fixing metadata gaps (Round 2)...")
     
-    characters = load_json(CHARACTERS_JSON)
-    locations = load_json(LOCATIONS_JSON)
+    store = store or get_store()
+    characters = store.raw('characters') if store.exists('characters') else []
+    locations = store.raw('locations') if store.exists('locations') else []
 
     # 1. Merge Duplicate Locations
     # If a location ID is in LOCATION_ALIASES as a key, remove it from the list
-    locations_to_remove = [k for k in LOCATION_ALIASES.keys()]
-    locations = [l for l in locations if l['id'] not in locations_to_remove]
+    locations_to_remove = list(LOCATION_ALIASES.keys())
+    locations = [l for l in locations if l['id'] not in LOCATION_ALIASES]
+    store.replace('characters', characters)
+    store.replace('locations', locations)
     print(f"Removed superseded locations: {locations_to_remove}")
 
+    # id -> object indexes, shared by every pass below
+    char_by_id = store.by_id('characters')
+    loc_by_id = store.by_id('locations')
+
     # 2. Add Missing Links (Populate fields)
     for char_id, loc_ids in NEW_LINKS.items():
-        char = next((c for c in characters if c['id'] == char_id), None)
+        char = char_by_id.get(char_id)
         if char:
-            if 'relatedLocationIds' not in char:
-                char['relatedLocationIds'] = []
-            
+            members = set(char.setdefault('relatedLocationIds', []))
             for loc_id in loc_ids:
                 # Resolve alias first
-                if loc_id in LOCATION_ALIASES:
-                    loc_id = LOCATION_ALIASES[loc_id]
-                
-                if loc_id not in char['relatedLocationIds']:
-                    char['relatedLocationIds'].append(loc_id)
+                loc_id = LOCATION_ALIASES.get(loc_id, loc_id)
+                if link(char, 'relatedLocationIds', members, loc_id):
                     print(f"Manually added link: Character {char_id} -> Location {loc_id}")
 
     # 3. Standard Fixes (Validation & Reciprocity)
-    char_ids = {c['id'] for c in characters}
-    loc_ids = {l['id'] for l in locations}
-    
-    # Fix Character References
     for char in characters:
         if 'relatedLocationIds' in char:
-            new_loc_ids = []
-            for loc_id in char['relatedLocationIds']:
-                if loc_id in LOCATION_ALIASES:
-                    loc_id = LOCATION_ALIASES[loc_id]
-                if loc_id in loc_ids:
-                    new_loc_ids.append(loc_id)
-            char['relatedLocationIds'] = list(set(new_loc_ids))
-
+            char['relatedLocationIds'] = resolve_aliases(char['relatedLocationIds'], LOCATION_ALIASES)
         if 'relatedCharacterIds' in char:
-            new_char_ids = []
-            for cid in char['relatedCharacterIds']:
-                if cid in CHARACTER_ALIASES:
-                    cid = CHARACTER_ALIASES[cid]
-                if cid in char_ids:
-                    new_char_ids.append(cid)
-            char['relatedCharacterIds'] = list(set(new_char_ids))
-
-    # Fix Location References
-    for loc in locations:
-        if 'characterIds' in loc:
-            new_char_ids = []
-            for cid in loc['characterIds']:
-                if cid in CHARACTER_ALIASES:
-                    cid = CHARACTER_ALIASES[cid]
-                if cid in char_ids:
-                    new_char_ids.append(cid)
-            loc['characterIds'] = list(set(new_char_ids))
-
-    # Enforce Reciprocity
-    for char in characters:
-        cid = char['id']
-        if 'relatedLocationIds' in char:
-            for loc_id in char['relatedLocationIds']:
-                loc = next((l for l in locations if l['id'] == loc_id), None)
-                if loc:
-                    if 'characterIds' not in loc:
-                        loc['characterIds'] = []
-                    if cid not in loc['characterIds']:
-                        loc['characterIds'].append(cid)
-                        # print(f"Reciprocal: Loc {loc_id} -> Char {cid}")
+            char['relatedCharacterIds'] = resolve_aliases(char['relatedCharacterIds'], CHARACTER_ALIASES)
 
     for loc in locations:
-        loc_id = loc['id']
         if 'characterIds' in loc:
-            for cid in loc['characterIds']:
-                char = next((c for c in characters if c['id'] == cid), None)
-                if char:
-                    if 'relatedLocationIds' not in char:
-                        char['relatedLocationIds'] = []
-                    if loc_id not in char['relatedLocationIds']:
-                        char['relatedLocationIds'].append(loc_id)
-                        # print(f"Reciprocal: Char {cid} -> Loc {loc_id}")
-
-    save_json(CHARACTERS_JSON, characters)
-    save_json(LOCATIONS_JSON, locations)
+            loc['characterIds'] = resolve_aliases(loc['characterIds'], CHARACTER_ALIASES)
+
+    # Drop unknown/duplicate ids and enforce reciprocity on the content graph
+    graph = ContentGraph(store)
+    graph.remove_dangling(LINK_FIELDS)
+    graph.add_reciprocals([('characters', 'relatedLocationIds'), ('locations', 'characterIds')])
+
+    store.invalidate()
+    store.save('characters')
+    store.save('locations')
     print("Metadata fixed and saved.")
 
 if __name__ == "__main__":
@@ -6,7 +6,14 @@ import 'package:flutter/material.dart';
 /// 
 /// Loads locale-specific content (character biographies, dialogue nodes, etc.)
 /// from the assets/data/i18n/{locale}/ directory structure.
+///
+/// Only the fallback locale (ko) holds the complete content. Other locales
+/// store just the entries and fields that differ from it, and are merged over
+/// the fallback content field by field when loaded.
 class I18nContentLoader {
+  /// Locale whose files contain every entry and field.
+  static const String fallbackLanguageCode = 'ko';
+
   // Cache for loaded content
   final Map<String, Map<String, dynamic>> _cache = {};
 
@@ -47,7 +54,16 @@ class I18nContentLoader {
       // Load from asset
       final path = 'assets/data/i18n/$languageCode/$contentType.json';
       final jsonString = await rootBundle.loadString(path);
-      final data = json.decode(jsonString) as Map<String, dynamic>;
+      var data = json.decode(jsonString) as Map<String, dynamic>;
+
+      // Untranslated entries/fields are omitted; fill them from the fallback locale
+      if (languageCode != fallbackLanguageCode) {
+        final fallback = await _loadContent(
+          const Locale(fallbackLanguageCode),
+          contentType,
+        );
+        data = _mergeWithFallback(fallback, data);
+      }
 
       // Cache the loaded data
       _cache[cacheKey] = data;
@@ -55,8 +71,8 @@ class I18nContentLoader {
       return data;
     } catch (e) {
       // Fall back to Korean if the requested locale fails
-      if (languageCode != 'ko') {
-        return _loadContent(const Locale('ko'), contentType);
+      if (languageCode != fallbackLanguageCode) {
+        return _loadContent(const Locale(fallbackLanguageCode), contentType);
       }
 
       // If Korean also fails, return empty map and log error
@@ -65,6 +81,24 @@ class I18nContentLoader {
     }
   }
 
+  /// Lays [overlay] entries over [fallback] ones, merging map entries field by field.
+  static Map<String, dynamic> _mergeWithFallback(
+    Map<String, dynamic> fallback,
+    Map<String, dynamic> overlay,
+  ) {
+    final merged = <String, dynamic>{};
+    fallback.forEach((id, entry) {
+      final translated = overlay[id];
+      if (entry is Map<String, dynamic> && translated is Map<String, dynamic>) {
+        merged[id] = {...entry, ...translated};
+      } else {
+        merged[id] = translated ?? entry;
+      }
+    });
+    overlay.forEach((id, entry) => merged.putIfAbsent(id, () => entry));
+    return merged;
+  }
+
   /// Clears the cache (useful for testing or locale changes).
   void clearCache() {
     _cache.clear();
@@ -1,58 +1,70 @@
 #!/usr/bin/env python3
 """
 Script to transform dialogues.json into i18n-compatible format.
+
+Writes the full i18n/{ko,en}/dialogues.json maps. With --shard-by, the i18n
+content is also written as shards (i18n/{locale}/dialogues/{shard}.json, one
+per character or era) plus i18n/dialogue_index.json mapping dialogue id ->
+shard, for loading only the dialogues of the character being talked to. The
+app does not read shards yet, so they are not written (and earlier ones are
+removed) by default. English only keeps fields that differ from Korean; the
+app falls back to ko for the rest.
+The field split is declared in tools/data_pipeline/transform_engine.py.
+
+Usage:
+    python3 scripts/transform_dialogues.py [--shard-by character|era [--shards-only]] [--force]
 """
 
-import json
-
-def transform_dialogues():
-    with open('assets/data/dialogues.json', 'r', encoding='utf-8') as f:
-        dialogues = json.load(f)
-    
-    main_data = []
-    ko_content = {}
-    en_content = {}
-    
-    for dlg in dialogues:
-        dlg_id = dlg['id']
-        
-        # Main structure with embedded short text
-        main_dlg = {
-            'id': dlg_id,
-            'characterId': dlg.get('characterId', ''),
-            'title': {
-                'ko': dlg.get('titleKorean', dlg.get('title', '')),
-                'en': dlg.get('title', dlg.get('titleKorean', ''))
-            },
-            'estimatedMinutes': dlg.get('estimatedMinutes', 5),
-            'rewards': dlg.get('rewards', [])
-        }
-        
-        main_data.append(main_dlg)
-        
-        # i18n content - description and nodes
-        ko_content[dlg_id] = {
-            'description': dlg.get('description', ''),
-            'nodes': dlg.get('nodes', [])
-        }
-        
-        # For English, copy nodes structure (needs translation)
-        en_content[dlg_id] = {
-            'description': dlg.get('description', ''),  # TODO: Translate
-            'nodes': dlg.get('nodes', [])  # TODO: Translate all text and choice fields
-        }
-    
-    # Write files
-    with open('assets/data/dialogues_new.json', 'w', encoding='utf-8') as f:
-        json.dump(main_data, f, ensure_ascii=False, indent=4)
-    
-    with open('assets/data/i18n/ko/dialogues.json', 'w', encoding='utf-8') as f:
-        json.dump(ko_content, f, ensure_ascii=False, indent=4)
-    
-    with open('assets/data/i18n/en/dialogues.json', 'w', encoding='utf-8') as f:
-        json.dump(en_content, f, ensure_ascii=False, indent=4)
-    
-    print(f"Transformed {len(dialogues)} dialogues")
+import argparse
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'tools' / 'data_pipeline'))
+from content_store import UNASSIGNED_SHARD, dialogue_shard_key, get_store
+from json_stream import iter_object
+from transform_engine import LOCALES, ShardWriters, clear_shards, run_transforms
+
+def transform_dialogues(store=None, shard_by=None, force=False):
+    store = store or get_store()
+    count = run_transforms(store, ['dialogues'], force=force, shard_by=shard_by)['dialogues']
+    if count is None:
+        print("dialogues.json unchanged since the last transform, skipped")
+        return
+
+    if not shard_by:
+        print(f"Transformed {count} dialogues")
+        return
+    index = store.document('i18n/dialogue_index.json')
+    print(f"Transformed {count} dialogues into {len(set(index['dialogues'].values()))} shards")
+
+def shard_dialogues(store=None, shard_by='character'):
+    """Re-shards the existing i18n dialogue maps without re-running the transform."""
+    store = store or get_store()
+    shard_keys = {dlg['id']: dialogue_shard_key(dlg, store, shard_by) for dlg in store.stream('dialogues')}
+    clear_shards(store)
+
+    with ExitStack() as stack:
+        shards = ShardWriters(store, stack)
+        for locale in LOCALES:
+            for dlg_id, content in iter_object(store.path(f'i18n/{locale}/dialogues.json')):
+                shards.write(locale, shard_keys.get(dlg_id, UNASSIGNED_SHARD), dlg_id, content)
+
+    shards.write_index(shard_by)
+    print(f"Sharded {len(shards.index)} dialogues into {len(set(shards.index.values()))} shards")
 
 if __name__ == '__main__':
-    transform_dialogues()
+    parser = argparse.ArgumentParser(description='Transform dialogues.json into i18n files and shards.')
+    parser.add_argument('--shard-by', choices=['character', 'era'], default=None,
+                        help='Also write dialogue shards (not read by the app yet)')
+    parser.add_argument('--shards-only', action='store_true',
+                        help='Only re-shard the existing i18n dialogue maps')
+    parser.add_argument('--force', action='store_true', help='Transform even if dialogues.json is unchanged')
+    args = parser.parse_args()
+    if args.shards_only and not args.shard_by:
+        parser.error('--shards-only requires --shard-by')
+
+    if args.shards_only:
+        shard_dialogues(shard_by=args.shard_by)
+    else:
+        transform_dialogues(shard_by=args.shard_by, force=args.force)
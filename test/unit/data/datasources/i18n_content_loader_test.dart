@@ -159,6 +159,22 @@ void main() {
       });
     });
 
+    group('locale fallback', () {
+      test('should fill untranslated English fields from Korean', () async {
+        // Act
+        final koContent = await loader.loadCharacterContent(const Locale('ko'));
+        final enContent = await loader.loadCharacterContent(const Locale('en'));
+
+        // Assert - every Korean entry and field is present in English
+        expect(enContent.keys, containsAll(koContent.keys));
+        for (final id in koContent.keys) {
+          final koEntry = koContent[id] as Map<String, dynamic>;
+          final enEntry = enContent[id] as Map<String, dynamic>;
+          expect(enEntry.keys, containsAll(koEntry.keys));
+        }
+      });
+    });
+
     group('error handling', () {
       test('should handle missing locale gracefully', () async {
         // Act & Assert
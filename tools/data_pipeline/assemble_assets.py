@@ -0,0 +1,174 @@
+"""
+Assembles the runtime asset set for release builds.
+
+pubspec.yaml ships whole asset directories, so backups and scratch files under
+assets/data (dialogues_backup*.json, *_temp.json, batch files, ...) end up in
+every APK/IPA. This stage works out which of the shipped files the app can
+actually load:
+
+- paths read by code: literals such as the mock repositories' data files,
+  interpolated paths such as I18nContentLoader's
+  'assets/data/i18n/$languageCode/$contentType.json', and Flame-relative media
+  names (see asset_audit.code_reference_matcher)
+- content YAML under assets/content/ (DialogueYamlParser)
+- images and audio referenced by the content data and i18n files
+
+and copies only those into the output directory, together with a
+pubspec_assets.yaml listing them and a report of the bytes removed. With
+--optimized, images are replaced by their optimize_images WebP variant (largest
+role) when that is smaller; Flutter detects the image format from its bytes,
+so the asset path stays the same.
+
+Usage:
+    python3 tools/data_pipeline/assemble_assets.py [--output-dir build/assets_bundle]
+        [--optimized build/optimized_images]
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+from asset_audit import code_reference_matcher, i18n_refs, scan_tree
+from content_store import PROJECT_ROOT, get_store, write_json
+from optimize_images import ASSET_ROLES, MANIFEST_NAME
+
+# Assets read through a loader rather than a literal path
+LOADER_GLOBS = ('assets/content/**/*.yaml', 'assets/content/**/*.yml')
+REPORT_NAME = 'bundle_report.json'
+PUBSPEC_SNIPPET_NAME = 'pubspec_assets.yaml'
+
+
+def pubspec_assets(root=PROJECT_ROOT):
+    """Asset entries of the flutter: assets: list in pubspec.yaml."""
+    entries = []
+    in_flutter = in_assets = False
+    for line in (Path(root) / 'pubspec.yaml').read_text(encoding='utf-8').splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            in_flutter = stripped == 'flutter:'
+            in_assets = False
+        elif in_flutter and stripped == 'assets:':
+            in_assets = True
+        elif in_assets and stripped.startswith('- '):
+            entries.append(stripped[2:].strip().strip('\'"'))
+        elif in_assets:
+            in_assets = False
+    return entries
+
+
+def shipped_files(index, entries):
+    """Files Flutter bundles for the entries: directory entries are not recursive."""
+    shipped = {}
+    for entry in entries:
+        if entry.endswith('/'):
+            for path, size in index.items():
+                if path.startswith(entry) and '/' not in path[len(entry):]:
+                    shipped[path] = size
+        elif entry in index:
+            shipped[entry] = index[entry]
+    return shipped
+
+
+def plan_bundle(store=None, root=PROJECT_ROOT):
+    """Returns {'kept': {path: bytes}, 'pruned': {path: bytes}} of the shipped assets."""
+    store = store or get_store()
+    root = Path(root)
+    shipped = shipped_files(scan_tree(root), pubspec_assets(root))
+
+    referenced_by_code = code_reference_matcher(root)
+    content_refs = {asset for _, _, _, asset in store.asset_refs()}
+    content_refs.update(asset for _, asset in i18n_refs(store))
+    loader_files = {path.relative_to(root).as_posix() for pattern in LOADER_GLOBS for path in root.glob(pattern)}
+
+    kept = {}
+    pruned = {}
+    for path, size in sorted(shipped.items()):
+        if path in content_refs or path in loader_files or referenced_by_code(path):
+            kept[path] = size
+        else:
+            pruned[path] = size
+    return {'kept': kept, 'pruned': pruned}
+
+
+def optimized_variants(optimized_dir):
+    """Maps asset path -> WebP variant path of its largest role, from an optimize_images manifest."""
+    optimized_dir = Path(optimized_dir)
+    manifest = json.loads((optimized_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
+    max_edges = {role: max_edge for role, max_edge, _ in ASSET_ROLES.values()}
+    variants = {}
+    for asset, roles in manifest.items():
+        role = max(roles, key=lambda name: max_edges[name])
+        variants[asset] = optimized_dir / roles[role]['path']
+    return variants
+
+
+def stage_bundle(plan, output_dir, root=PROJECT_ROOT, optimized_dir=None):
+    """Copies the kept assets into output_dir; returns {path: staged bytes}.
+
+    Raises ValueError if output_dir is the project root or one of its parents,
+    whose assets/ directory would be cleared.
+    """
+    output_dir = Path(output_dir)
+    root = Path(root)
+    if root.resolve().is_relative_to(output_dir.resolve()):
+        raise ValueError(f'output directory {output_dir} contains the project root {root}')
+    # Only the staged tree is cleared, so stale files never linger in it
+    shutil.rmtree(output_dir / 'assets', ignore_errors=True)
+
+    variants = optimized_variants(optimized_dir) if optimized_dir else {}
+    staged = {}
+    for path, size in plan['kept'].items():
+        source = root / path
+        variant = variants.get(path)
+        if variant and variant.is_file() and variant.stat().st_size < size:
+            source = variant
+        target = output_dir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        staged[path] = target.stat().st_size
+
+    with open(output_dir / PUBSPEC_SNIPPET_NAME, 'w', encoding='utf-8') as f:
+        f.write('flutter:\n  assets:\n')
+        for path in staged:
+            f.write(f'    - {path}\n')
+    return staged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stage only the assets the app loads for a release build.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--output-dir', default='build/assets_bundle', help='Staging directory')
+    parser.add_argument('--optimized', dest='optimized_dir',
+                        help='optimize_images output directory whose variants replace larger images')
+    args = parser.parse_args()
+
+    plan = plan_bundle(get_store(args.input_dir))
+    try:
+        staged = stage_bundle(plan, args.output_dir, optimized_dir=args.optimized_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    shipped_bytes = sum(plan['kept'].values()) + sum(plan['pruned'].values())
+    staged_bytes = sum(staged.values())
+    write_json(Path(args.output_dir) / REPORT_NAME, {
+        'shippedFiles': len(plan['kept']) + len(plan['pruned']),
+        'shippedBytes': shipped_bytes,
+        'stagedFiles': len(staged),
+        'stagedBytes': staged_bytes,
+        'pruned': plan['pruned'],
+    }, indent=2)
+
+    print(f"Shipped by pubspec: {len(plan['kept']) + len(plan['pruned'])} files, {shipped_bytes / 1024 / 1024:.1f} MB")
+    print(f'Staged: {len(staged)} files, {staged_bytes / 1024 / 1024:.1f} MB')
+    print(f'Removed: {(shipped_bytes - staged_bytes) / 1024 / 1024:.1f} MB')
+    print(f"Pruned files: {len(plan['pruned'])}")
+    for path, size in sorted(plan['pruned'].items(), key=lambda item: -item[1]):
+        print(f'- {path} ({size / 1024:.0f} KB)')
+
+
+if __name__ == '__main__':
+    main()
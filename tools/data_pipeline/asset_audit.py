@@ -0,0 +1,200 @@
+"""
+Single-pass asset audit for the content data.
+
+Walks assets/ once with os.scandir into an in-memory index and checks every
+asset reference against it: the asset fields of all datasets, any "assets/..."
+string inside the i18n files, and string literals in lib/ and pubspec.yaml
+(including Flame-style paths relative to assets/images or assets/audio).
+Files under the shipped asset directories that nothing references are reported
+as orphans together with their size.
+
+Usage:
+    python3 tools/data_pipeline/asset_audit.py [--json report.json]
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+
+from content_store import PROJECT_ROOT, ref_values, get_store
+
+# Directories scanned for orphans (data files are referenced by code paths)
+ORPHAN_DIRS = ('assets/images', 'assets/audio', 'assets/icons')
+IGNORED_FILES = {'.gitkeep', '.DS_Store'}
+
+# Dataset -> asset fields that must be set on every record
+REQUIRED_ASSET_FIELDS = {
+    'characters': ['portraitAsset'],
+    'locations': ['thumbnailAsset', 'backgroundAsset'],
+}
+
+CODE_GLOBS = ('lib/**/*.dart', 'pubspec.yaml')
+_CODE_ASSET_RE = re.compile(r'''["'](assets/[^"'\s]+)["']''')
+# Bare media file names, e.g. loadSprite('map/world_map.png') or 'main_menu.mp3'
+_CODE_MEDIA_RE = re.compile(r'''["']([\w./-]+\.(?:png|jpe?g|webp|gif|mp3|wav|ogg))["']''', re.IGNORECASE)
+_INTERPOLATION_RE = re.compile(r'\\\$\\\{[^}]*\\\}|\\\$\w+')
+
+
+def scan_tree(root, top='assets'):
+    """Maps every file under root/top to its size, keyed by posix path relative to root."""
+    index = {}
+    stack = [top]
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                relative = f'{relative_dir}/{entry.name}'
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relative)
+                elif entry.name not in IGNORED_FILES:
+                    index[relative] = entry.stat().st_size
+    return index
+
+
+def _json_asset_strings(value):
+    if isinstance(value, str):
+        if value.startswith('assets/'):
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_asset_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_asset_strings(item)
+
+
+def i18n_refs(store):
+    """Yields (source, asset path) for asset paths inside the i18n files."""
+    for path in sorted(store.path('i18n').glob('*/*.json')):
+        relpath = path.relative_to(store.data_dir).as_posix()
+        for asset in _json_asset_strings(store.document(relpath)):
+            yield relpath, asset
+
+
+def code_refs(root):
+    """Yields (source, asset path, pattern or bare file name) for asset literals in code and pubspec."""
+    for pattern in CODE_GLOBS:
+        for path in sorted(Path(root).glob(pattern)):
+            text = path.read_text(encoding='utf-8')
+            source = path.relative_to(root).as_posix()
+            for match in _CODE_ASSET_RE.finditer(text):
+                yield source, match.group(1)
+            for match in _CODE_MEDIA_RE.finditer(text):
+                if not match.group(1).startswith('assets/'):
+                    yield source, match.group(1)
+
+
+def _pattern_regex(asset):
+    """Compiles an interpolated Dart path ('.../$id.png') into a regex, or None if literal."""
+    if '$' not in asset:
+        return None
+    return re.compile(_INTERPOLATION_RE.sub('[^/]*', re.escape(asset)) + '$')
+
+
+def code_reference_matcher(root=PROJECT_ROOT):
+    """Predicate telling whether code or pubspec references an asset path.
+
+    A path matches a literal, an interpolated pattern, or a bare Flame-relative
+    file name ('map/world_map.png' matches assets/images/map/world_map.png).
+    """
+    literals = set()
+    patterns = []
+    suffixes = set()
+    for _, asset in code_refs(root):
+        regex = _pattern_regex(asset)
+        if regex:
+            patterns.append(regex)
+        elif asset.startswith('assets/'):
+            # Directory entries (pubspec asset folders) reference nothing by themselves
+            literals.add(asset)
+        else:
+            suffixes.add(asset.lstrip('./'))
+
+    def matches(path):
+        if path in literals or any(regex.match(path) for regex in patterns):
+            return True
+        parts = path.split('/')
+        return any('/'.join(parts[i:]) in suffixes for i in range(1, len(parts)))
+
+    return matches
+
+
+def audit(store=None, root=PROJECT_ROOT):
+    store = store or get_store()
+    root = Path(root)
+    index = scan_tree(root)
+
+    missing = []
+    empty = []
+    referenced = set()
+
+    for name, record_id, field, asset in store.asset_refs():
+        referenced.add(asset)
+        if asset not in index:
+            missing.append({'source': name, 'id': record_id, 'field': field, 'path': asset})
+
+    for name, fields in REQUIRED_ASSET_FIELDS.items():
+        if not store.exists(name):
+            continue
+        for record in store.records(name):
+            for field in fields:
+                if not ref_values(record, field):
+                    empty.append({'source': name, 'id': record['id'], 'field': field})
+
+    for source, asset in i18n_refs(store):
+        referenced.add(asset)
+        if asset not in index:
+            missing.append({'source': source, 'id': None, 'field': None, 'path': asset})
+
+    referenced_by_code = code_reference_matcher(root)
+
+    orphans = []
+    for path, size in sorted(index.items()):
+        if not path.startswith(tuple(directory + '/' for directory in ORPHAN_DIRS)):
+            continue
+        if path in referenced or referenced_by_code(path):
+            continue
+        orphans.append({'path': path, 'bytes': size})
+
+    return {
+        'files': len(index),
+        'missing': missing,
+        'empty': empty,
+        'orphans': orphans,
+        'orphan_bytes': sum(orphan['bytes'] for orphan in orphans),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit asset references against the assets directory.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--json', dest='json_path', help='Also write the full report as JSON')
+    args = parser.parse_args()
+
+    report = audit(get_store(args.input_dir))
+
+    print(f"Scanned files: {report['files']}")
+    print(f"Missing references: {len(report['missing'])}")
+    for item in report['missing']:
+        owner = f"{item['source']} {item['id']}.{item['field']}" if item['id'] else item['source']
+        print(f"- {owner}: {item['path']}")
+    print(f"Empty asset fields: {len(report['empty'])}")
+    for item in report['empty']:
+        print(f"- {item['source']} {item['id']}.{item['field']}")
+    print(f"Orphan files: {len(report['orphans'])} ({report['orphan_bytes'] / 1024 / 1024:.1f} MB)")
+    for item in sorted(report['orphans'], key=lambda orphan: -orphan['bytes']):
+        print(f"- {item['path']} ({item['bytes'] / 1024:.0f} KB)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
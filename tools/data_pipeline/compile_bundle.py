@@ -0,0 +1,227 @@
+"""
+Compiles assets/data into a startup-optimized content bundle.
+
+Each content type becomes a pack file made of independent shards: the base
+datasets share one pack, dialogues get their own pack, and every i18n file gets
+a pack per locale. Dialogues (base and i18n) are split per character (or per
+era) so the app only has to decode the shard it is about to show. Every shard
+is minified JSON with interned strings:
+
+    {"s": [<string table>], "d": <data>}
+
+Inside "d", any key or string value of the form "#<n>" refers to s[n], and a
+literal string that starts with "#" is stored with one extra leading "#".
+
+manifest.json lists, for every pack, its size and sha256 plus the byte offset,
+length, sha256 and entry count of each shard; sharded packs also carry an
+index from record id to shard name.
+
+The bundle goes to build/content_bundle (gitignored), not under assets/: no
+loader reads the packs yet, so shipping them would only grow the app.
+
+Usage:
+    python3 tools/data_pipeline/compile_bundle.py [--shard-by character|era] [--output-dir build/content_bundle]
+"""
+
+import argparse
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+
+from content_store import DATASET_FILES, PROJECT_ROOT, UNASSIGNED_SHARD, dialogue_shard_key, get_store
+
+BUNDLE_VERSION = 1
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'build' / 'content_bundle'
+INTERN_PREFIX = '#'
+MANIFEST_NAME = 'manifest.json'
+
+
+def _walk_strings(value, counts):
+    if isinstance(value, str):
+        counts[value] += 1
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            counts[key] += 1
+            _walk_strings(item, counts)
+    elif isinstance(value, list):
+        for item in value:
+            _walk_strings(item, counts)
+
+
+def _escape(text):
+    return INTERN_PREFIX + text if text.startswith(INTERN_PREFIX) else text
+
+
+def build_string_table(data):
+    """Strings worth interning, most frequent first (so they get the shortest refs)."""
+    counts = Counter()
+    _walk_strings(data, counts)
+
+    table = []
+    for text, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        if count < 2:
+            break
+        encoded = len(json.dumps(_escape(text), ensure_ascii=False))
+        ref = len(f'"{INTERN_PREFIX}{len(table)}"')
+        # Each use saves (encoded - ref); the table entry costs encoded + separator
+        if count * (encoded - ref) > encoded + 1:
+            table.append(text)
+    return table
+
+
+def intern(value, refs):
+    if isinstance(value, str):
+        return refs.get(value) or _escape(value)
+    if isinstance(value, dict):
+        return {refs.get(key) or _escape(key): intern(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern(item, refs) for item in value]
+    return value
+
+
+def encode_shard(data):
+    table = build_string_table(data)
+    refs = {text: f'{INTERN_PREFIX}{index}' for index, text in enumerate(table)}
+    shard = {'s': table, 'd': intern(data, refs)}
+    return json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_shard(raw):
+    """Reference decoder for the shard format (mirrors what the app does)."""
+    shard = json.loads(raw)
+    table = shard['s']
+
+    def resolve(text):
+        if text.startswith(INTERN_PREFIX * 2):
+            return text[1:]
+        if text.startswith(INTERN_PREFIX):
+            return table[int(text[1:])]
+        return text
+
+    def walk(value):
+        if isinstance(value, str):
+            return resolve(value)
+        if isinstance(value, dict):
+            return {resolve(key): walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        return value
+
+    return walk(shard['d'])
+
+
+def write_pack(output_dir, relpath, shards, index=None):
+    """Concatenates encoded shards into one pack file and returns its manifest entry."""
+    pack = bytearray()
+    entries = {}
+    for name, data in shards.items():
+        raw = encode_shard(data)
+        entries[name] = {
+            'offset': len(pack),
+            'length': len(raw),
+            'sha256': hashlib.sha256(raw).hexdigest(),
+            'count': len(data),
+        }
+        pack += raw
+
+    path = output_dir / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(pack)
+
+    entry = {
+        'path': relpath,
+        'bytes': len(pack),
+        'sha256': hashlib.sha256(pack).hexdigest(),
+        'shards': entries,
+    }
+    if index is not None:
+        entry['index'] = index
+    return entry
+
+
+def dialogue_shard_keys(store, shard_by):
+    """Maps dialogue id -> shard name (character id or era id)."""
+    return {dialogue['id']: dialogue_shard_key(dialogue, store, shard_by) for dialogue in store.records('dialogues')}
+
+
+def shard_records(records, shard_keys):
+    """Splits a list of records, or a dict keyed by record id, into shards of the same shape.
+
+    Record order is kept within each shard.
+    """
+    shards = {}
+    if isinstance(records, dict):
+        for record_id, record in records.items():
+            shards.setdefault(shard_keys.get(record_id, UNASSIGNED_SHARD), {})[record_id] = record
+    else:
+        for record in records:
+            shards.setdefault(shard_keys.get(record['id'], UNASSIGNED_SHARD), []).append(record)
+    return dict(sorted(shards.items()))
+
+
+def locales(store):
+    return sorted(path.name for path in store.path('i18n').iterdir() if path.is_dir())
+
+
+def compile_bundle(store, output_dir, shard_by='character'):
+    output_dir = Path(output_dir)
+    packs = {}
+
+    base = {name: store.raw(name) for name in DATASET_FILES if name != 'dialogues' and store.exists(name)}
+    packs['base'] = write_pack(output_dir, 'base.pack', base)
+
+    shard_keys = dialogue_shard_keys(store, shard_by)
+    packs['dialogues'] = write_pack(
+        output_dir, 'dialogues.pack', shard_records(store.raw('dialogues'), shard_keys), shard_keys
+    )
+
+    for locale in locales(store):
+        for path in sorted(store.path(f'i18n/{locale}').glob('*.json')):
+            content_type = path.stem
+            records = store.document(f'i18n/{locale}/{path.name}')
+            relpath = f'{locale}/{content_type}.pack'
+            if content_type == 'dialogues':
+                shards = shard_records(records, shard_keys)
+                index = {record_id: shard_keys.get(record_id, UNASSIGNED_SHARD) for record_id in records}
+                packs[f'{locale}/{content_type}'] = write_pack(output_dir, relpath, shards, index)
+            else:
+                packs[f'{locale}/{content_type}'] = write_pack(output_dir, relpath, {'all': records})
+
+    manifest = {
+        'version': BUNDLE_VERSION,
+        'shardBy': shard_by,
+        'internPrefix': INTERN_PREFIX,
+        'packs': packs,
+    }
+    with open(output_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        # Read at startup, so minified like the shards
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    return manifest
+
+
+def source_bytes(store):
+    paths = [store.path(relpath) for relpath in DATASET_FILES.values()]
+    paths += list(store.path('i18n').glob('*/*.json'))
+    return sum(path.stat().st_size for path in paths if path.exists())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile content JSON into minified, sharded packs.')
+    parser.add_argument('--input-dir', default='assets/data', help='Input directory')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='Output directory')
+    parser.add_argument('--shard-by', choices=['character', 'era'], default='character',
+                        help='How dialogue i18n content is split into shards')
+    args = parser.parse_args()
+
+    store = get_store(args.input_dir)
+    manifest = compile_bundle(store, args.output_dir, args.shard_by)
+
+    total = sum(pack['bytes'] for pack in manifest['packs'].values())
+    print(f"Packs: {len(manifest['packs'])}, shards: "
+          f"{sum(len(pack['shards']) for pack in manifest['packs'].values())}")
+    print(f'Source JSON: {source_bytes(store) / 1024:.0f} KB -> bundle: {total / 1024:.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
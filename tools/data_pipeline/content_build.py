@@ -0,0 +1,300 @@
+"""
+Incremental build graph for the content toolchain.
+
+Every step declares the files it reads and writes and the tool command that
+produces them. After a step succeeds, the fingerprints (mtime, size, sha256) of
+those files are recorded in .cache/content_build.json. A step is stale when
+its command changed, an output is missing, or one of its files no longer
+matches its fingerprint (mtime and size are checked first; only files whose
+stat changed are re-hashed). Only stale steps run.
+
+A step depends on every earlier step that writes one of its inputs. Steps run
+in dependency order, independent ones in parallel. Because fingerprints
+compare content, a step whose upstream rewrote identical bytes is skipped.
+
+Usage:
+    python3 tools/data_pipeline/content_build.py [step ...] [--force] [--jobs N] [--dry-run]
+"""
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from compile_bundle import DEFAULT_OUTPUT_DIR as BUNDLE_DIR
+from content_store import DATASET_FILES, PROJECT_ROOT, write_json
+from transform_engine import TRANSFORMS, transform_inputs, transform_outputs
+
+PIPELINE_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_PATH = PIPELINE_DIR / '.cache' / 'content_build.json'
+CLEANED_DIR = PIPELINE_DIR / 'cleaned'
+MIGRATE_SCRIPT = PROJECT_ROOT / 'tools' / 'supabase' / 'migrate_data.py'
+MERGE_SOURCES = {
+    'characters.json': 'generated/characters_europe_generated.json',
+    'encyclopedia.json': 'generated/encyclopedia_europe_generated.json',
+}
+
+
+def migrate_inputs():
+    """Files uploaded by migrate_data.py, from its DATASETS table.
+
+    The table is read from the script's source: importing the script exits when
+    the Supabase client is not installed.
+    """
+    tree = ast.parse(MIGRATE_SCRIPT.read_text(encoding='utf-8'))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, 'id', None) == 'DATASETS' for target in node.targets):
+            datasets = ast.literal_eval(node.value)
+            return [PROJECT_ROOT / 'assets' / 'data' / config['file'] for config in datasets.values()]
+    raise ValueError(f'no DATASETS table in {MIGRATE_SCRIPT}')
+
+
+def build_steps(data_dir='assets/data', shard_by='character'):
+    """Steps in declaration order; inputs/outputs are paths or (directory, glob) pairs.
+
+    Steps with 'default': False only run when named explicitly.
+    """
+    data_dir = (PROJECT_ROOT / data_dir).resolve()
+    datasets = [data_dir / relpath for relpath in DATASET_FILES.values()]
+
+    steps = [{
+        'name': 'merge',
+        'command': [PIPELINE_DIR / 'merge_data.py', '--input-dir', data_dir],
+        'inputs': [data_dir / relpath for pair in MERGE_SOURCES.items() for relpath in pair],
+        'outputs': [data_dir / relpath for relpath in MERGE_SOURCES],
+    }, {
+        'name': 'cleanup',
+        'command': [PIPELINE_DIR / 'cleanup_missing_references.py', '--input-dir', data_dir,
+                    '--output-dir', CLEANED_DIR],
+        'inputs': datasets,
+        'outputs': [CLEANED_DIR / relpath for relpath in DATASET_FILES.values()],
+    }]
+
+    for name in TRANSFORMS:
+        steps.append({
+            'name': f'transform:{name}',
+            # No dialogue shards: the app only reads the full i18n maps
+            'command': [PIPELINE_DIR / 'transform_engine.py', name, '--input-dir', data_dir, '--no-cache'],
+            'inputs': [data_dir / relpath for relpath in transform_inputs(name, None)],
+            'outputs': [data_dir / relpath for relpath in transform_outputs(name)],
+        })
+
+    steps += [{
+        'name': 'bundle',
+        'command': [PIPELINE_DIR / 'compile_bundle.py', '--input-dir', data_dir,
+                    '--output-dir', BUNDLE_DIR, '--shard-by', shard_by],
+        'inputs': datasets + [(data_dir, 'i18n/*/*.json')],
+        'outputs': [BUNDLE_DIR / 'manifest.json', (BUNDLE_DIR, '**/*.pack')],
+    }, {
+        # Needs Supabase credentials; only uploads rows whose checksum changed
+        'name': 'migrate',
+        # migrate_data.py always reads assets/data, whatever --input-dir is
+        'command': [MIGRATE_SCRIPT, '--delta'],
+        'inputs': migrate_inputs(),
+        'outputs': [],
+        'default': False,
+    }]
+    return steps
+
+
+# -- Files and fingerprints ----------------------------------------------
+
+def expand(entries):
+    paths = []
+    for entry in entries:
+        if isinstance(entry, tuple):
+            directory, pattern = entry
+            paths += sorted(path for path in directory.glob(pattern) if path.is_file())
+        else:
+            paths.append(entry)
+    return paths
+
+
+def _overlaps(a, b):
+    """Whether two path-or-glob entries can name the same file (two globs never do here)."""
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return False
+    if isinstance(b, tuple):
+        a, b = b, a
+    if isinstance(a, tuple):
+        directory, pattern = a
+        return b.is_relative_to(directory) and fnmatch.fnmatch(b.relative_to(directory).as_posix(), pattern)
+    return a == b
+
+
+def _key(path):
+    return path.relative_to(PROJECT_ROOT).as_posix() if path.is_relative_to(PROJECT_ROOT) else path.as_posix()
+
+
+def fingerprint(path, previous=None):
+    """[mtime_ns, size, sha256] of a file, or None if it does not exist.
+
+    Reuses the previous fingerprint when mtime and size are unchanged.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    if previous and previous[:2] == [stat.st_mtime_ns, stat.st_size]:
+        return previous
+    with open(path, 'rb') as f:
+        return [stat.st_mtime_ns, stat.st_size, hashlib.file_digest(f, 'sha256').hexdigest()]
+
+
+def command_line(step):
+    return ' '.join(str(part) for part in step['command'])
+
+
+def step_files(step, recorded=None):
+    recorded = recorded or {}
+    paths = expand(step['inputs']) + expand(step['outputs'])
+    return {_key(path): fingerprint(path, recorded.get(_key(path))) for path in paths}
+
+
+def stale_reason(step, record):
+    """Why a step has to run, or None if it is up to date."""
+    if not record:
+        return 'never built'
+    if record['command'] != command_line(step):
+        return 'command changed'
+    for path in expand(step['outputs']):
+        if not path.exists():
+            return f'missing {_key(path)}'
+
+    files = step_files(step, record['files'])
+    changed = sorted(
+        path for path in files.keys() | record['files'].keys()
+        if (files.get(path) or [None] * 3)[2] != (record['files'].get(path) or [None] * 3)[2]
+    )
+    if changed:
+        return f"changed {changed[0]}" + (f' (+{len(changed) - 1} more)' if len(changed) > 1 else '')
+    return None
+
+
+# -- Graph ---------------------------------------------------------------
+
+def dependencies(steps):
+    """Maps step name -> names of earlier steps writing one of its inputs."""
+    deps = {}
+    for position, step in enumerate(steps):
+        deps[step['name']] = {
+            earlier['name'] for earlier in steps[:position]
+            if any(_overlaps(output, entry) for output in earlier['outputs'] for entry in step['inputs'])
+        }
+    return deps
+
+
+def select_steps(steps, targets=None):
+    """Requested steps (default steps if none) plus everything upstream of them."""
+    deps = dependencies(steps)
+    wanted = set(targets or [step['name'] for step in steps if step.get('default', True)])
+    stack = list(wanted)
+    while stack:
+        for dep in deps[stack.pop()] - wanted:
+            wanted.add(dep)
+            stack.append(dep)
+    return [step for step in steps if step['name'] in wanted]
+
+
+def run_step(step):
+    """Runs a step's command from the project root. Returns (ok, output)."""
+    command = [sys.executable] + [str(part) for part in step['command']]
+    result = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return result.returncode == 0, result.stdout + result.stderr
+
+
+def run_build(steps, targets=None, jobs=None, force=False, dry_run=False, cache_path=DEFAULT_CACHE_PATH):
+    """Runs the stale steps of the selected graph. Returns {step name: status}.
+
+    status is 'ran', 'skipped', 'failed', 'blocked' (an upstream step failed) or,
+    for dry runs, 'stale'.
+    """
+    cache_path = Path(cache_path)
+    cache = json.loads(cache_path.read_text(encoding='utf-8')) if cache_path.exists() else {}
+    steps = select_steps(steps, targets)
+    deps = dependencies(steps)
+    status = {}
+    lock = threading.Lock()
+
+    def process(step):
+        record = cache.get(step['name'])
+        upstream_ran = any(status[dep] in ('ran', 'stale') for dep in deps[step['name']])
+        reason = 'forced' if force else stale_reason(step, record)
+        if dry_run:
+            if reason or upstream_ran:
+                print(f"[{step['name']}] stale: {reason or 'after upstream steps'}")
+                return 'stale'
+            return 'skipped'
+        if not reason:
+            return 'skipped'
+
+        started = time.monotonic()
+        ok, output = run_step(step)
+        with lock:
+            print(f"[{step['name']}] {'ran' if ok else 'FAILED'} ({reason}) in {time.monotonic() - started:.1f}s")
+            for line in output.splitlines():
+                print(f'    {line}')
+        if not ok:
+            return 'failed'
+        with lock:
+            cache[step['name']] = {'command': command_line(step), 'files': step_files(step)}
+        return 'ran'
+
+    pending = {step['name']: step for step in steps}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while pending or running:
+            for name, step in list(pending.items()):
+                if any(dep not in status for dep in deps[name]):
+                    continue
+                del pending[name]
+                if any(status[dep] in ('failed', 'blocked') for dep in deps[name]):
+                    status[name] = 'blocked'
+                else:
+                    running[executor.submit(process, step)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                status[running.pop(future)] = future.result()
+
+    if not dry_run:
+        write_json(cache_path, cache, indent=2)
+    return {step['name']: status[step['name']] for step in steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the content outputs whose inputs changed.')
+    parser.add_argument('steps', nargs='*', metavar='step', help='Steps to build (default: all default steps)')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--shard-by', choices=['character', 'era'], default='character',
+                        help='How dialogue content is split into bundle packs')
+    parser.add_argument('--jobs', type=int, default=None, help='Steps run in parallel (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Run every selected step')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the stale steps')
+    args = parser.parse_args()
+
+    steps = build_steps(args.input_dir, args.shard_by)
+    unknown = set(args.steps) - {step['name'] for step in steps}
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(sorted(unknown))}; "
+                     f"available: {', '.join(step['name'] for step in steps)}")
+
+    results = run_build(steps, args.steps, args.jobs, args.force, args.dry_run)
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    print(', '.join(f'{count} {result}' for result, count in counts.items()))
+    if 'failed' in counts:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Typed content graph for reference-integrity checks and repairs.
+
+Every record of every dataset is a node keyed by (dataset, id); every value of
+a REFERENCE_FIELDS field is an edge (source node, field, target node), built
+in a single pass over the records. Dangling edges, duplicate edges, missing
+reciprocal edges, empty reference fields and connected components are then
+linear queries over the same edge lists, so every tool agrees on the edge
+cases: an empty string or None is no reference, a repeated value in a list
+field is a duplicate edge, and the first record with a given id owns it.
+
+Usage:
+    from content_graph import ContentGraph
+
+    graph = ContentGraph(store)
+    for edge in graph.dangling():
+        print(edge.source, edge.field, edge.target)
+    graph.remove_dangling()
+    graph.add_reciprocals()
+"""
+
+import argparse
+import json
+from collections import Counter, namedtuple
+
+from content_store import DATASET_FILES, REFERENCE_FIELDS, get_store, ref_values
+
+# (dataset, field) whose edges imply an edge back on the target:
+# source field -> (target dataset, reciprocal field)
+RECIPROCAL_FIELDS = {
+    ('characters', 'relatedLocationIds'): ('locations', 'characterIds'),
+    ('locations', 'characterIds'): ('characters', 'relatedLocationIds'),
+    # A dialogue's speaker lists it; characters may share dialogues, so not the reverse
+    ('dialogues', 'characterId'): ('characters', 'dialogueIds'),
+}
+
+Edge = namedtuple('Edge', 'source field target')
+
+
+class ContentGraph:
+    """Nodes and reference edges of a ContentStore.
+
+    Repairs edit the store's records in place and rebuild the graph; callers
+    save the datasets they want to persist.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_store()
+        self.build()
+
+    def build(self):
+        self.store.invalidate()
+        self.nodes = {}
+        self.duplicate_nodes = []
+        self.edges = []
+        self.out_edges = {}
+        self.in_edges = {}
+
+        for name in DATASET_FILES:
+            if not self.store.exists(name):
+                continue
+            fields = REFERENCE_FIELDS.get(name, {})
+            for record in self.store.records(name):
+                node = (name, record['id'])
+                if node in self.nodes:
+                    self.duplicate_nodes.append(node)
+                    continue
+                self.nodes[node] = record
+                for field, target in fields.items():
+                    for value in ref_values(record, field):
+                        edge = Edge(node, field, (target, value))
+                        self.edges.append(edge)
+                        self.out_edges.setdefault(node, []).append(edge)
+                        self.in_edges.setdefault(edge.target, []).append(edge)
+
+    # -- Queries -----------------------------------------------------------
+
+    def targets(self, node, field):
+        return [edge.target for edge in self.out_edges.get(node, []) if edge.field == field]
+
+    def sources(self, node, field=None):
+        return [edge.source for edge in self.in_edges.get(node, []) if field in (None, edge.field)]
+
+    def dangling(self):
+        """Edges whose target record does not exist."""
+        return [edge for edge in self.edges if edge.target not in self.nodes]
+
+    def duplicates(self):
+        """Repeated edges (the same value listed twice in one field), after the first."""
+        seen = set()
+        duplicates = []
+        for edge in self.edges:
+            if edge in seen:
+                duplicates.append(edge)
+            seen.add(edge)
+        return duplicates
+
+    def missing_reciprocals(self):
+        """(edge, reciprocal edge) for edges whose existing target lacks the edge back."""
+        existing = set(self.edges)
+        missing = []
+        for edge in self.edges:
+            rule = RECIPROCAL_FIELDS.get((edge.source[0], edge.field))
+            if rule is None or edge.target not in self.nodes:
+                continue
+            reciprocal = Edge(edge.target, rule[1], edge.source)
+            if reciprocal not in existing:
+                existing.add(reciprocal)
+                missing.append((edge, reciprocal))
+        return missing
+
+    def empty_fields(self, name, field):
+        """Nodes of a dataset without any edge on field."""
+        linked = {edge.source for edge in self.edges if edge.field == field and edge.source[0] == name}
+        return [node for node in self.nodes if node[0] == name and node not in linked]
+
+    def components(self):
+        """Connected components over the resolvable edges, largest first."""
+        parent = {node: node for node in self.nodes}
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for edge in self.edges:
+            if edge.target in parent:
+                parent[find(edge.source)] = find(edge.target)
+
+        groups = {}
+        for node in self.nodes:
+            groups.setdefault(find(node), []).append(node)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    # -- Repairs -----------------------------------------------------------
+
+    def remove_dangling(self, fields=None):
+        """Drops dangling and duplicate edges; returns removed counts per 'dataset.field'.
+
+        List fields keep their first-seen order; dangling scalar fields become None.
+        Only the given (dataset, field) pairs are touched (default: all of them).
+        """
+        bad = set(self.dangling())
+        bad_fields = {(edge.source, edge.field) for edge in bad}
+        bad_fields |= {(edge.source, edge.field) for edge in self.duplicates()}
+        wanted = None if fields is None else set(fields)
+
+        removed = Counter()
+        for node, field in bad_fields:
+            if wanted is not None and (node[0], field) not in wanted:
+                continue
+            record = self.nodes[node]
+            value = record.get(field)
+            if isinstance(value, list):
+                target = REFERENCE_FIELDS[node[0]][field]
+                kept = list(dict.fromkeys(item for item in value if Edge(node, field, (target, item)) not in bad))
+                removed[f'{node[0]}.{field}'] += len(value) - len(kept)
+                record[field] = kept
+            else:
+                record[field] = None
+                removed[f'{node[0]}.{field}'] += 1
+
+        if removed:
+            self.build()
+        return dict(removed)
+
+    def add_reciprocals(self, fields=None):
+        """Appends missing reciprocal references; returns the added edges."""
+        wanted = None if fields is None else set(fields)
+        added = []
+        for edge, reciprocal in self.missing_reciprocals():
+            if wanted is not None and (edge.source[0], edge.field) not in wanted:
+                continue
+            # Reciprocal fields are list fields
+            record = self.nodes[reciprocal.source]
+            if not record.get(reciprocal.field):
+                record[reciprocal.field] = []
+            record[reciprocal.field].append(reciprocal.target[1])
+            added.append(reciprocal)
+
+        if added:
+            self.build()
+        return added
+
+
+def report(graph):
+    dangling = graph.dangling()
+    components = graph.components()
+    return {
+        'nodes': len(graph.nodes),
+        'edges': len(graph.edges),
+        'duplicateNodes': [list(node) for node in graph.duplicate_nodes],
+        'dangling': [{'source': list(e.source), 'field': e.field, 'target': list(e.target)} for e in dangling],
+        'duplicateEdges': [{'source': list(e.source), 'field': e.field, 'target': list(e.target)}
+                           for e in graph.duplicates()],
+        'missingReciprocals': [{'source': list(r.source), 'field': r.field, 'target': list(r.target)}
+                               for _, r in graph.missing_reciprocals()],
+        'components': len(components),
+        'isolated': [list(component[0]) for component in components if len(component) == 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check (and optionally repair) content references.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--fix', action='store_true',
+                        help='Remove dangling/duplicate references, add reciprocal ones and save')
+    parser.add_argument('--json', dest='json_path', help='Also write the full report as JSON')
+    args = parser.parse_args()
+
+    store = get_store(args.input_dir)
+    graph = ContentGraph(store)
+    result = report(graph)
+
+    print(f"Nodes: {result['nodes']}, edges: {result['edges']}, components: {result['components']} "
+          f"({len(result['isolated'])} isolated)")
+    print(f"Duplicate ids: {len(result['duplicateNodes'])}")
+    dangling = Counter(f"{edge['source'][0]}.{edge['field']}" for edge in result['dangling'])
+    print(f"Dangling references: {len(result['dangling'])}")
+    for key, count in sorted(dangling.items()):
+        print(f'- {key}: {count}')
+    print(f"Duplicate references: {len(result['duplicateEdges'])}")
+    print(f"Missing reciprocal references: {len(result['missingReciprocals'])}")
+
+    if args.fix:
+        removed = graph.remove_dangling()
+        added = graph.add_reciprocals()
+        changed = {key.split('.')[0] for key in removed} | {edge.source[0] for edge in added}
+        for name in sorted(changed):
+            store.save(name)
+        print(f'Removed {sum(removed.values())} references, added {len(added)} reciprocal references')
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Shared in-memory content store for the data pipeline scripts.
+
+Loads each file under assets/data at most once per process and builds hash
+indexes (by id, eraId, characterId) plus reverse-reference maps on demand, so
+chained tools can query one decoded copy instead of rescanning the JSON.
+
+Usage:
+    from content_store import get_store
+
+    store = get_store()
+    sejong = store.get('characters', 'sejong')
+    dialogues = store.by_character('dialogues')['sejong']
+    referrers = store.referrers('locations', 'gyeongbokgung')
+"""
+
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from json_stream import iter_array
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DATA_DIR = PROJECT_ROOT / 'assets' / 'data'
+
+# Dataset name -> file (relative to the data dir)
+DATASET_FILES = {
+    'characters': 'characters.json',
+    'dialogues': 'dialogues.json',
+    'locations': 'locations.json',
+    'encyclopedia': 'encyclopedia.json',
+    'quizzes': 'quizzes.json',
+}
+
+# Dataset -> {reference field: target dataset}
+# List fields and scalar fields are both supported.
+REFERENCE_FIELDS = {
+    'characters': {
+        'dialogueIds': 'dialogues',
+        'relatedCharacterIds': 'characters',
+        'relatedLocationIds': 'locations',
+    },
+    'dialogues': {
+        'characterId': 'characters',
+    },
+    'locations': {
+        'characterIds': 'characters',
+        'eventIds': 'encyclopedia',
+    },
+    'encyclopedia': {
+        'relatedEntryIds': 'encyclopedia',
+    },
+    'quizzes': {
+        'relatedFactId': 'encyclopedia',
+        'relatedDialogueId': 'dialogues',
+        'relatedCharacterId': 'characters',
+        'relatedLocationId': 'locations',
+    },
+}
+
+# Dataset -> fields holding asset paths (relative to the project root)
+ASSET_FIELDS = {
+    'characters': ['portraitAsset', 'emotionAssets'],
+    'locations': ['thumbnailAsset', 'backgroundAsset'],
+    'encyclopedia': ['thumbnailAsset', 'imageAsset'],
+}
+
+
+# Shard name for dialogues whose character (or era) is unknown
+UNASSIGNED_SHARD = '_unassigned'
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data, indent=4):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def ref_values(record, field):
+    """Returns the referenced ids of a list or scalar field as a list."""
+    value = record.get(field)
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def dialogue_shard_key(dialogue, store, shard_by='character'):
+    """Shard a dialogue belongs to: its characterId, or that character's eraId."""
+    character_id = dialogue.get('characterId') or None
+    if shard_by == 'era':
+        character = store.get('characters', character_id) if character_id else None
+        return (character or {}).get('eraId') or UNASSIGNED_SHARD
+    return character_id or UNASSIGNED_SHARD
+
+
+class ContentStore:
+    """Lazily decoded content files with cached indexes.
+
+    Records are returned by reference: scripts may mutate them in place, but
+    must call invalidate() afterwards if they changed ids or reference fields.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, snapshots=True):
+        self.data_dir = Path(data_dir)
+        self.snapshots = snapshots
+        self._snapshot_id = None
+        self._documents = {}
+        self._indexes = {}
+
+    # -- Documents -------------------------------------------------------
+
+    def path(self, relpath):
+        return self.data_dir / relpath
+
+    def exists(self, name_or_relpath):
+        relpath = DATASET_FILES.get(name_or_relpath, name_or_relpath)
+        return relpath in self._documents or self.path(relpath).exists()
+
+    def document(self, relpath):
+        """Decoded contents of data_dir/relpath, parsed once per store."""
+        if relpath not in self._documents:
+            self._documents[relpath] = load_json(self.path(relpath))
+        return self._documents[relpath]
+
+    def raw(self, name):
+        """Top-level document of a dataset (a dict for quizzes, a list otherwise)."""
+        return self.document(DATASET_FILES[name])
+
+    def stream(self, name_or_relpath):
+        """Iterates a top-level array without decoding the whole file.
+
+        Uses the cached document if one is loaded, so in-memory edits are seen.
+        """
+        relpath = DATASET_FILES.get(name_or_relpath, name_or_relpath)
+        if relpath in self._documents:
+            return iter(self._documents[relpath])
+        return iter_array(self.path(relpath))
+
+    def replace(self, name_or_relpath, data):
+        relpath = DATASET_FILES.get(name_or_relpath, name_or_relpath)
+        self._documents[relpath] = data
+        self.invalidate()
+
+    def snapshot(self, name_or_relpath):
+        """Adds the file as it is on disk to this store's snapshot (one per run, see snapshot_store)."""
+        relpath = DATASET_FILES.get(name_or_relpath, name_or_relpath)
+        if not self.snapshots or not self.path(relpath).exists():
+            return None
+        from snapshot_store import SnapshotStore
+        self._snapshot_id = SnapshotStore(self.data_dir).capture([relpath], self._snapshot_id)
+        return self._snapshot_id
+
+    def save(self, name_or_relpath, path=None, indent=4):
+        relpath = DATASET_FILES.get(name_or_relpath, name_or_relpath)
+        if path is None:
+            self.snapshot(relpath)
+        write_json(path or self.path(relpath), self.document(relpath), indent=indent)
+
+    # -- Records and indexes ---------------------------------------------
+
+    def records(self, name):
+        """Flat list of entity dicts; quizzes are unnested from their categories."""
+        key = ('records', name)
+        if key not in self._indexes:
+            data = self.raw(name)
+            if name == 'quizzes' and isinstance(data, dict):
+                data = [quiz for category in data.get('categories', []) for quiz in category.get('quizzes', [])]
+            self._indexes[key] = data
+        return self._indexes[key]
+
+    def by_id(self, name):
+        key = ('id', name)
+        if key not in self._indexes:
+            index = {}
+            for record in self.records(name):
+                # First occurrence wins, like a linear next(...) scan
+                index.setdefault(record['id'], record)
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def get(self, name, record_id, default=None):
+        return self.by_id(name).get(record_id, default)
+
+    def ids(self, name):
+        return self.by_id(name).keys()
+
+    def index(self, name, field):
+        """Maps each value of a scalar field to the records carrying it."""
+        key = ('field', name, field)
+        if key not in self._indexes:
+            index = defaultdict(list)
+            for record in self.records(name):
+                value = record.get(field)
+                if value is not None:
+                    index[value].append(record)
+            self._indexes[key] = dict(index)
+        return self._indexes[key]
+
+    def by_era(self, name):
+        return self.index(name, 'eraId')
+
+    def by_character(self, name='dialogues'):
+        return self.index(name, 'characterId')
+
+    def reverse_refs(self, target):
+        """Maps each id of the target dataset to [(source dataset, field, source id)]."""
+        key = ('reverse', target)
+        if key not in self._indexes:
+            reverse = defaultdict(list)
+            for source, fields in REFERENCE_FIELDS.items():
+                wanted = [field for field, field_target in fields.items() if field_target == target]
+                if not wanted or not self.exists(source):
+                    continue
+                for record in self.records(source):
+                    for field in wanted:
+                        for value in ref_values(record, field):
+                            reverse[value].append((source, field, record['id']))
+            self._indexes[key] = dict(reverse)
+        return self._indexes[key]
+
+    def referrers(self, target, target_id):
+        return self.reverse_refs(target).get(target_id, [])
+
+    def asset_refs(self):
+        """Yields (dataset, record id, field, asset path) for every asset reference."""
+        for name, fields in ASSET_FIELDS.items():
+            if not self.exists(name):
+                continue
+            for record in self.records(name):
+                for field in fields:
+                    for path in ref_values(record, field):
+                        yield name, record['id'], field, path
+
+    def invalidate(self):
+        """Drops derived indexes after in-place edits; decoded documents are kept."""
+        self._indexes.clear()
+
+    def discard(self, name_or_relpath):
+        """Forgets a decoded document after its file was rewritten on disk."""
+        self._documents.pop(DATASET_FILES.get(name_or_relpath, name_or_relpath), None)
+        self.invalidate()
+
+
+_stores = {}
+
+
+def get_store(data_dir=DEFAULT_DATA_DIR):
+    """Process-wide store per data dir, shared by tools chained in one run."""
+    key = Path(data_dir).resolve()
+    if key not in _stores:
+        _stores[key] = ContentStore(key)
+    return _stores[key]
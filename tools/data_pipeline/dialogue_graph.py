@@ -0,0 +1,286 @@
+"""
+Dialogue graph analyzer.
+
+Each dialogue is a graph of nodes: a node with choices moves to each choice's
+nextNodeId, a node without choices moves to its own nextNodeId, and an isEnd
+node finishes the dialogue. Playback starts at the node with id 'start' (or
+the first node), mirroring Dialogue.startNode in the app.
+
+For every dialogue, the adjacency index is built once and then used to find:
+
+- unreachable nodes (never visited from the start node)
+- dangling nextNodeIds (the app ends the dialogue early there)
+- dead ends: reachable non-end nodes without a way forward (the app stalls)
+- traps: reachable nodes from which no end node can be reached
+- cycles (strongly connected components)
+- the shortest path to an end, the longest one (None if a cycle makes it
+  unbounded) and the min/max knowledgePoints a playthrough can earn
+
+Knowledge counts choice rewards and the rewards of every node entered after
+the start node, which is what DialogueViewModel grants.
+Dialogues are analyzed in parallel worker processes.
+
+Usage:
+    python3 tools/data_pipeline/dialogue_graph.py [--jobs N] [--json report.json] [--strict]
+"""
+
+import argparse
+import heapq
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from content_store import get_store
+
+START_NODE_ID = 'start'
+ISSUE_KEYS = ('unreachable', 'dangling', 'deadEnds', 'traps', 'cycles')
+
+
+def _points(reward):
+    return (reward or {}).get('knowledgePoints', 0) or 0
+
+
+def build_index(dialogue):
+    """Returns (nodes by id, {node id: [(target id, knowledge points, choice id or None)]})."""
+    nodes = {}
+    for node in dialogue.get('nodes', []):
+        nodes.setdefault(node['id'], node)
+
+    adjacency = {}
+    for node_id, node in nodes.items():
+        edges = []
+        if not node.get('isEnd'):
+            if node.get('choices'):
+                for choice in node['choices']:
+                    target = choice.get('nextNodeId')
+                    entered = _points(nodes[target].get('reward')) if target in nodes else 0
+                    edges.append((target, _points(choice.get('reward')) + entered, choice.get('id')))
+            elif node.get('nextNodeId'):
+                target = node['nextNodeId']
+                entered = _points(nodes[target].get('reward')) if target in nodes else 0
+                edges.append((target, entered, None))
+        adjacency[node_id] = edges
+    return nodes, adjacency
+
+
+def start_node(nodes):
+    if START_NODE_ID in nodes:
+        return START_NODE_ID
+    return next(iter(nodes), None)
+
+
+def _reach(roots, neighbours):
+    seen = set(roots)
+    queue = deque(roots)
+    while queue:
+        for target in neighbours(queue.popleft()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def strongly_connected(nodes, successors):
+    """Tarjan's algorithm without recursion; yields each component as a list."""
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(successors(root)))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+def analyze_dialogue(dialogue):
+    nodes, adjacency = build_index(dialogue)
+    start = start_node(nodes)
+
+    def successors(node_id):
+        return [target for target, _, _ in adjacency[node_id] if target in nodes]
+
+    reverse = {node_id: [] for node_id in nodes}
+    for node_id in nodes:
+        for target in successors(node_id):
+            reverse[target].append(node_id)
+
+    ends = [node_id for node_id, node in nodes.items() if node.get('isEnd')]
+    reachable = _reach([start], successors) if start else set()
+    finishing = _reach(ends, lambda node_id: reverse[node_id])
+
+    dangling = [
+        {'node': node_id, 'target': target, 'choice': choice}
+        for node_id, edges in adjacency.items()
+        for target, _, choice in edges
+        if target not in nodes
+    ]
+    dead_ends = [
+        node_id for node_id in nodes
+        if node_id in reachable and not nodes[node_id].get('isEnd') and not adjacency[node_id]
+    ]
+    cycles = [
+        sorted(component) for component in strongly_connected(nodes, successors)
+        if len(component) > 1 or component[0] in successors(component[0])
+    ]
+
+    # Playable part of the graph: reachable from the start and able to finish
+    live = reachable & finishing
+    live_cyclic = any(set(component) & live for component in cycles)
+
+    shortest_path = None
+    if start in live:
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            node_id = queue.popleft()
+            if nodes[node_id].get('isEnd'):
+                shortest_path = []
+                while node_id is not None:
+                    shortest_path.append(node_id)
+                    node_id = parents[node_id]
+                shortest_path.reverse()
+                break
+            for target in successors(node_id):
+                if target in live and target not in parents:
+                    parents[target] = node_id
+                    queue.append(target)
+
+    knowledge = {'min': None, 'max': None}
+    longest = None
+    if start in live:
+        # Minimum over any playthrough (non-negative weights, cycles allowed)
+        best = {start: 0}
+        heap = [(0, start)]
+        while heap:
+            points, node_id = heapq.heappop(heap)
+            if points > best[node_id]:
+                continue
+            if nodes[node_id].get('isEnd'):
+                knowledge['min'] = points
+                break
+            for target, weight, _ in adjacency[node_id]:
+                if target in live and points + weight < best.get(target, float('inf')):
+                    best[target] = points + weight
+                    heapq.heappush(heap, (points + weight, target))
+
+        if not live_cyclic:
+            # Longest path and maximum knowledge by DP in reverse topological order
+            order = []
+            visited = {start}
+            work = [(start, iter(successors(start)))]
+            while work:
+                node_id, children = work[-1]
+                for child in children:
+                    if child in live and child not in visited:
+                        visited.add(child)
+                        work.append((child, iter(successors(child))))
+                        break
+                else:
+                    order.append(node_id)
+                    work.pop()
+
+            steps = {}
+            most = {}
+            for node_id in order:
+                options = [
+                    (steps[target] + 1, most[target] + weight)
+                    for target, weight, _ in adjacency[node_id]
+                    if target in live
+                ]
+                if nodes[node_id].get('isEnd') or not options:
+                    steps[node_id], most[node_id] = 0, 0
+                else:
+                    steps[node_id] = max(option[0] for option in options)
+                    most[node_id] = max(option[1] for option in options)
+            longest = steps[start]
+            knowledge['max'] = most[start]
+
+    return {
+        'id': dialogue['id'],
+        'nodes': len(nodes),
+        'start': start,
+        'ends': len(ends),
+        'unreachable': [node_id for node_id in nodes if node_id not in reachable],
+        'dangling': dangling,
+        'deadEnds': dead_ends,
+        'traps': [node_id for node_id in nodes if node_id in reachable and node_id not in finishing],
+        'cycles': cycles,
+        'canFinish': start in live,
+        'shortestPath': shortest_path,
+        'longestPathLength': longest,
+        'knowledgePoints': knowledge,
+    }
+
+
+def analyze_dialogues(dialogues, jobs=None):
+    """Analyzes an iterable of dialogues in worker processes, keeping input order."""
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(analyze_dialogue, dialogues, chunksize=16))
+
+
+def has_issues(result):
+    return not result['canFinish'] or any(result[key] for key in ISSUE_KEYS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check dialogue node graphs for broken branches.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', dest='json_path', help='Also write the per-dialogue report as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 if any dialogue has issues')
+    args = parser.parse_args()
+
+    results = analyze_dialogues(get_store(args.input_dir).stream('dialogues'), args.jobs)
+    broken = [result for result in results if has_issues(result)]
+
+    print(f'Dialogues: {len(results)}, nodes: {sum(result["nodes"] for result in results)}')
+    print(f'Cannot finish: {sum(1 for result in results if not result["canFinish"])}')
+    for key in ISSUE_KEYS:
+        print(f'{key}: {sum(len(result[key]) for result in results)} '
+              f'(in {sum(1 for result in results if result[key])} dialogues)')
+    for result in broken:
+        issues = ', '.join(f'{key} {len(result[key])}' for key in ISSUE_KEYS if result[key])
+        print(f"- {result['id']}: {issues or 'no end reachable'}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.strict and broken:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+"""
+Downloads the remote Wikidata images of generated content into local assets.
+
+Generated characters carry a Commons imageUrl (and their encyclopedia entries
+the same URL as imageAsset) while thumbnailAsset stays the placeholder, so the
+app would load full-size Commons files over the network. This tool downloads
+each distinct URL once on a bounded thread pool and writes a portrait (1024 px)
+and a thumbnail (512 px) into the character's era folder,
+assets/images/characters/{era}/{id}.jpg and {id}_thumb.jpg (.png for images
+with transparency). It then points thumbnailAsset and portraitAsset (imageAsset
+for encyclopedia entries) at them.
+
+Downloads reuse one keep-alive connection per host and worker thread and ask
+Commons for a server-side thumbnail of the largest size needed. They are
+resumable: an interrupted download continues from its .part file with a Range
+request. The cache in .cache/images/ keeps each URL's ETag/Last-Modified, so a
+rerun only revalidates (304) or, with --no-revalidate, skips the network
+entirely. Local images are re-encoded only when the content hash of the
+download changed.
+
+Requires Pillow (pip install Pillow).
+
+Usage:
+    python3 tools/data_pipeline/fetch_images.py [generated/file.json ...] [--jobs N] [--no-revalidate]
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from content_store import PROJECT_ROOT, get_store, write_json
+from optimize_images import ASSET_ROLES
+from wikidata_client import USER_AGENT
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.cache' / 'images'
+INDEX_NAME = 'index.json'
+GENERATED_GLOB = 'generated/*_generated.json'
+IMAGES_DIR = 'assets/images/characters'
+
+# Local variants: role -> (file name suffix, max long edge, JPEG quality)
+VARIANTS = {
+    'portrait': ('', ASSET_ROLES['portraitAsset'][1], 88),
+    'thumbnail': ('_thumb', ASSET_ROLES['thumbnailAsset'][1], 85),
+}
+# Record field -> local variant it points at
+REWRITES = {
+    'characters': {'portraitAsset': 'portrait', 'thumbnailAsset': 'thumbnail'},
+    'encyclopedia': {'imageAsset': 'portrait', 'thumbnailAsset': 'thumbnail'},
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+def is_remote(value):
+    return isinstance(value, str) and value.startswith(('http://', 'https://'))
+
+
+def era_folder(era_id):
+    """Image folder of an era: korea_three_kingdoms -> three_kingdoms."""
+    return (era_id or 'unknown').split('_', 1)[-1]
+
+
+def sized_url(url, max_edge):
+    """Asks Commons' Special:FilePath for a server-side thumbnail instead of the original."""
+    if 'Special:FilePath/' not in url or 'width=' in url:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}width={max_edge}"
+
+
+class Downloader:
+    """HTTP GETs over keep-alive connections, one per (thread, host)."""
+
+    def __init__(self, timeout=60, retries=3, backoff=1.0, user_agent=USER_AGENT):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.user_agent = user_agent
+        self._local = threading.local()
+
+    def _connection(self, scheme, host):
+        connections = self._local.__dict__.setdefault('connections', {})
+        key = (scheme, host)
+        if key not in connections:
+            cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connections[key] = cls(host, timeout=self.timeout)
+        return connections[key]
+
+    def _drop_connection(self, scheme, host):
+        connection = self._local.__dict__.get('connections', {}).pop((scheme, host), None)
+        if connection:
+            connection.close()
+
+    def fetch(self, url, part_path, headers=None):
+        """Downloads url into part_path, resuming a partial file.
+
+        A partial file is only resumed with If-Range on the validator (ETag or
+        Last-Modified) of the response that started it, so a changed remote
+        file restarts the download instead of being spliced. Returns (status,
+        response headers, final url); status 304 means the cached body is current.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return self._fetch(url, part_path, headers or {})
+            except (OSError, http.client.HTTPException) as error:
+                status = getattr(error, 'status', None)
+                if attempt == self.retries or (status is not None and status not in RETRY_STATUSES):
+                    raise DownloadError(f'{url}: {error}') from error
+                delay = getattr(error, 'retry_after', None) or self.backoff * 2 ** attempt * (0.5 + random.random() / 2)
+                time.sleep(delay)
+
+    def _fetch(self, url, part_path, headers):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path + (f'?{parts.query}' if parts.query else '')
+            request_headers = {'User-Agent': self.user_agent, **headers}
+            validator_path = part_path.with_suffix('.validator')
+            resume_from = part_path.stat().st_size if part_path.exists() and validator_path.exists() else 0
+            if resume_from:
+                request_headers['Range'] = f'bytes={resume_from}-'
+                request_headers['If-Range'] = validator_path.read_text(encoding='utf-8')
+
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                # Stale keep-alive connection: reconnect on the next attempt
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+
+            if response.status in (301, 302, 303, 307, 308):
+                response.read()
+                url = urllib.parse.urljoin(url, response.getheader('Location'))
+                continue
+            if response.status == 304:
+                response.read()
+                part_path.unlink(missing_ok=True)
+                validator_path.unlink(missing_ok=True)
+                return 304, response.headers, url
+            if response.status == 416:
+                # The part file already holds the whole body
+                response.read()
+                return 200, response.headers, url
+            if response.status not in (200, 206):
+                response.read()
+                error = OSError(f'HTTP {response.status}')
+                error.status = response.status
+                retry_after = response.getheader('Retry-After', '')
+                error.retry_after = int(retry_after) if retry_after.isdigit() else None
+                raise error
+
+            # 200 means a fresh download (or a changed file): start over
+            mode = 'ab' if response.status == 206 else 'wb'
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            if mode == 'wb':
+                validator = response.getheader('ETag') or response.getheader('Last-Modified')
+                if validator:
+                    validator_path.write_text(validator, encoding='utf-8')
+                else:
+                    validator_path.unlink(missing_ok=True)
+            expected = response.getheader('Content-Length')
+            received = 0
+            try:
+                with open(part_path, mode) as f:
+                    while chunk := response.read(CHUNK_SIZE):
+                        f.write(chunk)
+                        received += len(chunk)
+                # read(amt) returns b'' when the peer closes early instead of raising
+                if expected is not None and received < int(expected):
+                    raise http.client.IncompleteRead(b'', int(expected) - received)
+            except (OSError, http.client.HTTPException):
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+            return response.status, response.headers, url
+        raise DownloadError(f'{url}: too many redirects')
+
+
+def make_variants(source, targets):
+    """Writes each (target stem, max edge, quality) as {stem}.jpg, or {stem}.png if the image has alpha.
+
+    Returns the written paths. A variant previously written with the other
+    extension is removed.
+    """
+    written = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        extension, other = ('.png', '.jpg') if has_alpha else ('.jpg', '.png')
+        for stem, max_edge, quality in targets:
+            variant = image.copy()
+            # Only ever shrinks; smaller images keep their size
+            variant.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            target = stem.with_name(stem.name + extension)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(target.name + '.tmp')
+            if has_alpha:
+                variant.save(tmp_path, 'PNG', optimize=True)
+            else:
+                variant.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, target)
+            stem.with_name(stem.name + other).unlink(missing_ok=True)
+            written.append(target)
+    return written
+
+
+def plan_images(store, relpaths):
+    """Maps each remote URL to its local asset stems and the (relpath, record, kind) using it.
+
+    The first character with a URL names its files; encyclopedia entries
+    reuse the files of the same URL. The extension is only known once the
+    image is decoded (see make_variants).
+    """
+    plan = {}
+    for relpath in relpaths:
+        for record in store.document(relpath):
+            kind = 'characters' if 'imageUrl' in record else 'encyclopedia'
+            url = record.get('imageUrl') if kind == 'characters' else record.get('imageAsset')
+            if not is_remote(url):
+                continue
+            entry = plan.setdefault(url, {'users': []})
+            entry['users'].append((relpath, record, kind))
+
+    for url, entry in plan.items():
+        owner = next((record for _, record, kind in entry['users'] if kind == 'characters'), None)
+        if owner is None:
+            owner = entry['users'][0][1]
+            name = owner['id'].removeprefix('encyclo_')
+        else:
+            name = owner['id']
+        folder = f"{IMAGES_DIR}/{era_folder(owner.get('eraId'))}"
+        entry['stems'] = {role: f'{folder}/{name}{suffix}' for role, (suffix, _, _) in VARIANTS.items()}
+    return plan
+
+
+def fetch_images(store, relpaths, cache_dir=DEFAULT_CACHE_DIR, jobs=8, revalidate=True, full_size=False,
+                 root=PROJECT_ROOT):
+    """Downloads and thumbnails the images of the given data files, rewriting their records.
+
+    Returns {'downloaded', 'revalidated', 'cached', 'encoded', 'failed': [(url, error)], 'changed': [relpath]}.
+    """
+    cache_dir = Path(cache_dir)
+    root = Path(root)
+    index_path = cache_dir / INDEX_NAME
+    index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+    index_lock = threading.Lock()
+    downloader = Downloader()
+    plan = plan_images(store, relpaths)
+    counts = {'downloaded': 0, 'revalidated': 0, 'cached': 0, 'encoded': 0}
+    max_edge = max(max_edge for _, max_edge, _ in VARIANTS.values())
+
+    def process(url, entry):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        body_path = cache_dir / 'files' / key
+        part_path = body_path.with_name(key + '.part')
+        with index_lock:
+            cached = dict(index.get(url, {}))
+
+        if cached and body_path.exists() and not revalidate:
+            outcome = 'cached'
+        else:
+            headers = {}
+            if cached.get('etag') and body_path.exists():
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('lastModified') and body_path.exists():
+                headers['If-Modified-Since'] = cached['lastModified']
+            source_url = url if full_size else sized_url(url, max_edge)
+            status, response_headers, final_url = downloader.fetch(source_url, part_path, headers)
+            if status == 304:
+                outcome = 'revalidated'
+            else:
+                os.replace(part_path, body_path)
+                part_path.with_suffix('.validator').unlink(missing_ok=True)
+                with open(body_path, 'rb') as f:
+                    digest = hashlib.file_digest(f, 'sha256').hexdigest()
+                cached.update(
+                    etag=response_headers.get('ETag'),
+                    lastModified=response_headers.get('Last-Modified'),
+                    finalUrl=final_url,
+                    sha256=digest,
+                    bytes=body_path.stat().st_size,
+                )
+                outcome = 'downloaded'
+
+        # Re-encode only when the download or the variant settings changed
+        variants = {role: [entry['stems'][role], max_edge, quality]
+                    for role, (_, max_edge, quality) in VARIANTS.items()}
+        encoded = False
+        if cached.get('encodedFrom') != cached['sha256'] or cached.get('variants') != variants \
+                or set(cached.get('assets', {})) != set(variants) \
+                or not all((root / asset).exists() for asset in cached['assets'].values()):
+            written = make_variants(body_path, [(root / stem, edge, quality) for stem, edge, quality in variants.values()])
+            assets = {role: path.relative_to(root).as_posix() for role, path in zip(variants, written)}
+            cached.update(encodedFrom=cached['sha256'], variants=variants, assets=assets)
+            encoded = True
+        with index_lock:
+            index[url] = cached
+        return outcome, encoded, cached['assets']
+
+    failed = []
+    done = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(process, url, entry): url for url, entry in plan.items()}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                outcome, encoded, assets = future.result()
+            except Exception as e:
+                failed.append((url, str(e)))
+                continue
+            counts[outcome] += 1
+            counts['encoded'] += encoded
+            done[url] = assets
+
+    write_json(index_path, index, indent=2)
+
+    changed = set()
+    for url, assets in done.items():
+        for relpath, record, kind in plan[url]['users']:
+            for field, role in REWRITES[kind].items():
+                if record.get(field) != assets[role]:
+                    record[field] = assets[role]
+                    changed.add(relpath)
+    return {**counts, 'failed': sorted(failed), 'changed': sorted(changed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download remote content images into local thumbnails.')
+    parser.add_argument('files', nargs='*', help=f'Data files with remote images (default: {GENERATED_GLOB})')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Download cache directory')
+    parser.add_argument('--jobs', type=int, default=8, help='Parallel downloads')
+    parser.add_argument('--no-revalidate', action='store_true',
+                        help='Use cached downloads without asking the server whether they changed')
+    parser.add_argument('--full-size', action='store_true',
+                        help='Download original files instead of Commons server-side thumbnails')
+    parser.add_argument('--dry-run', action='store_true', help='Download and encode, but do not rewrite data files')
+    args = parser.parse_args()
+
+    if Image is None:
+        raise SystemExit('Pillow is required: pip install Pillow')
+
+    store = get_store(args.input_dir)
+    relpaths = args.files or sorted(path.relative_to(store.data_dir).as_posix()
+                                    for path in store.data_dir.glob(GENERATED_GLOB))
+    result = fetch_images(store, relpaths, args.cache_dir, args.jobs, not args.no_revalidate, args.full_size)
+
+    print(f"Downloaded: {result['downloaded']}, unchanged (304): {result['revalidated']}, "
+          f"cached: {result['cached']}, encoded: {result['encoded']}, failed: {len(result['failed'])}")
+    for url, error in result['failed']:
+        print(f'- {url}: {error}')
+    if not args.dry_run:
+        for relpath in result['changed']:
+            store.save(relpath, indent=2)
+        print(f"Updated {', '.join(result['changed']) or 'no files'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,14 @@
-import urllib.request
-import urllib.parse
-import json
+import argparse
+import itertools
 import os
-from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Wikidata SPARQL Endpoint
-WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
+from json_stream import ArrayWriter
+from wikidata_client import WIKIDATA_ENDPOINT, WikidataClient, WikidataError, bindings
+
+# Shared client (cached, rate limited); main() reconfigures it from the command line
+client = WikidataClient()
 
-# Game Era ID mapping
 # Game Era ID mapping
 ERA_ID_RENAISSANCE = "europe_renaissance"
 ERA_ID_THREE_KINGDOMS = "korea_three_kingdoms"
@@ -17,127 +17,111 @@ ERA_ID_THREE_KINGDOMS = "korea_three_kingdoms"
 # Script is in tools/data_pipeline, so we go up two levels to root, then into assets/data
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets/data/generated")
 
-def fetch_data(query):
-    """Fetches data from Wikidata using SPARQL via urllib."""
-    try:
-        params = urllib.parse.urlencode({'format': 'json', 'query': query})
-        url = f"{WIKIDATA_ENDPOINT}?{params}"
-        req = urllib.request.Request(url)
-        req.add_header('User-Agent', 'TimeWalkerGameContentBot/1.0 (kaywalker@example.com)')
-        
-        with urllib.request.urlopen(req) as response:
-            if response.status == 200:
-                return json.loads(response.read().decode('utf-8'))
-            else:
-                print(f"Error fetching data: Status {response.status}")
-                return None
-    except Exception as e:
-        print(f"Error fetching data: {e}")
-        return None
-
-def generate_three_kingdoms_characters():
-    """Generates character data for the Three Kingdoms era (Goguryeo, Baekje, Silla)."""
-    print("Fetching Three Kingdoms Characters...")
-    
-    kingdoms = [
-        {"id": "Q28303", "name": "Goguryeo"},
-        {"id": "Q28402", "name": "Baekje"},
-        {"id": "Q28454", "name": "Silla"}
-    ]
-    
-    characters = []
-    
-    for kingdom in kingdoms:
-        kid = kingdom["id"]
-        print(f"Fetching for {kingdom['name']} ({kid})...")
-        
-        # Simple query per kingdom
-        query = f"""
-        SELECT DISTINCT ?item ?itemLabel ?itemDescription ?image WHERE {{
-          ?item wdt:P27 wd:{kid}.
+# Rows per SPARQL page
+PAGE_SIZE = 500
+
+# Era specs: one query per era, batched over the values of a single variable
+#   label:    era name used in encyclopedia text and tags
+#   output:   suffix of the generated files (characters_{output}_generated.json)
+#   values:   (variable, {Wikidata id: name}) bound with a VALUES block
+#   where:    graph patterns selecting ?item (and ?image) for a ?{variable}
+#   fallback: description for items without one, given the matched value's name
+#   stats:    stats given to every character of the era
+ERAS = {
+    ERA_ID_RENAISSANCE: {
+        "label": "르네상스",
+        "output": "europe",
+        "values": ("occupation", {
+            "Q1028181": "painter",
+            "Q901": "scientist",
+            "Q170790": "mathematician",
+            "Q4964182": "philosopher",
+        }),
+        "where": """
           ?item wdt:P31 wd:Q5.
-          OPTIONAL {{ ?item wdt:P18 ?image. }}
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "ko,en". }}
-        }}
-        LIMIT 5
-        """
-        
-        data = fetch_data(query)
-        if not data:
-            continue
-            
-        bindings = data.get('results', {}).get('bindings', [])
-        for result in bindings:
-            try:
-                wiki_id = result['item']['value'].split('/')[-1]
-                name = result['itemLabel']['value']
-                # Description fallback
-                description = result.get('itemDescription', {}).get('value', f'{kingdom["name"]}의 인물')
-                image_url = result.get('image', {}).get('value')
-                
-                stats = {"leadership": 70, "strength": 60, "intelligence": 60, "politics": 50, "charm": 50}
-
-                char_entry = {
-                    "id": f"char_{wiki_id}",
-                    "eraId": ERA_ID_THREE_KINGDOMS,
-                    "name": name,
-                    "nameKorean": name,
-                    "description": description,
-                    "thumbnailAsset": "assets/images/characters/placeholder.png",
-                    "imageUrl": image_url,
-                    "dialogueId": "dialogue_default",
-                    "isUnlocked": False,
-                    "stats": stats
-                }
-                characters.append(char_entry)
-            except Exception as e:
-                continue
-                
-    return characters
+          ?item wdt:P106 ?occupation.
+          ?item wdt:P569 ?birthDate.
+          FILTER("1450-01-01"^^xsd:dateTime <= ?birthDate && ?birthDate < "1520-01-01"^^xsd:dateTime)
+          ?item wdt:P18 ?image.
+        """,
+        "fallback": lambda name: "르네상스 시기의 위인",
+        "stats": {"leadership": 50, "strength": 30, "intelligence": 90, "politics": 60, "charm": 70},
+    },
+    ERA_ID_THREE_KINGDOMS: {
+        "label": "삼국시대",
+        "output": "asia",
+        "values": ("kingdom", {
+            "Q28303": "Goguryeo",
+            "Q28402": "Baekje",
+            "Q28454": "Silla",
+        }),
+        "where": """
+          ?item wdt:P27 ?kingdom.
+          ?item wdt:P31 wd:Q5.
+          OPTIONAL { ?item wdt:P18 ?image. }
+        """,
+        "fallback": lambda name: f"{name}의 인물",
+        "stats": {"leadership": 70, "strength": 60, "intelligence": 60, "politics": 50, "charm": 50},
+    },
+}
 
-            
-    return characters
+def build_era_query(spec, after=None, page_size=PAGE_SIZE):
+    """One page of an era's query, ordered by item IRI and starting after the `after` IRI (keyset paging)."""
+    variable, values = spec["values"]
+    keyset = f'FILTER(STR(?item) > "{after}")' if after else ""
+    return f"""
+    SELECT DISTINCT ?item ?itemLabel ?itemDescription ?image ?{variable} WHERE {{
+      VALUES ?{variable} {{ {' '.join(f'wd:{value}' for value in values)} }}
+      {spec["where"]}
+      {keyset}
+      SERVICE wikibase:label {{ bd:serviceParam wikibase:language "ko,en". }}
+    }}
+    ORDER BY STR(?item)
+    LIMIT {page_size}
+    """
 
-def generate_renaissance_characters():
-    """Generates character data for the Renaissance era."""
-    print("Fetching Renaissance Characters...")
-    # ... (existing content) ... (keeping the existing function signature but content is assumed valid)
-    # To save tokens I will just call the previous logic or assume it is handled, 
-    # but since I am REPLACING the file content partially, I need to be careful.
-    # Actually, I will just append the new function and update main.
-    
-    # Re-pasting the query for Renaissance to ensure the file stays valid
-    query = """
-    SELECT DISTINCT ?item ?itemLabel ?itemDescription ?image ?birthDate WHERE {
-      ?item wdt:P31 wd:Q5. 
-      VALUES ?occupation { wd:Q1028181 wd:Q901 wd:Q170790 wd:Q4964182 }
-      ?item wdt:P106 ?occupation.
-      ?item wdt:P569 ?birthDate.
-      FILTER("1450-01-01"^^xsd:dateTime <= ?birthDate && ?birthDate < "1520-01-01"^^xsd:dateTime)
-      ?item wdt:P18 ?image.
-      SERVICE wikibase:label { bd:serviceParam wikibase:language "ko,en". }
-    }
-    LIMIT 10
+def iter_era_rows(era_id, page_size=PAGE_SIZE):
+    """Yields the result rows of an era page by page, fetching the next page only when needed.
+
+    Raises WikidataError if a page cannot be fetched.
+    """
+    spec = ERAS[era_id]
+    after = None
+    while True:
+        rows = bindings(client.query(build_era_query(spec, after, page_size)))
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]["item"]["value"]
+
+def iter_era_characters(era_id, limit=None, page_size=PAGE_SIZE):
+    """Yields character entries of an era, one per Wikidata item (first row wins).
+
+    With a limit, pages hold at most `limit` rows; further pages are only
+    fetched if duplicate rows left fewer characters than the limit.
     """
-    
-    data = fetch_data(query)
-    if not data:
-        return []
-
-    characters = []
-    
-    for result in data['results']['bindings']:
+    spec = ERAS[era_id]
+    variable, values = spec["values"]
+    if limit is not None:
+        if limit < 1:
+            return
+        page_size = min(page_size, limit)
+    seen = set()
+    for result in iter_era_rows(era_id, page_size):
         try:
             wiki_id = result['item']['value'].split('/')[-1]
+            if wiki_id in seen:
+                continue
+
             name = result['itemLabel']['value']
-            description = result.get('itemDescription', {}).get('value', '르네상스 시기의 위인')
-            image_url = result['image']['value']
-            
-            stats = {"leadership": 50, "strength": 30, "intelligence": 90, "politics": 60, "charm": 70}
+            value_name = values.get(result.get(variable, {}).get('value', '').split('/')[-1], "")
+            # Description fallback
+            description = result.get('itemDescription', {}).get('value', spec["fallback"](value_name))
+            image_url = result.get('image', {}).get('value')
 
             char_entry = {
                 "id": f"char_{wiki_id}",
-                "eraId": ERA_ID_RENAISSANCE,
+                "eraId": era_id,
                 "name": name,
                 "nameKorean": name,
                 "description": description,
@@ -145,72 +129,119 @@ def generate_renaissance_characters():
                 "imageUrl": image_url,
                 "dialogueId": "dialogue_default",
                 "isUnlocked": False,
-                "stats": stats
+                "stats": dict(spec["stats"])
             }
-            characters.append(char_entry)
         except Exception as e:
             continue
-    return characters
+
+        seen.add(wiki_id)
+        yield char_entry
+        if limit is not None and len(seen) >= limit:
+            return
+
+def generate_three_kingdoms_characters(limit=None):
+    """Generates character data for the Three Kingdoms era (Goguryeo, Baekje, Silla)."""
+    print("Fetching Three Kingdoms Characters...")
+    return list(iter_era_characters(ERA_ID_THREE_KINGDOMS, limit))
+
+def generate_renaissance_characters(limit=None):
+    """Generates character data for the Renaissance era."""
+    print("Fetching Renaissance Characters...")
+    return list(iter_era_characters(ERA_ID_RENAISSANCE, limit))
+
+def encyclopedia_entry(char):
+    """Builds the encyclopedia entry of a fetched character."""
+    era_name = ERAS[char['eraId']]["label"]
+    description = char['description']
+
+    content = f"{char['nameKorean']}은(는) {description}로 알려진 {era_name}의 인물입니다.\n\n[주요 정보]\n- 시대: {era_name}\n- 설명: {description}\n\n(위키데이터 기반 자동 생성)"
+
+    return {
+        "id": f"encyclo_{char['id']}",
+        "type": "character",
+        "title": char['name'],
+        "titleKorean": char['nameKorean'],
+        "summary": description,
+        "content": content,
+        "thumbnailAsset": char['thumbnailAsset'],
+        "imageAsset": char.get('imageUrl'),
+        "eraId": char['eraId'],
+        "relatedEntryIds": [],
+        "tags": [era_name, "위인"],
+        "isDiscovered": False
+    }
 
 def generate_encyclopedia_entries(characters):
     """Generates encyclopedia entries based on the fetched characters."""
-    entries = []
-    for char in characters:
-        era_name = "르네상스" if char['eraId'] == ERA_ID_RENAISSANCE else "삼국시대"
-        description = char['description']
-        
-        content = f"{char['nameKorean']}은(는) {description}로 알려진 {era_name}의 인물입니다.\n\n[주요 정보]\n- 시대: {era_name}\n- 설명: {description}\n\n(위키데이터 기반 자동 생성)"
-
-        entry = {
-            "id": f"encyclo_{char['id']}",
-            "type": "character",
-            "title": char['name'], 
-            "titleKorean": char['nameKorean'],
-            "summary": description,
-            "content": content,
-            "thumbnailAsset": char['thumbnailAsset'],
-            "imageAsset": char.get('imageUrl'),
-            "eraId": char['eraId'],
-            "relatedEntryIds": [],
-            "tags": [era_name, "위인"],
-            "isDiscovered": False
-        }
-        entries.append(entry)
-    return entries
+    return [encyclopedia_entry(char) for char in characters]
+
+def write_era(era_id, limit=None, page_size=PAGE_SIZE):
+    """Streams an era's characters and encyclopedia entries into its generated files.
+
+    Returns the number of characters written. The files are replaced only once
+    every page was fetched.
+    """
+    output = ERAS[era_id]["output"]
+    char_path = os.path.join(OUTPUT_DIR, f'characters_{output}_generated.json')
+    encyclo_path = os.path.join(OUTPUT_DIR, f'encyclopedia_{output}_generated.json')
+
+    characters = iter_era_characters(era_id, limit, page_size)
+    first = next(characters, None)
+    # An era without results leaves the previous files in place
+    if first is None:
+        return 0
+
+    with ArrayWriter(char_path, indent=2) as char_out, ArrayWriter(encyclo_path, indent=2) as encyclo_out:
+        for char in itertools.chain([first], characters):
+            char_out.write(char)
+            encyclo_out.write(encyclopedia_entry(char))
+    return char_out.count
 
 def main():
+    global client
+
+    parser = argparse.ArgumentParser(description="Generate character and encyclopedia data from Wikidata.")
+    parser.add_argument("eras", nargs="*", metavar="era", help=f"Eras to generate (default: all of {', '.join(ERAS)})")
+    parser.add_argument("--limit", type=int, default=None, help="Characters per era (default: all)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Rows per SPARQL page")
+    parser.add_argument("--endpoint", default=WIKIDATA_ENDPOINT, help="SPARQL endpoint")
+    parser.add_argument("--offline", action="store_true", help="Only replay cached responses")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached responses and refetch")
+    parser.add_argument("--cache-ttl", type=float, default=7, help="Days a cached response stays fresh")
+    parser.add_argument("--concurrency", type=int, default=5, help="Parallel queries (at most 5)")
+    args = parser.parse_args()
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    unknown = set(args.eras) - set(ERAS)
+    if unknown:
+        parser.error(f"unknown era(s): {', '.join(sorted(unknown))}")
+    client = WikidataClient(endpoint=args.endpoint, offline=args.offline, concurrency=args.concurrency,
+                            ttl=0 if args.refresh else args.cache_ttl * 24 * 3600)
+
     # Ensure output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # 1. Generate Renaissance Data
-    renaissance_chars = generate_renaissance_characters()
-    if renaissance_chars:
-        # Save Characters
-        char_path = os.path.join(OUTPUT_DIR, 'characters_europe_generated.json')
-        with open(char_path, 'w', encoding='utf-8') as f:
-            json.dump(renaissance_chars, f, ensure_ascii=False, indent=2)
-        
-        # Save Encyclopedia Entries
-        encyclo_entries = generate_encyclopedia_entries(renaissance_chars)
-        encyclo_path = os.path.join(OUTPUT_DIR, 'encyclopedia_europe_generated.json')
-        with open(encyclo_path, 'w', encoding='utf-8') as f:
-            json.dump(encyclo_entries, f, ensure_ascii=False, indent=2)
-            
-    # 2. Generate Three Kingdoms Data
-    three_kingdoms_chars = generate_three_kingdoms_characters()
-    if three_kingdoms_chars:
-        # Save Characters
-        char_path = os.path.join(OUTPUT_DIR, 'characters_asia_generated.json')
-        with open(char_path, 'w', encoding='utf-8') as f:
-            json.dump(three_kingdoms_chars, f, ensure_ascii=False, indent=2)
-        print(f"Saved {len(three_kingdoms_chars)} characters to {char_path}")
-        
-        # Save Encyclopedia Entries
-        encyclo_entries = generate_encyclopedia_entries(three_kingdoms_chars)
-        encyclo_path = os.path.join(OUTPUT_DIR, 'encyclopedia_asia_generated.json')
-        with open(encyclo_path, 'w', encoding='utf-8') as f:
-            json.dump(encyclo_entries, f, ensure_ascii=False, indent=2)
-        print(f"Saved {len(encyclo_entries)} encyclopedia entries to {encyclo_path}")
+
+    # Eras are fetched in parallel; the pages of one era stay sequential (keyset paging)
+    era_ids = list(dict.fromkeys(args.eras or ERAS))
+    print(f"Fetching {', '.join(era_ids)} characters...")
+    with ThreadPoolExecutor(max_workers=client.concurrency) as executor:
+        futures = {era_id: executor.submit(write_era, era_id, args.limit, args.page_size) for era_id in era_ids}
+
+    for era_id, future in futures.items():
+        try:
+            count = future.result()
+        except WikidataError as e:
+            print(f"Error fetching {era_id} data: {e}, keeping previous files")
+            continue
+        if not count:
+            print(f"No characters found for {era_id}, keeping previous files")
+            continue
+        print(f"Saved {count} characters and encyclopedia entries for {era_id}")
+
+    print(f"Queries: {client.stats['fetched']} fetched, {client.stats['cached']} from cache, "
+          f"{client.stats['retried']} retries")
 
 if __name__ == "__main__":
     main()
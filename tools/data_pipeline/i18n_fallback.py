@@ -0,0 +1,130 @@
+"""
+Fallback-aware i18n files: ko holds the complete content, other locales only
+store the entries and fields that actually differ from it.
+
+The app resolves a locale by laying its entries over the ko ones field by
+field (I18nContentLoader._mergeWithFallback), which resolve() mirrors here.
+Run as a script to strip untranslated copies from the existing locale files
+and print a translation coverage report.
+
+Usage:
+    python3 tools/data_pipeline/i18n_fallback.py [--check] [--report coverage.json]
+"""
+
+import argparse
+import json
+
+from content_store import get_store
+
+FALLBACK_LOCALE = 'ko'
+
+
+def overlay_entry(base, localized):
+    """Fields of a localized entry that differ from the fallback entry."""
+    if not isinstance(base, dict) or not isinstance(localized, dict):
+        return None if localized == base else localized
+    return {field: value for field, value in localized.items() if base.get(field) != value}
+
+
+def sparse_overlay(base_map, localized_map):
+    """Drops every entry and field of localized_map that just repeats base_map."""
+    overlay = {}
+    for entry_id, localized in localized_map.items():
+        diff = overlay_entry(base_map.get(entry_id), localized)
+        if diff:
+            overlay[entry_id] = diff
+    return overlay
+
+
+def resolve(base_map, overlay_map):
+    """Full localized map: overlay fields win, everything else falls back to base."""
+    merged = {}
+    for entry_id, base in base_map.items():
+        overlay = overlay_map.get(entry_id)
+        if isinstance(base, dict) and isinstance(overlay, dict):
+            merged[entry_id] = {**base, **overlay}
+        else:
+            merged[entry_id] = base if overlay is None else overlay
+    for entry_id, overlay in overlay_map.items():
+        merged.setdefault(entry_id, overlay)
+    return merged
+
+
+def coverage(base_map, localized_map):
+    """Counts entries/fields of base_map that localized_map actually translates."""
+    overlay = sparse_overlay(base_map, localized_map)
+    fields = sum(len(base) if isinstance(base, dict) else 1 for base in base_map.values())
+    translated_fields = sum(
+        len(diff.keys() & base_map[entry_id].keys()) if isinstance(diff, dict) else 1
+        for entry_id, diff in overlay.items()
+        if entry_id in base_map
+    )
+    return {
+        'entries': len(base_map),
+        'translatedEntries': sum(1 for entry_id in overlay if entry_id in base_map),
+        'fields': fields,
+        'translatedFields': translated_fields,
+    }
+
+
+def i18n_files(store, locale):
+    """Relative paths of a locale's i18n maps, including dialogue shards."""
+    locale_dir = store.path(f'i18n/{locale}')
+    paths = sorted(locale_dir.glob('*.json')) + sorted(locale_dir.glob('dialogues/*.json'))
+    return [path.relative_to(locale_dir).as_posix() for path in paths]
+
+
+def dedupe_locales(store, write=True):
+    """Rewrites every non-fallback locale as a sparse overlay; returns coverage per file."""
+    report = {}
+    for locale_dir in sorted(store.path('i18n').iterdir()):
+        locale = locale_dir.name
+        if not locale_dir.is_dir() or locale == FALLBACK_LOCALE:
+            continue
+        for relpath in i18n_files(store, locale):
+            base_path = f'i18n/{FALLBACK_LOCALE}/{relpath}'
+            base_map = store.document(base_path) if store.exists(base_path) else {}
+            localized_map = store.document(f'i18n/{locale}/{relpath}')
+
+            # Coverage is measured against the resolved content, so re-running is stable
+            report[f'{locale}/{relpath}'] = coverage(base_map, resolve(base_map, localized_map))
+            if write:
+                overlay = sparse_overlay(base_map, localized_map)
+                store.replace(f'i18n/{locale}/{relpath}', overlay)
+                store.save(f'i18n/{locale}/{relpath}')
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strip untranslated i18n copies and report coverage.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--check', action='store_true', help='Only report, do not rewrite files')
+    parser.add_argument('--report', help='Also write the coverage report as JSON')
+    args = parser.parse_args()
+
+    store = get_store(args.input_dir)
+    sizes = {}
+    if not args.check:
+        for locale_dir in store.path('i18n').iterdir():
+            for path in locale_dir.rglob('*.json') if locale_dir.is_dir() else []:
+                sizes[path] = path.stat().st_size
+
+    report = dedupe_locales(store, write=not args.check)
+
+    print('Translation coverage (fields):')
+    for name, stats in report.items():
+        percent = 100 * stats['translatedFields'] / stats['fields'] if stats['fields'] else 100
+        print(f"- {name}: {stats['translatedFields']}/{stats['fields']} ({percent:.1f}%), "
+              f"entries {stats['translatedEntries']}/{stats['entries']}")
+
+    if sizes:
+        after = sum(path.stat().st_size for path in sizes)
+        print(f'i18n size: {sum(sizes.values()) / 1024:.0f} KB -> {after / 1024:.0f} KB')
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Incremental reader/writer for large top-level JSON arrays and objects.
+
+dialogues.json and the i18n dialogue maps are decoded one element at a time
+from fixed-size chunks, so memory stays proportional to the largest single
+dialogue instead of the whole file. The writers emit the same bytes as
+json.dump(..., indent=N, ensure_ascii=False) without holding the full tree.
+
+Usage:
+    from json_stream import ArrayWriter, iter_array
+
+    with ArrayWriter('out.json') as out:
+        for dialogue in iter_array('assets/data/dialogues.json'):
+            out.write(dialogue)
+"""
+
+import json
+import os
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+
+class _Reader:
+    """Buffered character reader that decodes one JSON value at a time."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (without consuming it), or '' at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'EOF'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Value is split across chunks: read more (doubling, to bound re-parsing) and retry
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            # A number cut by the chunk boundary may continue in the next chunk
+            if isinstance(value, (int, float)) and not self.eof:
+                if end == len(self.buf) or self.buf[end] in _NUMBER_CHARS:
+                    if self._fill():
+                        continue
+            self.pos = end
+            return value
+
+
+def _open(path, chunk_size):
+    f = open(path, 'r', encoding='utf-8')
+    return f, _Reader(f, chunk_size)
+
+
+def iter_array(path, chunk_size=CHUNK_SIZE):
+    """Yields the elements of a top-level JSON array one at a time."""
+    f, reader = _open(path, chunk_size)
+    with f:
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.value()
+            if reader.expect(',]') == ']':
+                return
+
+
+def iter_object(path, chunk_size=CHUNK_SIZE):
+    """Yields (key, value) pairs of a top-level JSON object one at a time."""
+    f, reader = _open(path, chunk_size)
+    with f:
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.expect(',}') == '}':
+                return
+
+
+class _StreamWriter:
+    open_char = close_char = ''
+
+    def __init__(self, path, indent=4):
+        self.path = Path(path)
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._f = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self._tmp_path, 'w', encoding='utf-8')
+        self._f.write(self.open_char)
+        return self
+
+    def _write_entry(self, text):
+        separator = ',' if self.count else ''
+        if self.indent is None:
+            self._f.write((', ' if self.count else '') + text)
+        else:
+            pad = ' ' * self.indent
+            self._f.write(separator + '\n' + pad + text.replace('\n', '\n' + pad))
+        self.count += 1
+
+    def _dumps(self, value):
+        return json.dumps(value, ensure_ascii=False, indent=self.indent)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.count and self.indent is not None:
+            self._f.write('\n')
+        self._f.write(self.close_char)
+        self._f.close()
+        if exc_type is None:
+            # Atomic replace, so a reader of the same path sees old or new content only
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+        return False
+
+
+class ArrayWriter(_StreamWriter):
+    """Writes a top-level JSON array element by element."""
+
+    open_char, close_char = '[', ']'
+
+    def write(self, item):
+        self._write_entry(self._dumps(item))
+
+
+class ObjectWriter(_StreamWriter):
+    """Writes a top-level JSON object entry by entry."""
+
+    open_char, close_char = '{', '}'
+
+    def write(self, key, value):
+        self._write_entry(f'{self._dumps(key)}: {self._dumps(value)}')
@@ -1,21 +1,21 @@
-import json
-import os
+import argparse
 
-def merge_json_files(main_file_path, generated_file_path):
+from content_store import get_store
+
+def merge_json_files(store, main_file, generated_file):
+    main_file_path = store.path(main_file)
+    generated_file_path = store.path(generated_file)
     try:
-        if not os.path.exists(main_file_path):
+        if not store.exists(main_file):
             print(f"Main file not found: {main_file_path}")
             return
         
-        if not os.path.exists(generated_file_path):
+        if not store.exists(generated_file):
             print(f"Generated file not found: {generated_file_path}")
             return
 
-        with open(main_file_path, 'r', encoding='utf-8') as f:
-            main_data = json.load(f)
-        
-        with open(generated_file_path, 'r', encoding='utf-8') as f:
-            generated_data = json.load(f)
+        main_data = store.document(main_file)
+        generated_data = store.document(generated_file)
             
         # Check for duplicates by ID to avoid adding same data twice
         existing_ids = {item['id'] for item in main_data}
@@ -23,8 +23,8 @@ def merge_json_files(main_file_path, generated_file_path):
         
         if new_items:
             main_data.extend(new_items)
-            with open(main_file_path, 'w', encoding='utf-8') as f:
-                json.dump(main_data, f, ensure_ascii=False, indent=2)
+            store.invalidate()
+            store.save(main_file, indent=2)
             print(f"Successfully added {len(new_items)} items to {main_file_path}")
         else:
             print(f"No new items to add to {main_file_path} (all IDs exist).")
@@ -32,26 +32,26 @@ def merge_json_files(main_file_path, generated_file_path):
     except Exception as e:
         print(f"Error merging files: {e}")
 
-def main():
-    # Resolve paths relative to this script file
-    # Script is in <project_root>/tools/data_pipeline/
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(script_dir))
-    
-    base_dir = os.path.join(project_root, "assets/data")
-    generated_dir = os.path.join(project_root, "assets/data/generated")
+def main(store=None):
+    # Paths are resolved by the store relative to <project_root>/assets/data
+    store = store or get_store()
     
     # Merge Characters
     merge_json_files(
-        os.path.join(base_dir, "characters.json"),
-        os.path.join(generated_dir, "characters_europe_generated.json")
+        store,
+        "characters.json",
+        "generated/characters_europe_generated.json"
     )
     
     # Merge Encyclopedia
     merge_json_files(
-        os.path.join(base_dir, "encyclopedia.json"),
-        os.path.join(generated_dir, "encyclopedia_europe_generated.json")
+        store,
+        "encyclopedia.json",
+        "generated/encyclopedia_europe_generated.json"
     )
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Merge generated content into the main data files.")
+    parser.add_argument("--input-dir", default=None, help="Content data directory (default: the project's assets/data)")
+    args = parser.parse_args()
+    main(get_store(args.input_dir) if args.input_dir else get_store())
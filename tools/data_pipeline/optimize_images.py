@@ -0,0 +1,164 @@
+"""
+Right-sizes and recompresses the images referenced by the content JSON.
+
+Every thumbnailAsset, backgroundAsset, portraitAsset, emotionAssets and
+imageAsset path is resized to the target long edge of its role and encoded as
+WebP in a process pool, into the gitignored build/optimized_images/ by
+default. The manifest written next to the variants doubles as a
+cache: inputs whose content hash and role settings are unchanged are skipped.
+
+Requires Pillow (pip install Pillow).
+
+Usage:
+    python3 tools/data_pipeline/optimize_images.py [--jobs N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from content_store import PROJECT_ROOT, get_store, write_json
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+MANIFEST_NAME = 'manifest.json'
+
+# Asset field -> (role, max long edge in px, WebP quality)
+ASSET_ROLES = {
+    'thumbnailAsset': ('thumbnail', 512, 80),
+    'portraitAsset': ('portrait', 1024, 85),
+    'emotionAssets': ('portrait', 1024, 85),
+    'imageAsset': ('image', 1280, 82),
+    'backgroundAsset': ('background', 1920, 82),
+}
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def collect_jobs(store):
+    """Maps (asset path, role) to (max edge, quality) for every referenced image."""
+    jobs = {}
+    for _, _, field, asset in store.asset_refs():
+        role, max_edge, quality = ASSET_ROLES[field]
+        jobs[(asset, role)] = (max_edge, quality)
+    return jobs
+
+
+def variant_path(output_dir, asset, role):
+    return output_dir / role / Path(asset).with_suffix('.webp')
+
+
+def optimize_image(source, target, max_edge, quality):
+    """Runs in a worker process. Returns (width, height, bytes) of the variant."""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        # Only ever shrinks; smaller images keep their size
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + '.tmp')
+        image.save(tmp_path, 'WEBP', quality=quality, method=6)
+        os.replace(tmp_path, target)
+        return image.width, image.height, target.stat().st_size
+
+
+def optimize_images(store, output_dir, jobs=None, force=False):
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / MANIFEST_NAME
+    cached = {} if force or not manifest_path.exists() else json.loads(manifest_path.read_text(encoding='utf-8'))
+
+    manifest = {}
+    pending = []
+    missing = set()
+    skipped = 0
+    source_hashes = {}
+
+    for (asset, role), (max_edge, quality) in sorted(collect_jobs(store).items()):
+        source = PROJECT_ROOT / asset
+        if not source.is_file():
+            missing.add(asset)
+            continue
+        if asset not in source_hashes:
+            source_hashes[asset] = file_hash(source)
+
+        target = variant_path(output_dir, asset, role)
+        entry = {
+            'path': target.relative_to(output_dir).as_posix(),
+            'sourceHash': source_hashes[asset],
+            'sourceBytes': source.stat().st_size,
+            'maxEdge': max_edge,
+            'quality': quality,
+        }
+        previous = cached.get(asset, {}).get(role)
+        if previous and target.exists() and all(previous.get(key) == value for key, value in entry.items()):
+            manifest.setdefault(asset, {})[role] = previous
+            skipped += 1
+            continue
+        manifest.setdefault(asset, {})[role] = entry
+        pending.append((asset, role, source, target, max_edge, quality))
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(optimize_image, source, target, max_edge, quality): (asset, role)
+            for asset, role, source, target, max_edge, quality in pending
+        }
+        for future in as_completed(futures):
+            asset, role = futures[future]
+            try:
+                width, height, size = future.result()
+            except Exception as e:
+                print(f'Failed {asset} ({role}): {e}')
+                del manifest[asset][role]
+                failed.append(asset)
+                continue
+            manifest[asset][role].update(width=width, height=height, bytes=size)
+
+    manifest = {asset: roles for asset, roles in sorted(manifest.items()) if roles}
+    write_json(manifest_path, manifest, indent=2)
+
+    variants = [variant for roles in manifest.values() for variant in roles.values()]
+    return {
+        'optimized': len(pending) - len(failed),
+        'skipped': skipped,
+        'failed': failed,
+        'missing': sorted(missing),
+        'source_bytes': sum(source.stat().st_size for source in {PROJECT_ROOT / asset for asset in manifest}),
+        'variant_bytes': sum(variant['bytes'] for variant in variants),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resize and recompress images referenced by content JSON.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--output-dir', default='build/optimized_images', help='Output directory')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and re-encode everything')
+    args = parser.parse_args()
+
+    if Image is None:
+        raise SystemExit('Pillow is required: pip install Pillow')
+
+    result = optimize_images(get_store(args.input_dir), args.output_dir, jobs=args.jobs, force=args.force)
+
+    print(f"Optimized: {result['optimized']}, unchanged: {result['skipped']}, failed: {len(result['failed'])}")
+    print(f"Missing sources: {len(result['missing'])}")
+    for asset in result['missing']:
+        print(f'- {asset}')
+    print(f"Source images: {result['source_bytes'] / 1024 / 1024:.1f} MB -> "
+          f"variants: {result['variant_bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
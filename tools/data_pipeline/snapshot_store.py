@@ -0,0 +1,372 @@
+"""
+Content-addressed snapshots of the data files.
+
+Instead of copying a whole dataset to *_backup.json before every edit, a
+snapshot splits each JSON file into its records (dialogues, characters, quiz
+categories and their quizzes, i18n entries, ...) and stores every record once,
+zlib-compressed, under the sha256 of its canonical JSON. The layout of a file
+is itself stored as a tree object referencing those hashes, and a snapshot is a
+small manifest mapping each captured file to its tree. An edit to one dialogue
+therefore costs one new record object, one tree and a manifest, and unchanged
+files share everything with earlier snapshots.
+
+Files are restored byte for byte: the indent and trailing newline are recorded,
+and a file whose formatting cannot be reproduced (or that is not JSON) is stored
+as a single raw object. ContentStore.save() snapshots a data file before
+overwriting it, so every tool run that mutates data is one snapshot.
+
+Usage:
+    python3 tools/data_pipeline/snapshot_store.py list
+    python3 tools/data_pipeline/snapshot_store.py create [file ...] [--label LABEL]
+    python3 tools/data_pipeline/snapshot_store.py diff SNAPSHOT [SNAPSHOT]
+    python3 tools/data_pipeline/snapshot_store.py restore SNAPSHOT [file ...]
+    python3 tools/data_pipeline/snapshot_store.py prune --keep N
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from content_store import DATASET_FILES, DEFAULT_DATA_DIR, PROJECT_ROOT
+
+DEFAULT_SNAPSHOT_DIR = PROJECT_ROOT / 'tools' / 'data_pipeline' / '.snapshots'
+LATEST = 'latest'
+
+
+def _canonical(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _is_record_list(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) and 'id' in item for item in value)
+
+
+def _detect_indent(text):
+    lines = text.split('\n', 2)
+    if len(lines) < 2:
+        return None
+    return len(lines[1]) - len(lines[1].lstrip(' '))
+
+
+def _format(data, indent, trailing_newline):
+    return json.dumps(data, ensure_ascii=False, indent=indent) + ('\n' if trailing_newline else '')
+
+
+def _write_atomic(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Snapshots of the files of one data directory, sharing objects with other data directories."""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, root=DEFAULT_SNAPSHOT_DIR):
+        self.data_dir = Path(data_dir).resolve()
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'snapshots'
+
+    # -- Objects -----------------------------------------------------------
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def put(self, payload):
+        """Stores bytes under their sha256 (once) and returns the hash."""
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            _write_atomic(path, zlib.compress(payload))
+        return digest
+
+    def get(self, digest):
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    def _split(self, value, depth=0, store=True):
+        """Tree node of a value: a record hash, or a {'list'|'dict': ...} node of child nodes.
+
+        Records (dicts with an id) are leaves. Top-level containers, lists of
+        records and other dicts holding such lists (quizzes' {categories: [...]})
+        are split into their children.
+        """
+        if isinstance(value, list) and (depth == 0 or _is_record_list(value)):
+            return {
+                'list': [self._split(item, depth + 1, store) for item in value],
+                'ids': [item.get('id') if isinstance(item, dict) else None for item in value],
+            }
+        if isinstance(value, dict) and (depth == 0 or 'id' not in value
+                                        and any(_is_record_list(item) for item in value.values())):
+            return {'dict': {key: self._split(item, depth + 1, store) for key, item in value.items()}}
+        payload = _canonical(value)
+        return self.put(payload) if store else hashlib.sha256(payload).hexdigest()
+
+    def _join(self, node):
+        if isinstance(node, str):
+            return json.loads(self.get(node))
+        if 'list' in node:
+            return [self._join(child) for child in node['list']]
+        return {key: self._join(child) for key, child in node['dict'].items()}
+
+    def file_entry(self, relpath, store=True):
+        """Manifest entry of a data file as it is on disk, storing its objects unless store=False."""
+        raw = self.data_dir.joinpath(relpath).read_bytes()
+        entry = {'size': len(raw), 'sha256': hashlib.sha256(raw).hexdigest()}
+        try:
+            text = raw.decode('utf-8')
+            data = json.loads(text)
+        except (UnicodeDecodeError, ValueError):
+            data = None
+        if isinstance(data, (list, dict)):
+            indent = _detect_indent(text)
+            trailing_newline = text.endswith('\n')
+            if _format(data, indent, trailing_newline) == text:
+                tree = _canonical(self._split(data, store=store))
+                digest = self.put(tree) if store else hashlib.sha256(tree).hexdigest()
+                entry.update(tree=digest, indent=indent, trailingNewline=trailing_newline)
+                return entry
+        entry['raw'] = self.put(raw) if store else entry['sha256']
+        return entry
+
+    def file_bytes(self, entry):
+        if 'raw' in entry:
+            return self.get(entry['raw'])
+        data = self._join(json.loads(self.get(entry['tree'])))
+        return _format(data, entry['indent'], entry['trailingNewline']).encode('utf-8')
+
+    # -- Snapshots ---------------------------------------------------------
+
+    def snapshots(self):
+        """Manifests of this data directory's snapshots, oldest first."""
+        manifests = []
+        for path in sorted(self.manifests_dir.glob('*.json')):
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+            if manifest['dataDir'] == str(self.data_dir):
+                manifests.append(manifest)
+        return manifests
+
+    def load(self, snapshot_id):
+        """Manifest by id, unique id prefix or 'latest'."""
+        snapshots = self.snapshots()
+        if snapshot_id == LATEST:
+            matches = snapshots[-1:]
+        else:
+            matches = [manifest for manifest in snapshots if manifest['id'].startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise KeyError(f"{'ambiguous' if matches else 'unknown'} snapshot: {snapshot_id}")
+        return matches[0]
+
+    def _save_manifest(self, manifest):
+        payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        _write_atomic(self.manifests_dir / f"{manifest['id']}.json", payload)
+
+    def capture(self, relpaths, snapshot_id=None, label=None):
+        """Snapshots the given data files and returns the snapshot id.
+
+        With snapshot_id, the files are added to that snapshot unless it already
+        holds them, so a tool run saving several files yields one snapshot of
+        the state before the run.
+        """
+        if snapshot_id:
+            manifest = self.load(snapshot_id)
+        else:
+            now = time.time()
+            manifest = {
+                # Sortable by creation time, down to the microsecond
+                'id': f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(now))}.{int(now % 1 * 1e6):06d}"
+                      f'-{secrets.token_hex(3)}',
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+                'label': label or Path(sys.argv[0]).name,
+                'dataDir': str(self.data_dir),
+                'files': {},
+            }
+        for relpath in relpaths:
+            relpath = DATASET_FILES.get(relpath, relpath)
+            if relpath not in manifest['files'] and self.data_dir.joinpath(relpath).is_file():
+                manifest['files'][relpath] = self.file_entry(relpath)
+        self._save_manifest(manifest)
+        return manifest['id']
+
+    def restore(self, snapshot_id, relpaths=None):
+        """Writes the snapshot's files back; returns (restored relpaths, id of the pre-restore snapshot).
+
+        The current files are captured first, so a restore can be undone.
+        """
+        manifest = self.load(snapshot_id)
+        relpaths = [DATASET_FILES.get(relpath, relpath) for relpath in relpaths or manifest['files']]
+        missing = [relpath for relpath in relpaths if relpath not in manifest['files']]
+        if missing:
+            raise KeyError(f"snapshot {manifest['id']} has no {', '.join(missing)}")
+
+        changed = [
+            relpath for relpath in relpaths
+            if not self.data_dir.joinpath(relpath).is_file()
+            or self.file_entry(relpath, store=False)['sha256'] != manifest['files'][relpath]['sha256']
+        ]
+        if not changed:
+            return [], None
+        backup_id = self.capture(changed, label=f"before restore {manifest['id']}")
+        for relpath in changed:
+            _write_atomic(self.data_dir / relpath, self.file_bytes(manifest['files'][relpath]))
+        return changed, backup_id
+
+    def _leaves(self, entry):
+        """{record path: hash} of a file entry, keyed by record id where there is one."""
+        if 'raw' in entry:
+            return {'': entry['raw']}
+        if 'node' in entry:
+            node = entry['node']
+        else:
+            node = json.loads(self.get(entry['tree']))
+        leaves = {}
+
+        def walk(node, path):
+            prefix = f'{path}/' if path else ''
+            if isinstance(node, str):
+                leaves[path] = node
+            elif 'list' in node:
+                for position, (child, record_id) in enumerate(zip(node['list'], node['ids'])):
+                    key = f'{prefix}{record_id}'
+                    # Records without an id, or repeating one, are keyed by position
+                    walk(child, key if record_id is not None and key not in leaves else f'{prefix}{position}')
+            else:
+                for key, child in node['dict'].items():
+                    walk(child, f'{prefix}{key}')
+
+        walk(node, '')
+        return leaves
+
+    def _current_entry(self, relpath):
+        if not self.data_dir.joinpath(relpath).is_file():
+            return None
+        entry = self.file_entry(relpath, store=False)
+        if 'tree' in entry:
+            data = json.loads(self.data_dir.joinpath(relpath).read_text(encoding='utf-8'))
+            entry['node'] = self._split(data, store=False)
+        return entry
+
+    def diff(self, old_id, new_id=None):
+        """Per file {'added', 'removed', 'changed'} record paths between two snapshots.
+
+        Snapshots only hold the files they captured, so two snapshots are
+        compared on the files both hold. Without new_id the snapshot is compared
+        with the files on disk (a deleted file counts as all records removed).
+        Only record hashes are compared, so no record object is decompressed.
+        """
+        old = self.load(old_id)['files']
+        if new_id:
+            new = self.load(new_id)['files']
+            relpaths = old.keys() & new.keys()
+        else:
+            new = {relpath: self._current_entry(relpath) for relpath in old}
+            new = {relpath: entry for relpath, entry in new.items() if entry}
+            relpaths = old.keys()
+
+        result = {}
+        for relpath in sorted(relpaths):
+            before = old.get(relpath)
+            after = new.get(relpath)
+            if before and after and before['sha256'] == after['sha256']:
+                continue
+            old_leaves = self._leaves(before) if before else {}
+            new_leaves = self._leaves(after) if after else {}
+            result[relpath] = {
+                'added': [key for key in new_leaves if key not in old_leaves],
+                'removed': [key for key in old_leaves if key not in new_leaves],
+                'changed': [key for key in new_leaves if key in old_leaves and new_leaves[key] != old_leaves[key]],
+            }
+        return result
+
+    def prune(self, keep):
+        """Drops all but the newest keep snapshots of this data directory and unreferenced objects.
+
+        Returns (removed snapshots, removed objects).
+        """
+        snapshots = self.snapshots()
+        dropped = snapshots[:max(len(snapshots) - keep, 0)]
+        for manifest in dropped:
+            (self.manifests_dir / f"{manifest['id']}.json").unlink()
+
+        referenced = set()
+        for path in self.manifests_dir.glob('*.json'):
+            for entry in json.loads(path.read_text(encoding='utf-8'))['files'].values():
+                if 'raw' in entry:
+                    referenced.add(entry['raw'])
+                    continue
+                referenced.add(entry['tree'])
+                stack = [json.loads(self.get(entry['tree']))]
+                while stack:
+                    node = stack.pop()
+                    if isinstance(node, str):
+                        referenced.add(node)
+                    else:
+                        stack.extend(node['list'] if 'list' in node else node['dict'].values())
+
+        removed = 0
+        for path in self.objects_dir.glob('*/*'):
+            if path.parent.name + path.name not in referenced:
+                path.unlink()
+                removed += 1
+        return len(dropped), removed
+
+    def size(self):
+        return sum(path.stat().st_size for path in self.root.rglob('*') if path.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot, diff and restore the content data files.')
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='List snapshots, oldest first')
+    create = commands.add_parser('create', help='Snapshot data files (default: all datasets)')
+    create.add_argument('files', nargs='*', help='Dataset names or paths relative to the data dir')
+    create.add_argument('--label', help='Description stored with the snapshot')
+    diff = commands.add_parser('diff', help='Records changed between two snapshots (or a snapshot and disk)')
+    diff.add_argument('old', help=f"Snapshot id, id prefix or '{LATEST}'")
+    diff.add_argument('new', nargs='?', help='Snapshot to compare with (default: files on disk)')
+    restore = commands.add_parser('restore', help='Write a snapshot back to the data dir')
+    restore.add_argument('snapshot', help=f"Snapshot id, id prefix or '{LATEST}'")
+    restore.add_argument('files', nargs='*', help='Files to restore (default: all in the snapshot)')
+    prune = commands.add_parser('prune', help='Delete old snapshots and unreferenced objects')
+    prune.add_argument('--keep', type=int, required=True, help='Snapshots to keep')
+    args = parser.parse_args()
+
+    snapshots = SnapshotStore(args.input_dir)
+    try:
+        if args.command == 'list':
+            for manifest in snapshots.snapshots():
+                print(f"{manifest['id']}  {manifest['label']}: {', '.join(manifest['files'])}")
+            print(f'Store size: {snapshots.size() / 1024:.0f} KB')
+        elif args.command == 'create':
+            before = snapshots.size()
+            snapshot_id = snapshots.capture(args.files or list(DATASET_FILES), label=args.label or 'manual')
+            print(f'Created {snapshot_id} (+{(snapshots.size() - before) / 1024:.0f} KB)')
+        elif args.command == 'diff':
+            for relpath, changes in snapshots.diff(args.old, args.new).items():
+                print(f'{relpath}:')
+                for kind, keys in changes.items():
+                    for key in keys:
+                        print(f'  {kind} {key}')
+        elif args.command == 'restore':
+            restored, backup_id = snapshots.restore(args.snapshot, args.files)
+            if not restored:
+                print('Files already match the snapshot.')
+            else:
+                print(f"Restored {', '.join(restored)} (previous state saved as {backup_id})")
+        elif args.command == 'prune':
+            dropped, removed = snapshots.prune(args.keep)
+            print(f'Removed {dropped} snapshots and {removed} objects')
+    except KeyError as error:
+        parser.error(error.args[0])
+
+
+if __name__ == '__main__':
+    main()
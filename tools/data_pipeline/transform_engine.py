@@ -0,0 +1,356 @@
+"""
+Single-pass transform engine for the i18n content split.
+
+Every dataset is described by a declarative spec: the fields that stay in the
+main file ({dataset}_new.json) and the long-text fields that move into
+i18n/{locale}/{dataset}.json, each mapped to a small getter. One engine walks
+each source once, streaming list datasets record by record, and writes all of
+its outputs atomically. Datasets run in parallel worker processes.
+
+Each run records a hash of its inputs (source files, options and this module,
+which holds the specs) per dataset; a dataset whose hash matches the previous
+build and whose outputs still exist is skipped.
+
+Dialogue shards (--shard-by) are opt-in: I18nContentLoader only reads the full
+i18n maps, so shards are not written unless asked for.
+
+Usage:
+    python3 tools/data_pipeline/transform_engine.py [dataset ...] [--force | --no-cache] [--jobs N]
+        [--shard-by character|era]
+"""
+
+import argparse
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+from content_store import DATASET_FILES, PROJECT_ROOT, ContentStore, dialogue_shard_key, get_store, write_json
+from i18n_fallback import FALLBACK_LOCALE
+from json_stream import ArrayWriter, ObjectWriter
+
+LOCALES = ('ko', 'en')
+DIALOGUE_INDEX_FILE = 'i18n/dialogue_index.json'
+DEFAULT_CACHE_PATH = PROJECT_ROOT / 'tools' / 'data_pipeline' / '.cache' / 'transforms.json'
+
+
+# -- Field getters -------------------------------------------------------
+
+def field(key, default=''):
+    return lambda record: record.get(key, default)
+
+
+def required(key):
+    return lambda record: record[key]
+
+
+def localized(ko_key, en_key):
+    """{ko, en} pair read from two source keys, each falling back to the other."""
+    return lambda record: {
+        'ko': record.get(ko_key, record.get(en_key, '')),
+        'en': record.get(en_key, record.get(ko_key, '')),
+    }
+
+
+def untranslated(key):
+    """{ko, en} pair that repeats the source text until it gets translated."""
+    return lambda record: {'ko': record.get(key, ''), 'en': record.get(key, '')}
+
+
+# -- Dataset specs -------------------------------------------------------
+#
+# fields:   main-file key -> getter, in output order
+# i18n:     i18n key -> getter, in output order
+# i18n_key: i18n map key of a record (defaults to its id)
+# children: (key, spec) of nested records, appended to the main record
+# container: top-level key holding the records, for dict-shaped sources
+# shards:   can also split the i18n maps per character/era (see dialogue_index)
+
+QUIZ_SPEC = {
+    'fields': {
+        'id': required('id'),
+        'type': field('type', 'multipleChoice'),
+        'difficulty': field('difficulty', 'medium'),
+        'correctAnswer': field('correctAnswer'),
+        'eraId': field('eraId'),
+        'relatedFactId': field('relatedFactId'),
+        'relatedDialogueId': field('relatedDialogueId'),
+        'basePoints': field('basePoints', 10),
+        'timeLimitSeconds': field('timeLimitSeconds', 30),
+    },
+    'i18n': {
+        'question': field('question'),
+        'options': field('options', []),
+        'explanation': field('explanation'),
+    },
+}
+
+TRANSFORMS = {
+    'characters': {
+        'output': 'characters_new.json',
+        'fields': {
+            'id': required('id'),
+            'eraId': required('eraId'),
+            'name': localized('nameKorean', 'name'),
+            'title': untranslated('title'),
+            'birth': field('birth'),
+            'death': field('death'),
+            'portraitAsset': field('portraitAsset'),
+            'emotionAssets': field('emotionAssets', []),
+            'dialogueIds': field('dialogueIds', []),
+            'relatedCharacterIds': field('relatedCharacterIds', []),
+            'relatedLocationIds': field('relatedLocationIds', []),
+            'status': field('status', 'locked'),
+        },
+        'i18n': {
+            'biography': field('biography'),
+            'fullBiography': field('fullBiography'),
+            'achievements': field('achievements', []),
+        },
+    },
+    'locations': {
+        'output': 'locations_new.json',
+        'fields': {
+            'id': required('id'),
+            'eraId': field('eraId'),
+            'name': localized('nameKorean', 'name'),
+            'thumbnailAsset': field('thumbnailAsset'),
+            'backgroundAsset': field('backgroundAsset'),
+            'kingdom': field('kingdom', None),
+            'latitude': field('latitude', 0.0),
+            'longitude': field('longitude', 0.0),
+            'displayYear': field('displayYear'),
+            'timelineOrder': field('timelineOrder', 0),
+            'position': field('position', {}),
+            'characterIds': field('characterIds', []),
+            'eventIds': field('eventIds', []),
+            'status': field('status', 'locked'),
+            'isHistorical': field('isHistorical', True),
+        },
+        'i18n': {
+            'description': field('description'),
+        },
+    },
+    'quizzes': {
+        'output': 'quizzes_new.json',
+        'container': 'categories',
+        'fields': {
+            'id': required('id'),
+            'title': untranslated('title'),
+        },
+        'i18n_key': lambda category: f"category_{category['id']}",
+        'i18n': {
+            'description': field('description'),
+        },
+        'children': ('quizzes', QUIZ_SPEC),
+    },
+    'dialogues': {
+        'output': 'dialogues_new.json',
+        'shards': True,
+        'fields': {
+            'id': required('id'),
+            'characterId': field('characterId'),
+            'title': localized('titleKorean', 'title'),
+            'estimatedMinutes': field('estimatedMinutes', 5),
+            'rewards': field('rewards', []),
+        },
+        'i18n': {
+            'description': field('description'),
+            'nodes': field('nodes', []),
+        },
+    },
+}
+
+
+# -- Engine --------------------------------------------------------------
+
+class ShardWriters:
+    """Lazily opened ObjectWriter per (locale, shard), closed with the ExitStack."""
+
+    def __init__(self, store, stack):
+        self.store = store
+        self.stack = stack
+        self.writers = {}
+        self.index = {}
+
+    def write(self, locale, shard, record_id, content):
+        self.index[record_id] = shard
+        if not content:
+            return
+        key = (locale, shard)
+        if key not in self.writers:
+            path = self.store.path(f'i18n/{locale}/dialogues/{shard}.json')
+            self.writers[key] = self.stack.enter_context(ObjectWriter(path))
+        self.writers[key].write(record_id, content)
+
+    def write_index(self, shard_by):
+        shards = sorted({shard for _, shard in self.writers})
+        write_json(self.store.path(DIALOGUE_INDEX_FILE), {
+            'shardBy': shard_by,
+            'shards': shards,
+            'dialogues': self.index,
+        })
+
+
+def clear_shards(store, index=False):
+    # Drop shards of a previous run, so renamed/removed characters leave nothing behind
+    for locale in LOCALES:
+        for path in store.path(f'i18n/{locale}/dialogues').glob('*.json'):
+            path.unlink()
+    if index:
+        store.path(DIALOGUE_INDEX_FILE).unlink(missing_ok=True)
+
+
+def apply_spec(spec, record, emit):
+    """Builds the main record and passes (i18n key, content) of it and its children to emit."""
+    main = {key: getter(record) for key, getter in spec['fields'].items()}
+    i18n_key = spec.get('i18n_key', lambda item: item['id'])(record)
+    emit(i18n_key, {key: getter(record) for key, getter in spec['i18n'].items()})
+
+    if 'children' in spec:
+        child_key, child_spec = spec['children']
+        main[child_key] = [apply_spec(child_spec, child, emit) for child in record.get(child_key, [])]
+    return main
+
+
+def run_transform(store, name, shard_by=None):
+    """Transforms one dataset into its main file and i18n maps. Returns the record count.
+
+    With shard_by ('character' or 'era'), datasets with shards also get sharded
+    i18n maps and the dialogue index; without it, shards of earlier runs are removed.
+    """
+    spec = TRANSFORMS[name]
+    if spec.get('shards'):
+        clear_shards(store, index=not shard_by)
+
+    with ExitStack() as stack:
+        i18n_out = {
+            locale: stack.enter_context(ObjectWriter(store.path(f'i18n/{locale}/{name}.json')))
+            for locale in LOCALES
+        }
+        shards = ShardWriters(store, stack) if spec.get('shards') and shard_by else None
+        shard = None
+
+        def emit(key, content):
+            # Sources only carry fallback-locale text; other locales hold translated
+            # fields only, so they stay empty and the app falls back field by field
+            for locale, out in i18n_out.items():
+                localized_content = content if locale == FALLBACK_LOCALE else {}
+                if localized_content:
+                    out.write(key, localized_content)
+                if shards:
+                    shards.write(locale, shard, key, localized_content)
+
+        if 'container' in spec:
+            records = store.raw(name).get(spec['container'], [])
+            main = [apply_spec(spec, record, emit) for record in records]
+            write_json(store.path(spec['output']), {spec['container']: main})
+            count = len(main)
+        else:
+            main_out = stack.enter_context(ArrayWriter(store.path(spec['output'])))
+            for record in store.stream(name):
+                if shards:
+                    shard = dialogue_shard_key(record, store, shard_by)
+                main_out.write(apply_spec(spec, record, emit))
+            count = main_out.count
+
+    if shards:
+        shards.write_index(shard_by)
+    return count
+
+
+def _run_in_worker(data_dir, name, shard_by):
+    return run_transform(ContentStore(data_dir), name, shard_by)
+
+
+def transform_inputs(name, shard_by):
+    """Data files a dataset's outputs depend on."""
+    inputs = [DATASET_FILES[name]]
+    if TRANSFORMS[name].get('shards') and shard_by == 'era':
+        inputs.append(DATASET_FILES['characters'])
+    return inputs
+
+
+def transform_outputs(name, shard_by=None):
+    outputs = [TRANSFORMS[name]['output']] + [f'i18n/{locale}/{name}.json' for locale in LOCALES]
+    if TRANSFORMS[name].get('shards') and shard_by:
+        outputs.append(DIALOGUE_INDEX_FILE)
+    return outputs
+
+
+def input_hash(store, name, shard_by):
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    options = f'{name}:{shard_by}' if TRANSFORMS[name].get('shards') else name
+    digest.update(options.encode('utf-8'))
+    for relpath in transform_inputs(name, shard_by):
+        with open(store.path(relpath), 'rb') as f:
+            digest.update(hashlib.file_digest(f, 'sha256').digest())
+    return digest.hexdigest()
+
+
+def run_transforms(store=None, names=None, jobs=None, force=False, shard_by=None,
+                   cache_path=DEFAULT_CACHE_PATH):
+    """Runs the transforms of the given datasets (all by default) and returns {name: count or None}.
+
+    None marks a dataset skipped because its inputs are unchanged since the last run.
+    With cache_path=None nothing is skipped or recorded (for callers tracking staleness
+    themselves, like content_build).
+    """
+    store = store or get_store()
+    names = list(names or TRANSFORMS)
+    cache_path = cache_path and Path(cache_path)
+    cache = json.loads(cache_path.read_text(encoding='utf-8')) if cache_path and cache_path.exists() else {}
+    cache_key = str(store.data_dir.resolve())
+    previous = cache.get(cache_key, {})
+
+    results = {}
+    hashes = {}
+    for name in names:
+        hashes[name] = input_hash(store, name, shard_by)
+        unchanged = previous.get(name) == hashes[name]
+        if cache_path and not force and unchanged and all(store.exists(relpath) for relpath in transform_outputs(name, shard_by)):
+            results[name] = None
+
+    pending = [name for name in names if name not in results]
+    if len(pending) == 1:
+        results[pending[0]] = run_transform(store, pending[0], shard_by)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {name: executor.submit(_run_in_worker, store.data_dir, name, shard_by) for name in pending}
+            for name, future in futures.items():
+                results[name] = future.result()
+
+    for name in pending:
+        for relpath in transform_outputs(name, shard_by):
+            store.discard(relpath)
+
+    if cache_path:
+        cache[cache_key] = {**previous, **hashes}
+        write_json(cache_path, cache, indent=2)
+    return {name: results[name] for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split content datasets into main and i18n files.')
+    parser.add_argument('datasets', nargs='*', metavar='dataset',
+                        help=f"Datasets to transform (default: all of {', '.join(TRANSFORMS)})")
+    parser.add_argument('--input-dir', default='assets/data', help='Content data directory')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Ignore recorded input hashes')
+    parser.add_argument('--no-cache', action='store_true', help='Neither skip datasets nor record input hashes')
+    parser.add_argument('--shard-by', choices=['character', 'era'], default=None,
+                        help='Also split dialogue i18n content into shards (not read by the app yet)')
+    args = parser.parse_args()
+    unknown = set(args.datasets) - set(TRANSFORMS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    results = run_transforms(get_store(args.input_dir), args.datasets, args.jobs, args.force, args.shard_by,
+                             cache_path=None if args.no_cache else DEFAULT_CACHE_PATH)
+    for name, count in results.items():
+        print(f'- {name}: ' + ('unchanged, skipped' if count is None else f'{count} records'))
+
+
+if __name__ == '__main__':
+    main()
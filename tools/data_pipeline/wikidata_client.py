@@ -0,0 +1,167 @@
+"""
+Wikidata SPARQL client with an on-disk response cache.
+
+Responses are cached under .cache/wikidata/ keyed by the sha256 of the
+endpoint and the whitespace-normalized query, and reused until they are older
+than the TTL. The client can be shared by several threads; at most
+`concurrency` requests are in flight and request starts are spaced to stay
+within the query service limits (5 parallel queries per client). Throttling (429), server errors and network failures are retried with
+exponential backoff, honouring Retry-After.
+
+Offline mode only replays the cache (any age) and fails on a miss, so content
+generation can be rerun without network access. The endpoint is configurable,
+which also lets the client run against a local HTTP stand-in.
+
+Usage:
+    from wikidata_client import WikidataClient
+
+    client = WikidataClient()
+    data = client.query('SELECT ?item WHERE { ?item wdt:P31 wd:Q5 } LIMIT 1')
+"""
+
+import hashlib
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from content_store import write_json
+
+WIKIDATA_ENDPOINT = 'https://query.wikidata.org/sparql'
+USER_AGENT = 'TimeWalkerGameContentBot/1.0 (kaywalker@example.com)'
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.cache' / 'wikidata'
+DEFAULT_TTL = 7 * 24 * 3600
+
+# The query service allows 5 parallel queries per client
+MAX_CONCURRENCY = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Longer queries (large VALUES blocks) are POSTed to stay clear of URL limits
+MAX_GET_URL = 2000
+
+
+class WikidataError(Exception):
+    """A query failed after its retries, or missed the cache in offline mode."""
+
+
+def normalize_query(query):
+    return ' '.join(query.split())
+
+
+class WikidataClient:
+    def __init__(self, endpoint=WIKIDATA_ENDPOINT, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL,
+                 concurrency=MAX_CONCURRENCY, min_interval=0.2, timeout=60, retries=4, backoff=2.0,
+                 offline=False, user_agent=USER_AGENT):
+        self.endpoint = endpoint
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self.concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.offline = offline
+        self.user_agent = user_agent
+        self.stats = {'cached': 0, 'fetched': 0, 'retried': 0}
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._pace_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    # -- Cache -------------------------------------------------------------
+
+    def cache_key(self, query):
+        return hashlib.sha256(f'{self.endpoint}\n{normalize_query(query)}'.encode('utf-8')).hexdigest()
+
+    def _cache_path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def cached(self, query, max_age=None):
+        """Cached response of a query, or None if missing or older than max_age seconds."""
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(self.cache_key(query))
+        if not path.exists():
+            return None
+        entry = json.loads(path.read_text(encoding='utf-8'))
+        if max_age is not None and time.time() - entry['fetched'] > max_age:
+            return None
+        return entry['response']
+
+    def _store(self, query, response):
+        if self.cache_dir:
+            write_json(self._cache_path(self.cache_key(query)), {
+                'fetched': time.time(),
+                'endpoint': self.endpoint,
+                'query': normalize_query(query),
+                'response': response,
+            }, indent=None)
+
+    # -- Requests ----------------------------------------------------------
+
+    def _pace(self):
+        # Spaces request starts by min_interval across all threads
+        with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _request(self, query):
+        params = urllib.parse.urlencode({'format': 'json', 'query': query})
+        url = f'{self.endpoint}?{params}'
+        headers = {'User-Agent': self.user_agent, 'Accept': 'application/sparql-results+json'}
+        if len(url) <= MAX_GET_URL:
+            return urllib.request.Request(url, headers=headers)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        return urllib.request.Request(self.endpoint, data=params.encode('utf-8'), headers=headers)
+
+    def _fetch(self, query):
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt * (0.5 + random.random() / 2)
+            try:
+                with self._slots:
+                    self._pace()
+                    with urllib.request.urlopen(self._request(query), timeout=self.timeout) as response:
+                        return json.loads(response.read().decode('utf-8'))
+            except urllib.error.HTTPError as error:
+                if error.code not in RETRY_STATUSES or attempt == self.retries:
+                    raise WikidataError(f'HTTP {error.code} from {self.endpoint}') from error
+                retry_after = error.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as error:
+                if attempt == self.retries:
+                    raise WikidataError(f'{self.endpoint} unreachable: {error}') from error
+            except ValueError as error:
+                raise WikidataError(f'invalid JSON from {self.endpoint}') from error
+            self._count('retried')
+            time.sleep(delay)
+
+    def query(self, query):
+        """SPARQL JSON response of a query, from the cache when fresh enough."""
+        response = self.cached(query, max_age=None if self.offline else self.ttl)
+        if response is not None:
+            self._count('cached')
+            return response
+        if self.offline:
+            raise WikidataError('query is not cached (offline mode)')
+
+        response = self._fetch(query)
+        self._count('fetched')
+        self._store(query, response)
+        return response
+
+
+def bindings(response):
+    """Result rows of a SPARQL JSON response."""
+    return (response or {}).get('results', {}).get('bindings', [])
@@ -6,7 +6,7 @@
 더미 오디오 파일(사인파 톤)을 생성합니다.
 
 사용법:
-    python3 tools/generate_dummy_audio.py
+    python3 tools/generate_dummy_audio.py [--jobs N]
 
 생성되는 파일:
     - assets/audio/bgm/*.mp3 (배경음악)
@@ -16,16 +16,29 @@
     - 실제 프로덕션에서는 적절한 라이선스의 음악 파일로 교체해야 합니다.
     - MP3 변환을 위해 pydub 사용 시 ffmpeg가 필요합니다.
     - ffmpeg가 없으면 WAV 파일로 생성됩니다.
+    - numpy가 설치되어 있으면 벡터 연산으로 합성하고,
+      없으면 표준 라이브러리 array 모듈로 합성합니다.
+    - 합성은 프로세스 풀에서, MP3 인코딩은 CPU 수만큼의 ffmpeg 프로세스에서
+      동시에 실행되며, WAV 데이터는 디스크를 거치지 않고 ffmpeg stdin으로 전달됩니다.
 """
 
+import argparse
+import io
 import os
+import sys
 import wave
-import struct
 import math
 import subprocess
 import shutil
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # 프로젝트 루트 디렉토리
 PROJECT_ROOT = Path(__file__).parent.parent
 BGM_DIR = PROJECT_ROOT / "assets" / "audio" / "bgm"
@@ -36,6 +49,12 @@ SAMPLE_RATE = 44100  # Hz
 CHANNELS = 2  # 스테레오
 SAMPLE_WIDTH = 2  # 16-bit
 
+# 동시 작업 수 기본값 (합성 프로세스 수 = 동시 ffmpeg 인코딩 수)
+DEFAULT_JOBS = os.cpu_count() or 1
+
+# 하모닉 구성 (배수, 진폭) - 기본음 + 2, 3배음으로 더 풍부한 소리
+HARMONICS = ((1, 1.0), (2, 0.3), (3, 0.1))
+
 # BGM 파일 정의 (파일명, 길이(초), 주파수(Hz), 설명)
 BGM_FILES = [
     ("main_menu.mp3", 30, 220, "메인 메뉴 BGM - A3 음"),
@@ -76,44 +95,102 @@ def generate_sine_wave(frequency, duration, volume=0.3, fade_in=0.1, fade_out=0.
         fade_out: 페이드 아웃 시간 (초)
     
     Returns:
-        바이트 데이터
+        바이트 데이터 (16-bit little-endian 스테레오 PCM)
     """
     num_samples = int(SAMPLE_RATE * duration)
     fade_in_samples = int(SAMPLE_RATE * min(fade_in, duration / 2))
     fade_out_samples = int(SAMPLE_RATE * min(fade_out, duration / 2))
     
-    samples = []
+    synthesize = _synthesize_numpy if np is not None else _synthesize_array
+    return synthesize(frequency, num_samples, fade_in_samples, fade_out_samples, volume)
+
+
+def _synthesize_numpy(frequency, num_samples, fade_in_samples, fade_out_samples, volume):
+    """
+    numpy로 전체 샘플을 한 번에 합성합니다.
+    """
+    index = np.arange(num_samples, dtype=np.float64)
+    phase = (2 * math.pi * frequency / SAMPLE_RATE) * index
+    
+    # 하모닉 합성 후 정규화
+    value = np.zeros(num_samples)
+    for multiple, amplitude in HARMONICS:
+        value += amplitude * np.sin(multiple * phase)
+    value *= volume / sum(amplitude for _, amplitude in HARMONICS)
     
-    for i in range(num_samples):
-        # 기본 사인파
-        t = i / SAMPLE_RATE
-        value = math.sin(2 * math.pi * frequency * t)
-        
-        # 약간의 하모닉 추가 (더 풍부한 소리)
-        value += 0.3 * math.sin(4 * math.pi * frequency * t)  # 2nd harmonic
-        value += 0.1 * math.sin(6 * math.pi * frequency * t)  # 3rd harmonic
-        
-        # 정규화
-        value = value / 1.4
-        
-        # 페이드 인/아웃 적용
-        if i < fade_in_samples:
-            value *= i / fade_in_samples
-        elif i > num_samples - fade_out_samples:
-            value *= (num_samples - i) / fade_out_samples
-        
-        # 볼륨 적용
-        value *= volume
-        
-        # 16-bit 정수로 변환
-        sample = int(value * 32767)
-        sample = max(-32768, min(32767, sample))
-        
-        # 스테레오 (좌/우 동일)
-        samples.append(sample)
-        samples.append(sample)
+    # 페이드 인/아웃 엔벨로프 (페이드 인 구간이 우선)
+    if fade_out_samples:
+        tail_start = max(num_samples - fade_out_samples + 1, fade_in_samples)
+        value[tail_start:] *= (num_samples - index[tail_start:]) / fade_out_samples
+    if fade_in_samples:
+        value[:fade_in_samples] *= index[:fade_in_samples] / fade_in_samples
+    
+    # 16-bit 정수로 변환 (0 방향 버림)
+    mono = np.clip(np.trunc(value * 32767), -32768, 32767).astype('<i2')
+    
+    # 스테레오 (좌/우 동일) 인터리빙
+    return np.repeat(mono, CHANNELS).tobytes()
+
+
+def _harmonic_polynomial():
+    """
+    HARMONICS 합을 sin(x) * P(cos(x)) 형태로 바꾼 다항식 P의 계수 (낮은 차수부터)
+    
+    sin(kx) = sin(x) * U_{k-1}(cos(x)) (제2종 체비쇼프 다항식)를 이용합니다.
+    """
+    degree = max(multiple for multiple, _ in HARMONICS)
+    coefficients = [0.0] * degree
+    prev, current = [0.0] * degree, [1.0] + [0.0] * (degree - 1)  # U_{-1}, U_0
+    for k in range(1, degree + 1):
+        amplitude = sum(a for multiple, a in HARMONICS if multiple == k)
+        coefficients = [c + amplitude * u for c, u in zip(coefficients, current)]
+        # U_k = 2c * U_{k-1} - U_{k-2}
+        shifted = [0.0] + [2 * u for u in current[:-1]]
+        prev, current = current, [s - p for s, p in zip(shifted, prev)]
+    return coefficients
+
+
+def _synthesize_array(frequency, num_samples, fade_in_samples, fade_out_samples, volume):
+    """
+    numpy가 없을 때 array 모듈로 합성합니다.
+    
+    샘플당 sin/cos 한 번씩만 계산하고, 결과는 중간 리스트 없이 array('h')에 바로 채웁니다.
+    """
+    step = 2 * math.pi * frequency / SAMPLE_RATE
+    scale = volume / sum(amplitude for _, amplitude in HARMONICS) * 32767
+    polynomial = [c * scale for c in reversed(_harmonic_polynomial())]
+    tail_start = max(num_samples - fade_out_samples + 1, fade_in_samples) if fade_out_samples else num_samples
+    sin, cos = math.sin, math.cos
+    
+    def wave_value(i):
+        x = step * i
+        c = cos(x)
+        value = 0.0
+        for coefficient in polynomial:
+            value = value * c + coefficient
+        return sin(x) * value
     
-    return struct.pack('<' + 'h' * len(samples), *samples)
+    def clamp(value):
+        return max(-32768, min(32767, int(value)))
+    
+    # 페이드 인 / 본체 / 페이드 아웃 구간별로 채움
+    mono = array('h')
+    if fade_in_samples:
+        mono.extend(clamp(wave_value(i) * (i / fade_in_samples)) for i in range(min(fade_in_samples, num_samples)))
+    mono.extend(clamp(wave_value(i)) for i in range(len(mono), tail_start))
+    if fade_out_samples:
+        mono.extend(
+            clamp(wave_value(i) * ((num_samples - i) / fade_out_samples))
+            for i in range(len(mono), num_samples)
+        )
+    
+    # 스테레오 (좌/우 동일) 인터리빙
+    stereo = array('h', bytes(SAMPLE_WIDTH * CHANNELS * num_samples))
+    for channel in range(CHANNELS):
+        stereo[channel::CHANNELS] = mono
+    if sys.byteorder == 'big':
+        stereo.byteswap()
+    return stereo.tobytes()
 
 
 def generate_sfx_wave(frequency, duration, volume=0.5):
@@ -129,76 +206,106 @@ def generate_sfx_wave(frequency, duration, volume=0.5):
     )
 
 
-def create_wav_file(filepath, audio_data):
+def encode_wav(audio_data):
     """
-    WAV 파일을 생성합니다.
+    WAV 파일 내용을 메모리에서 생성합니다.
     """
-    with wave.open(str(filepath), 'w') as wav_file:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
         wav_file.setnchannels(CHANNELS)
         wav_file.setsampwidth(SAMPLE_WIDTH)
         wav_file.setframerate(SAMPLE_RATE)
         wav_file.writeframes(audio_data)
+    return buffer.getvalue()
 
 
-def convert_wav_to_mp3(wav_path, mp3_path):
+def synthesize_track(duration, frequency, is_sfx=False):
     """
-    WAV 파일을 MP3로 변환합니다.
+    트랙 하나를 합성해 WAV 바이트로 반환합니다 (프로세스 풀 작업 단위).
+    """
+    if is_sfx:
+        audio_data = generate_sfx_wave(frequency, duration)
+    else:
+        audio_data = generate_sine_wave(frequency, duration)
+    return encode_wav(audio_data)
+
+
+def encode_mp3(wav_data, mp3_path):
+    """
+    WAV 데이터를 ffmpeg stdin으로 전달해 MP3로 인코딩합니다.
     ffmpeg가 필요합니다.
     """
-    # ffmpeg 확인
-    if shutil.which('ffmpeg') is None:
-        print("  ⚠️  ffmpeg가 설치되어 있지 않습니다. WAV 파일을 유지합니다.")
-        return False
-    
     try:
         subprocess.run([
-            'ffmpeg', '-y', '-i', str(wav_path),
+            'ffmpeg', '-y', '-f', 'wav', '-i', 'pipe:0',
             '-codec:a', 'libmp3lame', '-qscale:a', '2',
             str(mp3_path)
-        ], check=True, capture_output=True)
-        
-        # 변환 성공 시 WAV 파일 삭제
-        os.remove(wav_path)
+        ], input=wav_data, check=True, capture_output=True)
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"  ⚠️  MP3 변환 실패: {e}")
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"  ⚠️  MP3 변환 실패 ({mp3_path.name}): {e}")
         return False
 
 
-def generate_audio_files(directory, files, is_sfx=False):
+def save_track(directory, filename, wav_data, use_ffmpeg):
+    """
+    합성된 트랙을 MP3로 인코딩하거나, 불가능하면 WAV로 저장합니다.
+    """
+    mp3_path = directory / filename
+    if use_ffmpeg and encode_mp3(wav_data, mp3_path):
+        print(f"     ✓ MP3로 저장됨: {mp3_path.name}")
+        return mp3_path
+    
+    # 변환 실패 시 WAV 파일로 저장
+    # (Flutter의 flame_audio는 확장자로 판단하지 않음)
+    final_path = directory / filename.replace('.mp3', '.wav')
+    final_path.write_bytes(wav_data)
+    print(f"     → WAV로 저장됨: {final_path.name}")
+    return final_path
+
+
+def generate_audio_files(groups, jobs=DEFAULT_JOBS):
     """
     오디오 파일들을 생성합니다.
+    
+    Args:
+        groups: [(디렉토리, 파일 정의 목록, 효과음 여부)]
+        jobs: 동시 합성 프로세스 수이자 동시 ffmpeg 인코딩 수 (1이면 순차 실행)
+    
+    합성이 끝난 트랙부터 바로 인코딩을 시작하므로 합성과 인코딩이 겹쳐 실행됩니다.
     """
-    # 디렉토리 생성
-    directory.mkdir(parents=True, exist_ok=True)
+    use_ffmpeg = shutil.which('ffmpeg') is not None
+    if not use_ffmpeg:
+        print("  ⚠️  ffmpeg가 설치되어 있지 않습니다. WAV 파일로 저장합니다.")
     
-    for filename, duration, frequency, description in files:
-        print(f"  📝 생성 중: {filename} ({description})")
-        
-        # 파일 경로
-        base_name = filename.rsplit('.', 1)[0]
-        wav_path = directory / f"{base_name}.wav"
-        mp3_path = directory / filename
-        
-        # 오디오 데이터 생성
-        if is_sfx:
-            audio_data = generate_sfx_wave(frequency, duration)
-        else:
-            audio_data = generate_sine_wave(frequency, duration)
-        
-        # WAV 파일 생성
-        create_wav_file(wav_path, audio_data)
+    tracks = []
+    for directory, files, is_sfx in groups:
+        # 디렉토리 생성
+        directory.mkdir(parents=True, exist_ok=True)
+        for filename, duration, frequency, description in files:
+            tracks.append((directory, filename, duration, frequency, description, is_sfx))
+    
+    if jobs <= 1:
+        for directory, filename, duration, frequency, description, is_sfx in tracks:
+            print(f"  📝 생성 중: {filename} ({description})")
+            save_track(directory, filename, synthesize_track(duration, frequency, is_sfx), use_ffmpeg)
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as synth_pool, \
+            ThreadPoolExecutor(max_workers=jobs) as encode_pool:
+        synth_futures = {}
+        for directory, filename, duration, frequency, description, is_sfx in tracks:
+            print(f"  📝 생성 중: {filename} ({description})")
+            future = synth_pool.submit(synthesize_track, duration, frequency, is_sfx)
+            synth_futures[future] = (directory, filename)
         
-        # MP3로 변환 시도
-        if not convert_wav_to_mp3(wav_path, mp3_path):
-            # 변환 실패 시 WAV 파일명을 MP3로 변경
-            # (Flutter의 flame_audio는 확장자로 판단하지 않음)
-            final_path = directory / filename.replace('.mp3', '.wav')
-            if wav_path != final_path:
-                shutil.move(wav_path, final_path)
-            print(f"     → WAV로 저장됨: {final_path.name}")
-        else:
-            print(f"     ✓ MP3로 저장됨: {mp3_path.name}")
+        # 합성이 끝나는 순서대로 인코딩 (ffmpeg 프로세스 수는 스레드 수로 제한)
+        encode_futures = [
+            encode_pool.submit(save_track, *synth_futures[future], future.result(), use_ffmpeg)
+            for future in as_completed(synth_futures)
+        ]
+        for future in encode_futures:
+            future.result()
 
 
 def check_flutter_audio_support():
@@ -252,19 +359,26 @@ def print_summary():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="TimeWalker 더미 오디오 파일 생성")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"동시 합성/인코딩 작업 수, 1이면 순차 실행 (기본: CPU 수 {DEFAULT_JOBS})",
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🎵 TimeWalker 더미 오디오 파일 생성 스크립트")
     print("=" * 60)
     print()
     
-    # BGM 파일 생성
-    print("🎶 BGM 파일 생성 중...")
-    generate_audio_files(BGM_DIR, BGM_FILES, is_sfx=False)
-    print()
-    
-    # SFX 파일 생성
-    print("🔔 SFX 파일 생성 중...")
-    generate_audio_files(SFX_DIR, SFX_FILES, is_sfx=True)
+    # BGM/SFX 파일 생성 (하나의 파이프라인에서 병렬 처리)
+    print("🎶 BGM / 🔔 SFX 파일 생성 중...")
+    generate_audio_files(
+        [(BGM_DIR, BGM_FILES, False), (SFX_DIR, SFX_FILES, True)],
+        jobs=args.jobs,
+    )
     
     # 요약 출력
     print_summary()
@@ -0,0 +1,189 @@
+"""
+TimeWalker 콘텐츠 행 해시
+
+로컬 JSON 항목을 load.sql과 같은 규칙으로 main 테이블 행 형태로 변환하고,
+Postgres의 jsonb 텍스트 표현과 동일한 문자열의 md5를 계산합니다.
+원격 해시는 verify.sql의 content_row_hashes()가 서버에서 계산하므로,
+행 본문을 내려받지 않고 (id, hash)만 비교할 수 있습니다.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+# 컬럼 타입
+TEXT = "text"  # payload->>'key'
+INT = "int"  # (payload->>'key')::int
+FLOAT = "float"  # (payload->>'key')::double precision
+BOOL = "bool"  # (payload->>'key')::boolean
+JSONB = "jsonb"  # payload->'key'
+TEXT_ARRAY = "text_array"  # jsonb_text_array(payload->'key')
+TIMESTAMPTZ = "timestamptz"  # (payload->>'key')::timestamptz
+
+# 테이블 -> [(컬럼, 타입, payload 키, coalesce 기본값)] (load.sql과 동일한 매핑)
+ROW_SPECS: dict[str, list[tuple[str, str, str, Any]]] = {
+    "characters": [
+        ("id", TEXT, "id", None),
+        ("era_id", TEXT, "eraId", None),
+        ("name", TEXT, "name", None),
+        ("name_korean", TEXT, "nameKorean", None),
+        ("title", TEXT, "title", None),
+        ("birth", TEXT, "birth", None),
+        ("death", TEXT, "death", None),
+        ("biography", TEXT, "biography", None),
+        ("full_biography", TEXT, "fullBiography", None),
+        ("portrait_asset", TEXT, "portraitAsset", None),
+        ("emotion_assets", TEXT_ARRAY, "emotionAssets", None),
+        ("dialogue_ids", TEXT_ARRAY, "dialogueIds", None),
+        ("related_character_ids", TEXT_ARRAY, "relatedCharacterIds", None),
+        ("related_location_ids", TEXT_ARRAY, "relatedLocationIds", None),
+        ("achievements", TEXT_ARRAY, "achievements", None),
+        ("status", TEXT, "status", "locked"),
+        ("is_historical", BOOL, "isHistorical", True),
+    ],
+    "dialogues": [
+        ("id", TEXT, "id", None),
+        ("character_id", TEXT, "characterId", None),
+        ("title", TEXT, "title", None),
+        ("title_korean", TEXT, "titleKorean", None),
+        ("description", TEXT, "description", None),
+        ("estimated_minutes", INT, "estimatedMinutes", 5),
+        ("nodes", JSONB, "nodes", []),
+        ("rewards", JSONB, "rewards", []),
+        ("is_completed", BOOL, "isCompleted", False),
+    ],
+    "locations": [
+        ("id", TEXT, "id", None),
+        ("era_id", TEXT, "eraId", None),
+        ("name", TEXT, "name", None),
+        ("name_korean", TEXT, "nameKorean", None),
+        ("description", TEXT, "description", None),
+        ("thumbnail_asset", TEXT, "thumbnailAsset", None),
+        ("background_asset", TEXT, "backgroundAsset", None),
+        ("kingdom", TEXT, "kingdom", None),
+        ("latitude", FLOAT, "latitude", None),
+        ("longitude", FLOAT, "longitude", None),
+        ("display_year", TEXT, "displayYear", None),
+        ("timeline_order", INT, "timelineOrder", None),
+        ("position", JSONB, "position", {"x": 0, "y": 0}),
+        ("character_ids", TEXT_ARRAY, "characterIds", None),
+        ("event_ids", TEXT_ARRAY, "eventIds", None),
+        ("status", TEXT, "status", "locked"),
+        ("is_historical", BOOL, "isHistorical", True),
+    ],
+    "encyclopedia_entries": [
+        ("id", TEXT, "id", None),
+        ("type", TEXT, "type", None),
+        ("title", TEXT, "title", None),
+        ("title_korean", TEXT, "titleKorean", None),
+        ("summary", TEXT, "summary", None),
+        ("content", TEXT, "content", None),
+        ("thumbnail_asset", TEXT, "thumbnailAsset", None),
+        ("image_asset", TEXT, "imageAsset", None),
+        ("era_id", TEXT, "eraId", None),
+        ("related_entry_ids", TEXT_ARRAY, "relatedEntryIds", None),
+        ("tags", TEXT_ARRAY, "tags", None),
+        ("is_discovered", BOOL, "isDiscovered", False),
+        ("discovered_at", TIMESTAMPTZ, "discoveredAt", None),
+        ("discovery_source", TEXT, "discoverySource", None),
+    ],
+    "quiz_categories": [
+        ("id", TEXT, "id", None),
+        ("title", TEXT, "title", None),
+        ("description", TEXT, "description", None),
+        ("sort_order", INT, "sortOrder", 0),
+    ],
+    "quizzes": [
+        ("id", TEXT, "id", None),
+        ("category_id", TEXT, "categoryId", None),
+        ("question", TEXT, "question", None),
+        ("type", TEXT, "type", None),
+        ("difficulty", TEXT, "difficulty", None),
+        ("options", TEXT_ARRAY, "options", None),
+        ("correct_answer", TEXT, "correctAnswer", None),
+        ("explanation", TEXT, "explanation", None),
+        ("image_asset", TEXT, "imageAsset", None),
+        ("era_id", TEXT, "eraId", None),
+        ("related_fact_id", TEXT, "relatedFactId", None),
+        ("related_dialogue_id", TEXT, "relatedDialogueId", None),
+        ("related_character_id", TEXT, "relatedCharacterId", None),
+        ("related_location_id", TEXT, "relatedLocationId", None),
+        ("base_points", INT, "basePoints", 10),
+        ("time_limit_seconds", INT, "timeLimitSeconds", 30),
+    ],
+}
+
+
+def jsonb_text(value: Any) -> str:
+    """Postgres jsonb::text와 같은 직렬화
+
+    객체 키는 (바이트 길이, 바이트) 순으로 정렬되고 구분자는 ", "와 ": "입니다.
+    """
+    if isinstance(value, dict):
+        keys = sorted(value, key=lambda k: (len(k.encode("utf-8")), k.encode("utf-8")))
+        return "{" + ", ".join(f"{json.dumps(k, ensure_ascii=False)}: {jsonb_text(value[k])}" for k in keys) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(jsonb_text(item) for item in value) + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _as_text(value: Any) -> str | None:
+    """payload->>'key' 결과 (문자열은 그대로, 그 외는 jsonb 텍스트)"""
+    if value is None or isinstance(value, str):
+        return value
+    return jsonb_text(value)
+
+
+def _timestamptz_text(text: str) -> str:
+    """timestamptz -> jsonb 변환 결과 (UTC 세션 기준)
+
+    오프셋이 없는 값은 UTC로 해석하고, 소수 초는 끝의 0을 뺀 마이크로초까지 출력합니다.
+    ISO 8601이 아닌 값은 그대로 반환합니다.
+    """
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        return text
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    fraction = f".{value.microsecond:06d}".rstrip("0") if value.microsecond else ""
+    return f"{value:%Y-%m-%dT%H:%M:%S}{fraction}+00:00"
+
+
+def _column_value(payload: dict, kind: str, key: str, default: Any) -> Any:
+    if kind == JSONB:
+        # coalesce(payload->'key', ...)는 키가 없을 때만 기본값을 사용
+        return payload[key] if key in payload else default
+
+    if kind == TEXT_ARRAY:
+        value = payload.get(key)
+        if not isinstance(value, list):
+            return []
+        return [_as_text(item) for item in value]
+
+    text = _as_text(payload.get(key))
+    if text is None:
+        return default
+    if kind == INT:
+        return int(text)
+    if kind == FLOAT:
+        number = float(text)
+        # float8 -> jsonb 변환은 정수 값의 소수부(.0)를 출력하지 않음
+        return int(number) if number.is_integer() else number
+    if kind == BOOL:
+        return text.lower() in ("true", "t", "1", "yes", "on")
+    if kind == TIMESTAMPTZ:
+        return _timestamptz_text(text)
+    return text
+
+
+def expected_row(table: str, payload: dict) -> dict:
+    """로컬 JSON 항목을 load.sql 적용 후의 main 테이블 행으로 변환"""
+    return {column: _column_value(payload, kind, key, default) for column, kind, key, default in ROW_SPECS[table]}
+
+
+def row_hash(table: str, payload: dict) -> str:
+    """verify.sql의 content_row_hashes()와 같은 방식으로 계산한 행 해시"""
+    return hashlib.md5(jsonb_text(expected_row(table, payload)).encode("utf-8")).hexdigest()
@@ -19,7 +19,30 @@ create table if not exists stg_encyclopedia_entries (payload jsonb not null);
 create table if not exists stg_quiz_categories (payload jsonb not null);
 create table if not exists stg_quizzes (payload jsonb not null);
 
-truncate table characters, dialogues, locations, encyclopedia_entries, quiz_categories, quizzes;
+-- Row id and checksum columns used by migrate_data.py (--delta upserts on id)
+alter table stg_characters add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_characters add column if not exists checksum text;
+create unique index if not exists stg_characters_id_idx on stg_characters (id);
+alter table stg_dialogues add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_dialogues add column if not exists checksum text;
+create unique index if not exists stg_dialogues_id_idx on stg_dialogues (id);
+alter table stg_locations add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_locations add column if not exists checksum text;
+create unique index if not exists stg_locations_id_idx on stg_locations (id);
+alter table stg_encyclopedia_entries add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_encyclopedia_entries add column if not exists checksum text;
+create unique index if not exists stg_encyclopedia_entries_id_idx on stg_encyclopedia_entries (id);
+alter table stg_quiz_categories add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_quiz_categories add column if not exists checksum text;
+create unique index if not exists stg_quiz_categories_id_idx on stg_quiz_categories (id);
+alter table stg_quizzes add column if not exists id text generated always as (payload->>'id') stored;
+alter table stg_quizzes add column if not exists checksum text;
+create unique index if not exists stg_quizzes_id_idx on stg_quizzes (id);
+
+-- Upsert from staging and drop rows that are no longer staged, so live tables
+-- are never truncated and unchanged rows keep serving reads during the load.
+
+delete from characters t where not exists (select 1 from stg_characters s where s.id = t.id);
 
 insert into characters (
   id,
@@ -58,7 +81,27 @@ select
   jsonb_text_array(payload->'achievements'),
   coalesce(payload->>'status', 'locked'),
   coalesce((payload->>'isHistorical')::boolean, true)
-from stg_characters;
+from stg_characters
+on conflict (id) do update set
+  era_id = excluded.era_id,
+  name = excluded.name,
+  name_korean = excluded.name_korean,
+  title = excluded.title,
+  birth = excluded.birth,
+  death = excluded.death,
+  biography = excluded.biography,
+  full_biography = excluded.full_biography,
+  portrait_asset = excluded.portrait_asset,
+  emotion_assets = excluded.emotion_assets,
+  dialogue_ids = excluded.dialogue_ids,
+  related_character_ids = excluded.related_character_ids,
+  related_location_ids = excluded.related_location_ids,
+  achievements = excluded.achievements,
+  status = excluded.status,
+  is_historical = excluded.is_historical,
+  updated_at = now();
+
+delete from dialogues t where not exists (select 1 from stg_dialogues s where s.id = t.id);
 
 insert into dialogues (
   id,
@@ -81,7 +124,19 @@ select
   coalesce(payload->'nodes', '[]'::jsonb),
   coalesce(payload->'rewards', '[]'::jsonb),
   coalesce((payload->>'isCompleted')::boolean, false)
-from stg_dialogues;
+from stg_dialogues
+on conflict (id) do update set
+  character_id = excluded.character_id,
+  title = excluded.title,
+  title_korean = excluded.title_korean,
+  description = excluded.description,
+  estimated_minutes = excluded.estimated_minutes,
+  nodes = excluded.nodes,
+  rewards = excluded.rewards,
+  is_completed = excluded.is_completed,
+  updated_at = now();
+
+delete from locations t where not exists (select 1 from stg_locations s where s.id = t.id);
 
 insert into locations (
   id,
@@ -120,7 +175,27 @@ select
   jsonb_text_array(payload->'eventIds'),
   coalesce(payload->>'status', 'locked'),
   coalesce((payload->>'isHistorical')::boolean, true)
-from stg_locations;
+from stg_locations
+on conflict (id) do update set
+  era_id = excluded.era_id,
+  name = excluded.name,
+  name_korean = excluded.name_korean,
+  description = excluded.description,
+  thumbnail_asset = excluded.thumbnail_asset,
+  background_asset = excluded.background_asset,
+  kingdom = excluded.kingdom,
+  latitude = excluded.latitude,
+  longitude = excluded.longitude,
+  display_year = excluded.display_year,
+  timeline_order = excluded.timeline_order,
+  position = excluded.position,
+  character_ids = excluded.character_ids,
+  event_ids = excluded.event_ids,
+  status = excluded.status,
+  is_historical = excluded.is_historical,
+  updated_at = now();
+
+delete from encyclopedia_entries t where not exists (select 1 from stg_encyclopedia_entries s where s.id = t.id);
 
 insert into encyclopedia_entries (
   id,
@@ -153,7 +228,24 @@ select
   coalesce((payload->>'isDiscovered')::boolean, false),
   (payload->>'discoveredAt')::timestamptz,
   payload->>'discoverySource'
-from stg_encyclopedia_entries;
+from stg_encyclopedia_entries
+on conflict (id) do update set
+  type = excluded.type,
+  title = excluded.title,
+  title_korean = excluded.title_korean,
+  summary = excluded.summary,
+  content = excluded.content,
+  thumbnail_asset = excluded.thumbnail_asset,
+  image_asset = excluded.image_asset,
+  era_id = excluded.era_id,
+  related_entry_ids = excluded.related_entry_ids,
+  tags = excluded.tags,
+  is_discovered = excluded.is_discovered,
+  discovered_at = excluded.discovered_at,
+  discovery_source = excluded.discovery_source,
+  updated_at = now();
+
+delete from quiz_categories t where not exists (select 1 from stg_quiz_categories s where s.id = t.id);
 
 insert into quiz_categories (
   id,
@@ -166,7 +258,14 @@ select
   payload->>'title',
   payload->>'description',
   coalesce((payload->>'sortOrder')::int, 0)
-from stg_quiz_categories;
+from stg_quiz_categories
+on conflict (id) do update set
+  title = excluded.title,
+  description = excluded.description,
+  sort_order = excluded.sort_order,
+  updated_at = now();
+
+delete from quizzes t where not exists (select 1 from stg_quizzes s where s.id = t.id);
 
 insert into quizzes (
   id,
@@ -203,7 +302,24 @@ select
   payload->>'relatedLocationId',
   coalesce((payload->>'basePoints')::int, 10),
   coalesce((payload->>'timeLimitSeconds')::int, 30)
-from stg_quizzes;
+from stg_quizzes
+on conflict (id) do update set
+  category_id = excluded.category_id,
+  question = excluded.question,
+  type = excluded.type,
+  difficulty = excluded.difficulty,
+  options = excluded.options,
+  correct_answer = excluded.correct_answer,
+  explanation = excluded.explanation,
+  image_asset = excluded.image_asset,
+  era_id = excluded.era_id,
+  related_fact_id = excluded.related_fact_id,
+  related_dialogue_id = excluded.related_dialogue_id,
+  related_character_id = excluded.related_character_id,
+  related_location_id = excluded.related_location_id,
+  base_points = excluded.base_points,
+  time_limit_seconds = excluded.time_limit_seconds,
+  updated_at = now();
 
 insert into content_versions (dataset, version, checksum)
 values
@@ -213,8 +329,4 @@ values
   ('encyclopedia_entries', 'v1', null),
   ('quiz_categories', 'v1', null),
   ('quizzes', 'v1', null)
-on conflict (dataset)
-do update set
-  version = excluded.version,
-  checksum = excluded.checksum,
-  updated_at = now();
+on conflict (dataset) do nothing;
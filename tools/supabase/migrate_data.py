@@ -16,11 +16,14 @@ TimeWalker Supabase 데이터 마이그레이션 스크립트
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 try:
     from supabase import create_client, Client
@@ -33,6 +36,27 @@ except ImportError:
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 ASSETS_DATA_DIR = PROJECT_ROOT / "assets" / "data"
 
+sys.path.insert(0, str(PROJECT_ROOT / "tools" / "data_pipeline"))
+from json_stream import iter_array
+
+# 업로드 동시성/재시도 기본값
+DEFAULT_CONCURRENCY = 4  # 동시에 전송할 배치 수
+DEFAULT_DATASET_CONCURRENCY = 3  # 동시에 처리할 데이터셋 수
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 1.0  # 초 (지수 백오프 기준값)
+
+# 배치 크기 기본값 (직렬화된 JSON 바이트 기준)
+DEFAULT_TARGET_BATCH_BYTES = 256 * 1024  # 배치를 채우는 목표 크기
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024  # 한 요청의 최대 크기
+DEFAULT_MAX_BATCH_ROWS = 500
+
+# 데이터셋당 전송 대기 중인 배치 수 상한 (동시성의 배수, 메모리 사용량 제한)
+IN_FLIGHT_PER_WORKER = 2
+
+# delta 모드에서 staging 조회/삭제 단위
+STAGING_PAGE_SIZE = 1000
+DELETE_CHUNK_SIZE = 100
+
 # 데이터셋 정의 (JSON 파일 -> 테이블 매핑)
 DATASETS = {
     "characters": {
@@ -68,10 +92,60 @@ DATASETS = {
 }
 
 
-def load_json(file_path: Path) -> list[dict[str, Any]]:
-    """JSON 파일 로드"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def iter_json(file_path: Path) -> Iterator[dict[str, Any]]:
+    """JSON 배열 파일을 항목 단위로 스트리밍 로드"""
+    return iter_array(file_path)
+
+
+def row_checksum(item: dict) -> str:
+    """행 내용 해시 (키 순서와 공백에 무관한 정규화 JSON 기준)"""
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def dataset_checksum(row_checksums: dict[str, str]) -> str:
+    """데이터셋 전체 해시 (ID 순으로 정렬한 행 해시 기준)"""
+    digest = hashlib.sha256()
+    for row_id in sorted(row_checksums):
+        digest.update(f"{row_id}:{row_checksums[row_id]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fetch_content_checksums(client: Client) -> dict[str, str | None]:
+    """content_versions에 기록된 데이터셋별 checksum 조회"""
+    try:
+        response = client.table("content_versions").select("dataset, checksum").execute()
+        return {row["dataset"]: row.get("checksum") for row in response.data}
+    except Exception as e:
+        print(f"  ⚠ content_versions 조회 실패: {e}")
+        return {}
+
+
+def fetch_staging_checksums(client: Client, table_name: str) -> dict[str, str | None]:
+    """Staging 테이블의 ID별 checksum 조회 (payload 본문은 가져오지 않음)"""
+    checksums = {}
+    offset = 0
+    while True:
+        response = (
+            client.table(table_name)
+            .select("id, checksum")
+            .order("id")
+            .range(offset, offset + STAGING_PAGE_SIZE - 1)
+            .execute()
+        )
+        # 서버의 max-rows 설정이 페이지 크기보다 작을 수 있으므로 빈 페이지까지 조회
+        if not response.data:
+            return checksums
+        for row in response.data:
+            checksums[row["id"]] = row.get("checksum")
+        offset += len(response.data)
+
+
+def delete_from_staging(client: Client, table_name: str, ids: list[str]) -> int:
+    """Staging 테이블에서 지정한 ID의 행 삭제"""
+    for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+        client.table(table_name).delete().in_("id", ids[i : i + DELETE_CHUNK_SIZE]).execute()
+    return len(ids)
 
 
 def clear_staging_table(client: Client, table_name: str) -> None:
@@ -84,29 +158,139 @@ def clear_staging_table(client: Client, table_name: str) -> None:
         print(f"  ⚠ {table_name} 비우기 실패 (테이블이 없을 수 있음): {e}")
 
 
-def insert_to_staging(client: Client, table_name: str, data: list[dict]) -> int:
-    """Staging 테이블에 데이터 삽입"""
-    if not data:
-        return 0
+def payload_size(payload: dict) -> int:
+    """요청 본문에서 행이 차지하는 바이트 수 (ASCII 이스케이프 기준 상한값)"""
+    return len(json.dumps(payload, separators=(",", ":"))) + 1
 
-    # JSONB payload 형태로 변환
-    payloads = [{"payload": item} for item in data]
 
-    # 배치 삽입 (최대 1000개씩)
-    batch_size = 500
-    inserted = 0
+def plan_batches(
+    payloads: Iterable[dict],
+    target_bytes: int = DEFAULT_TARGET_BATCH_BYTES,
+    max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_rows: int = DEFAULT_MAX_BATCH_ROWS,
+) -> Iterator[list[dict]]:
+    """직렬화 크기 기준으로 배치 분할
 
-    for i in range(0, len(payloads), batch_size):
-        batch = payloads[i : i + batch_size]
+    배치는 target_bytes에 도달할 때까지 채우되 max_bytes와 max_rows를 넘지 않습니다.
+    max_bytes보다 큰 단일 행은 단독 배치로 전송됩니다.
+    입력을 순서대로 소비하며 배치가 완성되는 즉시 반환합니다.
+    """
+    batch: list[dict] = []
+    batch_bytes = 0
+
+    for payload in payloads:
+        size = payload_size(payload)
+        if batch and (batch_bytes + size > max_bytes or len(batch) >= max_rows):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(payload)
+        batch_bytes += size
+        if batch_bytes >= target_bytes:
+            yield batch
+            batch, batch_bytes = [], 0
+
+    if batch:
+        yield batch
+
+
+def is_payload_too_large(error: Exception) -> bool:
+    """서버가 요청 크기 초과(413)로 거부했는지 확인"""
+    return str(getattr(error, "code", "")) == "413" or "too large" in str(error).lower()
+
+
+def insert_batch(
+    client: Client,
+    table_name: str,
+    batch: list[dict],
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    on_conflict: str | None = None,
+) -> int:
+    """단일 배치 삽입 (실패 시 지수 백오프로 재시도)
+
+    요청 크기 초과로 거부되면 배치를 절반으로 나눠 각각 다시 전송합니다.
+    on_conflict를 지정하면 해당 컬럼 기준 upsert로 전송합니다.
+    """
+    for attempt in range(max_retries + 1):
         try:
-            client.table(table_name).insert(batch).execute()
-            inserted += len(batch)
-            print(f"  ✓ {table_name}: {inserted}/{len(payloads)} 삽입됨")
+            if on_conflict:
+                client.table(table_name).upsert(batch, on_conflict=on_conflict).execute()
+            else:
+                client.table(table_name).insert(batch).execute()
+            return len(batch)
         except Exception as e:
-            print(f"  ✗ {table_name} 삽입 오류: {e}")
-            raise
-
-    return inserted
+            if is_payload_too_large(e) and len(batch) > 1:
+                mid = len(batch) // 2
+                print(f"  ↘ {table_name} 요청 크기 초과, {len(batch)}행 배치를 분할합니다")
+                return (
+                    insert_batch(client, table_name, batch[:mid], max_retries, retry_backoff, on_conflict)
+                    + insert_batch(client, table_name, batch[mid:], max_retries, retry_backoff, on_conflict)
+                )
+            if attempt == max_retries or is_payload_too_large(e):
+                raise
+            delay = retry_backoff * (2 ** attempt)
+            print(f"  ↻ {table_name} 배치 재시도 {attempt + 1}/{max_retries} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
+    return 0
+
+
+def insert_to_staging(
+    client: Client,
+    table_name: str,
+    data: Iterable[dict],
+    executor: ThreadPoolExecutor,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    target_bytes: int = DEFAULT_TARGET_BATCH_BYTES,
+    max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_rows: int = DEFAULT_MAX_BATCH_ROWS,
+    on_conflict: str | None = None,
+    row_checksums: dict[str, str] | None = None,
+    send_checksums: bool = False,
+    max_in_flight: int = DEFAULT_CONCURRENCY * IN_FLIGHT_PER_WORKER,
+) -> tuple[int, int]:
+    """Staging 테이블에 데이터 삽입
+
+    항목을 스트리밍으로 읽어 직렬화 크기 기준 배치로 묶고 공유 executor에서 병렬로 전송합니다.
+    전송 대기 중인 배치 수를 제한하므로 파일 전체를 메모리에 올리지 않으며,
+    실패한 배치가 있어도 나머지 배치는 계속 진행됩니다.
+    row_checksums를 넘기면 전송한 행의 ID별 checksum을 기록합니다.
+    send_checksums가 참이면 행 checksum을 checksum 컬럼으로 함께 전송합니다
+    (delta 모드 전용, staging 테이블에 checksum 컬럼이 필요).
+    (삽입된 행 수, 실패한 배치 수)를 반환합니다.
+    """
+    def to_payloads() -> Iterator[dict]:
+        # JSONB payload 형태로 변환 (delta 모드에서는 비교용 행 checksum 포함)
+        for item in data:
+            checksum = row_checksum(item)
+            if row_checksums is not None:
+                row_checksums[item["id"]] = checksum
+            yield {"payload": item, "checksum": checksum} if send_checksums else {"payload": item}
+
+    pending = set()
+    inserted = 0
+    failed = 0
+
+    def collect(done) -> None:
+        nonlocal inserted, failed
+        for future in done:
+            try:
+                inserted += future.result()
+                print(f"  ✓ {table_name}: {inserted}행 삽입됨")
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ {table_name} 삽입 오류: {e}")
+
+    for batch in plan_batches(to_payloads(), target_bytes, max_bytes, max_rows):
+        if len(pending) >= max(1, max_in_flight):
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending.add(
+            executor.submit(insert_batch, client, table_name, batch, max_retries, retry_backoff, on_conflict)
+        )
+
+    collect(as_completed(pending))
+    return inserted, failed
 
 
 def run_load_sql(client: Client) -> None:
@@ -120,22 +304,38 @@ def run_load_sql(client: Client) -> None:
     print("   2. tools/supabase/load.sql 내용 복사 & 실행")
 
 
-def update_content_versions(client: Client, datasets: list[str], version: str = "v1") -> None:
-    """content_versions 테이블 업데이트"""
-    for dataset in datasets:
+def update_content_versions(client: Client, checksums: dict[str, str | None], version: str = "v1") -> None:
+    """content_versions 테이블 업데이트 (데이터셋 -> checksum)"""
+    for dataset, checksum in checksums.items():
         try:
             client.table("content_versions").upsert({
                 "dataset": dataset,
                 "version": version,
-                "checksum": None,
+                "checksum": checksum,
             }).execute()
             print(f"  ✓ content_versions: {dataset} -> {version}")
         except Exception as e:
             print(f"  ⚠ content_versions 업데이트 실패: {e}")
 
 
-def migrate_dataset(client: Client, dataset_name: str, config: dict) -> dict:
-    """단일 데이터셋 마이그레이션"""
+def migrate_dataset(
+    client: Client,
+    dataset_name: str,
+    config: dict,
+    executor: ThreadPoolExecutor,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    batch_limits: dict | None = None,
+    delta: bool = False,
+    remote_checksum: str | None = None,
+    max_in_flight: int = DEFAULT_CONCURRENCY * IN_FLIGHT_PER_WORKER,
+) -> dict:
+    """단일 데이터셋 마이그레이션
+
+    JSON 파일은 항목 단위로 스트리밍되며, 메모리에는 ID별 checksum만 유지됩니다.
+    delta 모드에서는 content_versions의 checksum이 같으면 건너뛰고,
+    다르면 추가/변경된 행만 upsert하고 삭제된 행만 지웁니다.
+    """
     file_path = ASSETS_DATA_DIR / config["file"]
     staging_table = config["staging_table"]
 
@@ -146,17 +346,98 @@ def migrate_dataset(client: Client, dataset_name: str, config: dict) -> dict:
         print(f"   ✗ 파일이 존재하지 않습니다!")
         return {"status": "error", "count": 0}
 
-    # JSON 로드
-    data = load_json(file_path)
-    print(f"   로드된 항목: {len(data)}개")
-
-    # Staging 테이블 비우기
-    clear_staging_table(client, staging_table)
+    insert_options = dict(
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+        max_in_flight=max_in_flight,
+        **(batch_limits or {}),
+    )
 
-    # Staging 테이블에 삽입
-    inserted = insert_to_staging(client, staging_table, data)
+    if delta:
+        # 1차 스트리밍: 행 checksum만 계산
+        row_checksums = {item["id"]: row_checksum(item) for item in iter_json(file_path)}
+        checksum = dataset_checksum(row_checksums)
+        print(f"   로드된 항목: {len(row_checksums)}개")
+        if checksum == remote_checksum:
+            print(f"   = 변경 없음 (checksum 일치), 건너뜀")
+            return {"status": "success", "count": 0, "skipped": True, "checksum": checksum}
+
+        remote_rows = fetch_staging_checksums(client, staging_table)
+        changed_ids = {row_id for row_id, row_sum in row_checksums.items() if remote_rows.get(row_id) != row_sum}
+        removed = sorted(set(remote_rows) - set(row_checksums))
+        print(f"   변경/추가: {len(changed_ids)}개, 삭제: {len(removed)}개")
+
+        # 2차 스트리밍: 변경된 행만 전송
+        changed = (item for item in iter_json(file_path) if item["id"] in changed_ids)
+        inserted, failed = insert_to_staging(
+            client, staging_table, changed, executor, on_conflict="id", send_checksums=True, **insert_options
+        )
+        if removed:
+            delete_from_staging(client, staging_table, removed)
+            print(f"  ✓ {staging_table}: {len(removed)}개 삭제됨")
+    else:
+        # Staging 테이블 비우기
+        clear_staging_table(client, staging_table)
+
+        # Staging 테이블에 스트리밍 삽입 (전송하면서 행 checksum 기록)
+        row_checksums = {}
+        inserted, failed = insert_to_staging(
+            client, staging_table, iter_json(file_path), executor, row_checksums=row_checksums, **insert_options
+        )
+        checksum = dataset_checksum(row_checksums)
+        print(f"   로드된 항목: {len(row_checksums)}개")
+
+    if failed:
+        return {"status": "error", "count": inserted, "failed_batches": failed}
+    return {"status": "success", "count": inserted, "checksum": checksum}
+
+
+def migrate_datasets(
+    client: Client,
+    names: list[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dataset_concurrency: int = DEFAULT_DATASET_CONCURRENCY,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    batch_limits: dict | None = None,
+    delta: bool = False,
+) -> dict:
+    """여러 데이터셋을 병렬로 마이그레이션
+
+    데이터셋 단위 작업(로드, staging 비우기)과 배치 전송은 별도 풀에서 실행되어,
+    한 데이터셋을 준비하는 동안 다른 데이터셋의 배치가 계속 전송됩니다.
+    """
+    remote_checksums = fetch_content_checksums(client) if delta else {}
 
-    return {"status": "success", "count": inserted}
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as batch_executor, \
+            ThreadPoolExecutor(max_workers=dataset_concurrency) as dataset_executor:
+        futures = {
+            dataset_executor.submit(
+                migrate_dataset,
+                client,
+                name,
+                DATASETS[name],
+                batch_executor,
+                max_retries,
+                retry_backoff,
+                batch_limits,
+                delta,
+                remote_checksums.get(name),
+                concurrency * IN_FLIGHT_PER_WORKER,
+            ): name
+            for name in names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"  ✗ {name} 마이그레이션 오류: {e}")
+                results[name] = {"status": "error", "count": 0}
+
+    # 요약은 요청한 순서대로 출력
+    return {name: results[name] for name in names}
 
 
 def main():
@@ -171,6 +452,53 @@ def main():
         help="마이그레이션할 데이터셋 (기본: all)",
     )
     parser.add_argument("--dry-run", action="store_true", help="실제 업로드 없이 시뮬레이션")
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="checksum 비교로 변경된 데이터셋/행만 업로드 (staging을 비우지 않음)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"동시에 전송할 배치 수 (기본: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--dataset-concurrency",
+        type=int,
+        default=DEFAULT_DATASET_CONCURRENCY,
+        help=f"동시에 처리할 데이터셋 수 (기본: {DEFAULT_DATASET_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"배치별 최대 재시도 횟수 (기본: {DEFAULT_MAX_RETRIES})",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=DEFAULT_RETRY_BACKOFF,
+        help=f"재시도 백오프 기준 시간(초) (기본: {DEFAULT_RETRY_BACKOFF})",
+    )
+    parser.add_argument(
+        "--target-batch-kb",
+        type=int,
+        default=DEFAULT_TARGET_BATCH_BYTES // 1024,
+        help=f"배치 목표 크기(KB) (기본: {DEFAULT_TARGET_BATCH_BYTES // 1024})",
+    )
+    parser.add_argument(
+        "--max-batch-kb",
+        type=int,
+        default=DEFAULT_MAX_BATCH_BYTES // 1024,
+        help=f"요청 최대 크기(KB) (기본: {DEFAULT_MAX_BATCH_BYTES // 1024})",
+    )
+    parser.add_argument(
+        "--max-batch-rows",
+        type=int,
+        default=DEFAULT_MAX_BATCH_ROWS,
+        help=f"배치당 최대 행 수 (기본: {DEFAULT_MAX_BATCH_ROWS})",
+    )
     args = parser.parse_args()
 
     # 환경변수 로드
@@ -195,8 +523,8 @@ def main():
         for name, config in DATASETS.items():
             file_path = ASSETS_DATA_DIR / config["file"]
             if file_path.exists():
-                data = load_json(file_path)
-                print(f"  {name}: {len(data)}개 항목")
+                count = sum(1 for _ in iter_json(file_path))
+                print(f"  {name}: {count}개 항목")
             else:
                 print(f"  {name}: 파일 없음")
         return
@@ -207,10 +535,20 @@ def main():
     # 마이그레이션할 데이터셋 결정
     target_datasets = list(DATASETS.keys()) if "all" in args.datasets else args.datasets
 
-    results = {}
-    for name in target_datasets:
-        config = DATASETS[name]
-        results[name] = migrate_dataset(client, name, config)
+    results = migrate_datasets(
+        client,
+        target_datasets,
+        concurrency=args.concurrency,
+        dataset_concurrency=args.dataset_concurrency,
+        max_retries=args.max_retries,
+        retry_backoff=args.retry_backoff,
+        batch_limits={
+            "target_bytes": args.target_batch_kb * 1024,
+            "max_bytes": max(args.max_batch_kb, args.target_batch_kb) * 1024,
+            "max_rows": args.max_batch_rows,
+        },
+        delta=args.delta,
+    )
 
     # 결과 요약
     print("\n" + "=" * 60)
@@ -220,7 +558,11 @@ def main():
     success_count = 0
     for name, result in results.items():
         status_icon = "✓" if result["status"] == "success" else "✗"
-        print(f"  {status_icon} {name}: {result['count']}개")
+        failed_batches = result.get("failed_batches")
+        suffix = f" (실패한 배치 {failed_batches}개)" if failed_batches else ""
+        if result.get("skipped"):
+            suffix = " (변경 없음)"
+        print(f"  {status_icon} {name}: {result['count']}개{suffix}")
         if result["status"] == "success":
             success_count += 1
 
@@ -231,8 +573,12 @@ def main():
 
     # content_versions 업데이트
     print("\n📝 content_versions 업데이트...")
-    successful_datasets = [name for name, result in results.items() if result["status"] == "success"]
-    update_content_versions(client, successful_datasets)
+    successful_checksums = {
+        name: result["checksum"]
+        for name, result in results.items()
+        if result["status"] == "success" and not result.get("skipped")
+    }
+    update_content_versions(client, successful_checksums)
 
     print("\n✅ 마이그레이션 완료!")
     print("\n다음 단계:")
@@ -6,14 +6,16 @@ TimeWalker Supabase 데이터 검증 스크립트
 
 사용법:
     python validate_data.py --url <SUPABASE_URL> --key <ANON_KEY>
+    python validate_data.py --verify-content  # 행 해시 비교 (verify.sql 필요)
 """
 
 import argparse
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 try:
     from supabase import create_client, Client
@@ -22,10 +24,16 @@ except ImportError:
     print("필수 패키지를 설치하세요: pip install supabase python-dotenv")
     sys.exit(1)
 
+from content_hash import row_hash
+
 # 프로젝트 루트 디렉토리
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 ASSETS_DATA_DIR = PROJECT_ROOT / "assets" / "data"
 
+# 원격 조회 설정
+ID_PAGE_SIZE = 1000  # keyset 페이지 크기 (서버 max-rows보다 크면 서버 값이 적용됨)
+DEFAULT_CONCURRENCY = 4  # 동시에 검증할 데이터셋 수
+
 # 검증할 데이터셋
 DATASETS = {
     "characters": {
@@ -63,34 +71,77 @@ def load_json(file_path: Path) -> list[dict[str, Any]]:
 
 
 def count_remote(client: Client, table: str) -> int:
-    """원격 테이블 레코드 수 조회"""
+    """원격 테이블 레코드 수 조회 (서버 측 exact count, 행은 전송하지 않음)"""
     try:
-        # count 대신 select로 ID만 가져와서 카운트
-        response = client.table(table).select("id").execute()
-        return len(response.data)
+        response = client.table(table).select("id", count="exact", head=True).execute()
+        return response.count if response.count is not None else -1
     except Exception as e:
         print(f"  ✗ {table} 조회 오류: {e}")
         return -1
 
 
-def get_remote_ids(client: Client, table: str) -> set[str]:
-    """원격 테이블의 모든 ID 조회"""
+def stream_remote_ids(client: Client, table: str, id_field: str = "id") -> Iterator[str]:
+    """원격 테이블 ID를 keyset 페이지 단위로 스트리밍
+
+    offset 대신 마지막 ID 이후를 조회하므로 PostgREST 기본 행 제한에 걸리지 않고,
+    페이지가 깊어져도 조회 비용이 일정합니다.
+    """
+    last_id = None
+    while True:
+        query = client.table(table).select(id_field).order(id_field).limit(ID_PAGE_SIZE)
+        if last_id is not None:
+            query = query.gt(id_field, last_id)
+        rows = query.execute().data
+        if not rows:
+            return
+        for row in rows:
+            yield row[id_field]
+        last_id = rows[-1][id_field]
+
+
+def get_remote_ids(client: Client, table: str, id_field: str = "id") -> set[str] | None:
+    """원격 테이블의 모든 ID 조회 (실패 시 None)"""
     try:
-        response = client.table(table).select("id").execute()
-        return {row["id"] for row in response.data}
+        return set(stream_remote_ids(client, table, id_field))
     except Exception as e:
         print(f"  ✗ {table} ID 조회 오류: {e}")
-        return set()
+        return None
+
+
+def stream_remote_hashes(client: Client, table: str) -> Iterator[tuple[str, str]]:
+    """원격 테이블의 (ID, 행 해시)를 서버 측 계산 결과로 keyset 페이지 단위 스트리밍"""
+    last_id = None
+    while True:
+        rows = client.rpc(
+            "content_row_hashes",
+            {"p_table": table, "p_after_id": last_id, "p_limit": ID_PAGE_SIZE},
+        ).execute().data
+        if not rows:
+            return
+        for row in rows:
+            yield row["id"], row["hash"]
+        last_id = rows[-1]["id"]
+
+
+def get_remote_hashes(client: Client, table: str) -> dict[str, str] | None:
+    """원격 테이블의 ID별 행 해시 조회 (실패 시 None)"""
+    try:
+        return dict(stream_remote_hashes(client, table))
+    except Exception as e:
+        print(f"  ✗ {table} 해시 조회 오류 (verify.sql 적용 여부 확인): {e}")
+        return None
 
 
-def validate_dataset(client: Client, name: str, config: dict) -> dict:
-    """단일 데이터셋 검증"""
+def validate_dataset(client: Client, name: str, config: dict, verify_content: bool = False) -> dict:
+    """단일 데이터셋 검증
+
+    원격 count와 ID 목록은 테이블당 한 번씩만 조회해 count/diff 단계에서 함께 사용합니다.
+    verify_content이면 ID 대신 (ID, 행 해시)를 한 번 스트리밍해 내용이 다른 행도 찾습니다.
+    """
     file_path = ASSETS_DATA_DIR / config["file"]
     table = config["table"]
     id_field = config["id_field"]
 
-    print(f"\n🔍 {name} 검증...")
-
     if not file_path.exists():
         return {"status": "error", "message": "로컬 파일 없음"}
 
@@ -104,31 +155,72 @@ def validate_dataset(client: Client, name: str, config: dict) -> dict:
     if remote_count < 0:
         return {"status": "error", "message": "원격 조회 실패"}
 
-    remote_ids = get_remote_ids(client, table)
+    drifted_ids = []
+    if verify_content:
+        remote_hashes = get_remote_hashes(client, table)
+        if remote_hashes is None:
+            return {"status": "error", "message": "원격 해시 조회 실패", "remote_count": remote_count}
+        remote_ids = set(remote_hashes)
+        drifted_ids = sorted(
+            item[id_field]
+            for item in local_data
+            if item[id_field] in remote_hashes and remote_hashes[item[id_field]] != row_hash(table, item)
+        )
+    else:
+        remote_ids = get_remote_ids(client, table, id_field)
+        if remote_ids is None:
+            return {"status": "error", "message": "원격 ID 조회 실패", "remote_count": remote_count}
 
     # 비교
     missing_ids = local_ids - remote_ids
     extra_ids = remote_ids - local_ids
 
-    result = {
+    return {
         "status": "success",
         "local_count": local_count,
         "remote_count": remote_count,
-        "match": local_count == remote_count and not missing_ids and not extra_ids,
-        "missing_ids": list(missing_ids)[:10],  # 최대 10개만 표시
-        "extra_ids": list(extra_ids)[:10],
+        "match": local_count == remote_count and not missing_ids and not extra_ids and not drifted_ids,
+        "missing_ids": sorted(missing_ids),
+        "extra_ids": sorted(extra_ids),
+        "drifted_ids": drifted_ids,
     }
 
-    # 출력
+
+def print_dataset_result(name: str, result: dict) -> None:
+    """단일 데이터셋 검증 결과 출력"""
+    print(f"\n🔍 {name} 검증...")
+
+    if result["status"] != "success":
+        print(f"  ✗ {result['message']}")
+        return
+
     match_icon = "✓" if result["match"] else "✗"
-    print(f"  로컬: {local_count}개, 원격: {remote_count}개 [{match_icon}]")
+    print(f"  로컬: {result['local_count']}개, 원격: {result['remote_count']}개 [{match_icon}]")
 
+    missing_ids = result["missing_ids"]
+    extra_ids = result["extra_ids"]
     if missing_ids:
-        print(f"  ⚠ 누락된 ID ({len(missing_ids)}개): {list(missing_ids)[:5]}...")
+        print(f"  ⚠ 누락된 ID ({len(missing_ids)}개): {missing_ids[:5]}...")
     if extra_ids:
-        print(f"  ⚠ 추가된 ID ({len(extra_ids)}개): {list(extra_ids)[:5]}...")
-
-    return result
+        print(f"  ⚠ 추가된 ID ({len(extra_ids)}개): {extra_ids[:5]}...")
+    if result["drifted_ids"]:
+        print(f"  ⚠ 내용이 다른 행 ({len(result['drifted_ids'])}개):")
+        for row_id in result["drifted_ids"]:
+            print(f"     - {row_id}")
+
+
+def validate_datasets(
+    client: Client,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    verify_content: bool = False,
+) -> dict:
+    """모든 데이터셋을 병렬로 검증 (결과는 정의 순서대로 반환)"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            name: executor.submit(validate_dataset, client, name, config, verify_content)
+            for name, config in DATASETS.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
 
 
 def check_content_versions(client: Client) -> None:
@@ -146,6 +238,17 @@ def main():
     parser = argparse.ArgumentParser(description="TimeWalker Supabase 데이터 검증")
     parser.add_argument("--url", help="Supabase URL")
     parser.add_argument("--key", help="Supabase Anon Key (또는 Service Role Key)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"동시에 검증할 데이터셋 수 (기본: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--verify-content",
+        action="store_true",
+        help="서버에서 계산한 행 해시로 내용까지 비교 (verify.sql 필요)",
+    )
     args = parser.parse_args()
 
     # 환경변수 로드
@@ -166,10 +269,10 @@ def main():
     # Supabase 클라이언트 생성
     client: Client = create_client(supabase_url, supabase_key)
 
-    # 각 데이터셋 검증
-    results = {}
-    for name, config in DATASETS.items():
-        results[name] = validate_dataset(client, name, config)
+    # 각 데이터셋 검증 (병렬)
+    results = validate_datasets(client, args.concurrency, args.verify_content)
+    for name, result in results.items():
+        print_dataset_result(name, result)
 
     # content_versions 확인
     check_content_versions(client)
@@ -183,6 +286,9 @@ def main():
     for name, result in results.items():
         if result.get("match"):
             print(f"  ✓ {name}: 일치 ({result.get('local_count', 0)}개)")
+        elif result.get("drifted_ids"):
+            print(f"  ✗ {name}: 내용 불일치 ({len(result['drifted_ids'])}개 행)")
+            all_match = False
         else:
             print(f"  ✗ {name}: 불일치 (로컬 {result.get('local_count', 0)} vs 원격 {result.get('remote_count', 0)})")
             all_match = False
@@ -0,0 +1,40 @@
+-- Per-row content hashes for post-deploy verification (validate_data.py --verify-content)
+--
+-- Returns (id, md5 of the row's jsonb text without created_at/updated_at) in id order,
+-- one keyset page at a time, so row bodies never leave the database.
+-- Runs in UTC so timestamptz columns render as content_hash.py expects.
+
+create or replace function content_row_hashes(
+  p_table text,
+  p_after_id text default null,
+  p_limit int default 1000
+)
+returns table (id text, hash text)
+language plpgsql
+stable
+set timezone to 'UTC'
+as $$
+begin
+  if p_table not in (
+    'characters',
+    'dialogues',
+    'locations',
+    'encyclopedia_entries',
+    'quiz_categories',
+    'quizzes'
+  ) then
+    raise exception 'unsupported table: %', p_table;
+  end if;
+
+  return query execute format(
+    'select t.id, md5(((to_jsonb(t) - ''created_at'') - ''updated_at'')::text)
+     from %I t
+     where $1 is null or t.id > $1
+     order by t.id
+     limit $2',
+    p_table
+  ) using p_after_id, p_limit;
+end;
+$$;
+
+grant execute on function content_row_hashes(text, text, int) to anon, authenticated, service_role;
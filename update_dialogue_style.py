@@ -1,101 +1,105 @@
-import json
 import os
-import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'data_pipeline'))
+from content_store import get_store
+from json_stream import ArrayWriter, iter_array
 
 # File paths
 DIALOGUES_FILE = 'assets/data/dialogues.json'
-BACKUP_FILE = 'assets/data/dialogues_backup_style_update.json'
 
 def update_dialogues():
-    # 1. Backup
+    # 1. Snapshot (restore with: tools/data_pipeline/snapshot_store.py restore <id>)
     if not os.path.exists(DIALOGUES_FILE):
         print(f"Error: {DIALOGUES_FILE} not found.")
         return
 
-    shutil.copy(DIALOGUES_FILE, BACKUP_FILE)
-    print(f"Backed up to {BACKUP_FILE}")
+    snapshot_id = get_store(Path(DIALOGUES_FILE).parent).snapshot('dialogues')
+    print(f"Snapshot {snapshot_id} taken")
+
+    updated_count = 0
+
+    # 2. Stream dialogues into a temp file that replaces the original on success;
+    # the original stays readable until then
+    with ArrayWriter(DIALOGUES_FILE) as out:
+        for dialogue in iter_array(DIALOGUES_FILE):
+            updated_count += update_dialogue(dialogue)
+            out.write(dialogue)
 
-    # 2. Load Data
-    with open(DIALOGUES_FILE, 'r', encoding='utf-8') as f:
-        dialogues = json.load(f)
+    print(f"Update complete. {updated_count} nodes split.")
 
+def update_dialogue(dialogue):
     updated_count = 0
+    nodes = dialogue.get('nodes', [])
+    new_nodes = []
+    
+    # We need to process nodes and potentially insert new ones
+    # Use a while loop or just build a new list
     
-    for dialogue in dialogues:
-        nodes = dialogue.get('nodes', [])
-        new_nodes = []
+    for node in nodes:
+        node_id = node.get('id')
+        node_type = node.get('type')
+        speaker = node.get('speaker') or node.get('speakerId')
+        choices = node.get('choices', [])
+        
+        # Condition to split:
+        # 1. Has choices
+        # 2. Speaker is NOT 'player' (it's an NPC)
+        # 3. Not already a 'choice' only node (though type might be 'choice', if it has text it's a mix)
+        # Actually, standard is: type='choice' usually implies it has text AND choices.
+        # We want to change it to:
+        # Node 1 (NPC): type='dialogue', text=Original, nextNode=Node 2
+        # Node 2 (Player): type='choice', text='...', choices=Original, speaker='player'
+        
+        is_npc = speaker and speaker != 'player'
+        has_choices = len(choices) > 0
+        has_text = False
+        text_obj = node.get('text')
         
-        # We need to process nodes and potentially insert new ones
-        # Use a while loop or just build a new list
+        if isinstance(text_obj, str) and text_obj.strip():
+            has_text = True
+        elif isinstance(text_obj, dict):
+            # Check if any localized text exists
+            if any(v.strip() for v in text_obj.values() if isinstance(v, str)):
+                has_text = True
         
-        for node in nodes:
-            node_id = node.get('id')
-            node_type = node.get('type')
-            speaker = node.get('speaker') or node.get('speakerId')
-            choices = node.get('choices', [])
+        if is_npc and has_choices and has_text:
+            # SPLIT THIS NODE
+            print(f"Splitting node {node_id} in dialogue {dialogue['id']}")
+            updated_count += 1
             
-            # Condition to split:
-            # 1. Has choices
-            # 2. Speaker is NOT 'player' (it's an NPC)
-            # 3. Not already a 'choice' only node (though type might be 'choice', if it has text it's a mix)
-            # Actually, standard is: type='choice' usually implies it has text AND choices.
-            # We want to change it to:
-            # Node 1 (NPC): type='dialogue', text=Original, nextNode=Node 2
-            # Node 2 (Player): type='choice', text='...', choices=Original, speaker='player'
+            # 1. Create NPC Node (The one user reads first)
+            npc_node = node.copy()
+            npc_node['type'] = 'dialogue'
+            npc_node['choices'] = [] # Remove choices
             
-            is_npc = speaker and speaker != 'player'
-            has_choices = len(choices) > 0
-            has_text = False
-            text_obj = node.get('text')
+            # Determine new choice node ID
+            choice_node_id = f"{node_id}_choice"
+            npc_node['nextNodeId'] = choice_node_id
             
-            if isinstance(text_obj, str) and text_obj.strip():
-                has_text = True
-            elif isinstance(text_obj, dict):
-                # Check if any localized text exists
-                if any(v.strip() for v in text_obj.values() if isinstance(v, str)):
-                    has_text = True
+            # 2. Create Player Choice Node
+            choice_node = {
+                "id": choice_node_id,
+                "type": "choice",
+                "speaker": "player", # Explicitly set player
+                "emotion": "neutral",
+                "text": { # Placeholder text
+                    "ko": "...",
+                    "en": "..."
+                },
+                "choices": choices # Moved choices here
+            }
             
-            if is_npc and has_choices and has_text:
-                # SPLIT THIS NODE
-                print(f"Splitting node {node_id} in dialogue {dialogue['id']}")
-                updated_count += 1
-                
-                # 1. Create NPC Node (The one user reads first)
-                npc_node = node.copy()
-                npc_node['type'] = 'dialogue'
-                npc_node['choices'] = [] # Remove choices
-                
-                # Determine new choice node ID
-                choice_node_id = f"{node_id}_choice"
-                npc_node['nextNodeId'] = choice_node_id
-                
-                # 2. Create Player Choice Node
-                choice_node = {
-                    "id": choice_node_id,
-                    "type": "choice",
-                    "speaker": "player", # Explicitly set player
-                    "emotion": "neutral",
-                    "text": { # Placeholder text
-                        "ko": "...",
-                        "en": "..."
-                    },
-                    "choices": choices # Moved choices here
-                }
-                
-                new_nodes.append(npc_node)
-                new_nodes.append(choice_node)
-                
-            else:
-                # Keep original
-                new_nodes.append(node)
-        
-        dialogue['nodes'] = new_nodes
-
-    # 3. Save Data
-    with open(DIALOGUES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(dialogues, f, indent=4, ensure_ascii=False)
-
-    print(f"Update complete. {updated_count} nodes split.")
+            new_nodes.append(npc_node)
+            new_nodes.append(choice_node)
+            
+        else:
+            # Keep original
+            new_nodes.append(node)
+    
+    dialogue['nodes'] = new_nodes
+    return updated_count
 
 if __name__ == '__main__':
     update_dialogues()